@@ -0,0 +1,98 @@
+"""
+Per-location metrics computed in one vectorized pass.
+Built once per dataset version so summaries, rankings and exports read a
+precomputed row instead of re-aggregating raw rows on every request.
+"""
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from .indexes import LOCATION_COLUMN, location_keys
+
+
+RATE_COLUMN = 'flat - weighted average rate'
+SALES_COLUMN = 'flat_sold - igr'
+UNITS_COLUMN = 'total units'
+
+METRIC_COLUMNS = [
+    'location', 'city', 'rows', 'year_start', 'year_end', 'year_span',
+    'avg_rate', 'min_rate', 'max_rate', 'std_rate', 'first_rate', 'last_rate',
+    'rate_growth_pct', 'rate_cagr_pct', 'volatility_pct',
+    'total_sales', 'avg_sales', 'first_sales', 'last_sales', 'sales_growth_pct',
+    'total_units',
+]
+
+
+def _growth_pct(first: pd.Series, last: pd.Series, rows: pd.Series) -> pd.Series:
+    """First-to-last change in percent; 0 for single-row or zero-based series."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        growth = (last - first) / first * 100
+    return growth.where((rows > 1) & (first != 0), 0.0)
+
+
+def location_metrics(df: pd.DataFrame, keys: Optional[np.ndarray] = None) -> pd.DataFrame:
+    """
+    Aggregate every location's rows into one metrics row.
+
+    Rows are expected in year order within each location (as produced by
+    prepare_dataset / LocationIndex), so first/last mean earliest/latest.
+
+    Args:
+        df: Dataset (or any subset of it)
+        keys: Precomputed normalized location keys aligned with ``df``
+
+    Returns:
+        DataFrame indexed by normalized location key with METRIC_COLUMNS
+    """
+    required = [LOCATION_COLUMN, 'year', RATE_COLUMN, SALES_COLUMN, UNITS_COLUMN]
+    if df is None or len(df) == 0 or any(column not in df.columns for column in required):
+        return pd.DataFrame(columns=METRIC_COLUMNS)
+
+    if keys is None:
+        keys = location_keys(df[LOCATION_COLUMN])
+    frame = pd.DataFrame({
+        'key': keys,
+        'location': df[LOCATION_COLUMN].to_numpy(),
+        'city': df['city'].to_numpy() if 'city' in df.columns else None,
+        'year': df['year'].to_numpy(),
+        'rate': df[RATE_COLUMN].to_numpy(dtype=float),
+        'sales': df[SALES_COLUMN].to_numpy(),
+        'units': df[UNITS_COLUMN].to_numpy(),
+    })
+    frame = frame[frame['key'] != '']
+
+    metrics = frame.groupby('key', sort=False).agg(
+        location=('location', 'first'),
+        city=('city', 'first'),
+        rows=('year', 'size'),
+        year_start=('year', 'min'),
+        year_end=('year', 'max'),
+        avg_rate=('rate', 'mean'),
+        min_rate=('rate', 'min'),
+        max_rate=('rate', 'max'),
+        std_rate=('rate', 'std'),
+        first_rate=('rate', 'first'),
+        last_rate=('rate', 'last'),
+        total_sales=('sales', 'sum'),
+        avg_sales=('sales', 'mean'),
+        first_sales=('sales', 'first'),
+        last_sales=('sales', 'last'),
+        total_units=('units', 'sum'),
+    )
+
+    metrics['year_span'] = metrics['year_end'] - metrics['year_start']
+    metrics['rate_growth_pct'] = _growth_pct(metrics['first_rate'], metrics['last_rate'], metrics['rows'])
+    metrics['sales_growth_pct'] = _growth_pct(
+        metrics['first_sales'].astype(float), metrics['last_sales'].astype(float), metrics['rows']
+    )
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cagr = ((metrics['last_rate'] / metrics['first_rate']) ** (1.0 / metrics['year_span']) - 1) * 100
+        volatility = metrics['std_rate'] / metrics['avg_rate'] * 100
+    valid_cagr = (metrics['year_span'] > 0) & (metrics['first_rate'] > 0) & (metrics['last_rate'] > 0)
+    metrics['rate_cagr_pct'] = cagr.where(valid_cagr)
+    metrics['volatility_pct'] = volatility.where(metrics['avg_rate'] > 0, 0.0)
+
+    metrics.index.name = None
+    return metrics[METRIC_COLUMNS]
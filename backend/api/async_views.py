@@ -0,0 +1,194 @@
+"""
+Async versions of the query, stream and summary-job endpoints for ASGI
+deployments (realestate_api.asgi, which routes these paths here).
+
+Responses match the sync views in views.py. Analysis, rendering and cache
+access run on the offload pool (see api/offload.py); waits on HuggingFace
+and on summary jobs happen on the event loop, so one worker can hold
+hundreds of them open.
+"""
+
+import asyncio
+
+import orjson
+
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, StreamingHttpResponse
+from django.views import View
+from rest_framework import status
+from django.conf import settings
+
+from .jobs import summary_jobs
+from .metrics import server_timed
+from .offload import run_sync
+from .renderers import dumps
+from .serializers import QueryRequestSerializer, SummaryJobSerializer, query_response_payload
+from .views import (
+    DATA_RETRY_AFTER, QueryStreamView, cached_query_response, data_unavailable_detail, resolve_query, service,
+)
+
+
+def json_response(data, status_code=status.HTTP_200_OK) -> HttpResponse:
+    """Encode ``data`` with the fast renderer."""
+    return HttpResponse(dumps(data), status=status_code, content_type='application/json')
+
+
+class AsyncAPIView(View):
+    """
+    Base class for async API views.
+
+    CSRF-exempt like DRF's APIView (the API has no session auth). Requests
+    served through ASGI bind the worker's event loop for summary jobs.
+    Views that set ``requires_data`` answer 503 until the dataset is ready
+    (see views.DataRequiredMixin).
+    """
+
+    requires_data = False
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        view.csrf_exempt = True
+        return view
+
+    def setup(self, request, *args, **kwargs):
+        super().setup(request, *args, **kwargs)
+        if isinstance(request, ASGIRequest) and summary_jobs.event_loop is None:
+            summary_jobs.bind_loop(asyncio.get_running_loop())
+
+    async def dispatch(self, request, *args, **kwargs):
+        if self.requires_data and not service.ready:
+            response = json_response({"detail": data_unavailable_detail()}, status.HTTP_503_SERVICE_UNAVAILABLE)
+            response['Retry-After'] = str(DATA_RETRY_AFTER)
+            return response
+        return await super().dispatch(request, *args, **kwargs)
+
+    @staticmethod
+    def request_data(request):
+        """
+        Parse a JSON or form request body.
+
+        Raises:
+            ValueError: If a JSON body does not parse
+        """
+        if request.content_type == 'application/json':
+            return orjson.loads(request.body) if request.body else {}
+        return request.POST
+
+    def parse(self, request):
+        """Return (validated request data, None) or (None, error response)."""
+        if request.method == 'GET':
+            data = request.GET
+        else:
+            try:
+                data = self.request_data(request)
+            except ValueError as e:
+                return None, json_response({"detail": f"JSON parse error - {e}"}, status.HTTP_400_BAD_REQUEST)
+        serializer = QueryRequestSerializer(data=data)
+        if not serializer.is_valid():
+            return None, json_response({"error": serializer.errors}, status.HTTP_400_BAD_REQUEST)
+        return serializer.validated_data, None
+
+
+class AsyncQueryView(AsyncAPIView):
+    """
+    Async POST/GET /api/query/ (see views.QueryView).
+    """
+
+    requires_data = True
+
+    @server_timed('query')
+    async def get(self, request, *args, **kwargs):
+        """Process a query passed as ?message=."""
+        return await self._respond(request)
+
+    @server_timed('query')
+    async def post(self, request, *args, **kwargs):
+        """Process user query and return analysis results."""
+        return await self._respond(request)
+
+    async def _respond(self, request):
+        data, error = self.parse(request)
+        if error is not None:
+            return error
+
+        try:
+            entry, cache_status = await run_sync(resolve_query, data['message'], data['tables'])
+        except Exception as e:
+            return json_response({"error": f"Analysis failed: {str(e)}"}, status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        return cached_query_response(request, entry, cache_status)
+
+
+class AsyncQueryStreamView(AsyncAPIView):
+    """
+    Async POST /api/query/stream/ (see views.QueryStreamView).
+    """
+
+    requires_data = True
+
+    @server_timed('query_stream')
+    async def post(self, request, *args, **kwargs):
+        """Stream the analysis for a user query."""
+        data, error = self.parse(request)
+        if error is not None:
+            return error
+
+        events = self._events(data['message'])
+        # The first frame carries the analysis (see QueryStreamView.post)
+        first = await events.__anext__()
+        response = StreamingHttpResponse(
+            self._prepend(first, events),
+            content_type='text/event-stream'
+        )
+        response['Cache-Control'] = 'no-cache'
+        # Stop nginx-style proxies from buffering the stream
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    @staticmethod
+    async def _prepend(first, events):
+        """Yield an already computed frame, then the rest of the stream."""
+        yield first
+        async for chunk in events:
+            yield chunk
+
+    async def _events(self, message):
+        """Encode service events as SSE frames."""
+        frame = QueryStreamView._frame
+        try:
+            async for event, data in service.astream_query(message):
+                if event == "result":
+                    # Tables can be large; encode off the event loop
+                    yield await run_sync(lambda: frame(event, query_response_payload(data)))
+                else:
+                    yield frame(event, data)
+        except Exception as e:
+            yield frame("error", {"error": f"Analysis failed: {str(e)}"})
+        yield frame("done", {})
+
+
+class AsyncSummaryJobView(AsyncAPIView):
+    """
+    Async GET /api/summary/<job_id>/?wait=5 (see views.SummaryJobView).
+    Long polls wait on the event loop instead of holding a thread.
+    """
+
+    @server_timed('summary_job')
+    async def get(self, request, job_id, *args, **kwargs):
+        """Return the current state of a summary job."""
+        try:
+            wait = float(request.GET.get('wait', 0))
+        except ValueError:
+            return json_response({"error": "wait must be a number"}, status.HTTP_400_BAD_REQUEST)
+
+        wait = min(max(wait, 0.0), settings.SUMMARY_POLL_MAX_WAIT)
+        if wait:
+            record = await summary_jobs.await_job(job_id, wait)
+        else:
+            record = await run_sync(summary_jobs.status, job_id)
+        if record is None:
+            return json_response({"error": "Unknown summary job"}, status.HTTP_404_NOT_FOUND)
+
+        serializer = SummaryJobSerializer({"job": job_id, **record})
+        return json_response(serializer.data)
@@ -0,0 +1,81 @@
+"""
+Timing helpers shared by the benchmark management commands.
+Results are plain dicts so they can be written as JSON and compared
+between runs to catch regressions.
+"""
+
+import platform
+import subprocess
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+def best_of(fn: Callable[[], Any], repeat: int) -> float:
+    """Fastest of ``repeat`` runs of ``fn``, in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def measure(fn: Callable[[], Any], repeat: int, warmup: int = 1) -> Dict[str, Any]:
+    """
+    Time repeated runs of ``fn``.
+
+    Args:
+        fn: Code to time
+        repeat: Timed runs
+        warmup: Untimed runs first (fills lazy caches, as in a warm server)
+
+    Returns:
+        Dict with runs and min/median/p95/mean/max in milliseconds
+    """
+    for _ in range(warmup):
+        fn()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return summarize(timings)
+
+
+def summarize(timings_ms: List[float]) -> Dict[str, Any]:
+    """Summary statistics of a list of timings in milliseconds."""
+    values = np.asarray(timings_ms, dtype=float)
+    return {
+        "runs": len(values),
+        "min_ms": round(float(values.min()), 4),
+        "median_ms": round(float(np.median(values)), 4),
+        "p95_ms": round(float(np.percentile(values, 95)), 4),
+        "mean_ms": round(float(values.mean()), 4),
+        "max_ms": round(float(values.max()), 4),
+    }
+
+
+def git_commit() -> Optional[str]:
+    """Commit of the working tree, if it is a git checkout."""
+    try:
+        result = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=5
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def environment() -> Dict[str, Any]:
+    """Versions and machine details recorded with benchmark results."""
+    return {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+    }
@@ -0,0 +1,245 @@
+"""
+Two-tier caching for expensive results such as LLM summaries.
+An in-process LRU (Django LocMemCache) sits in front of a store shared by
+all workers (Django DatabaseCache on the configured database).
+
+Rendered API responses are kept separately in a byte-bounded in-process
+LRU, so they can be served without re-serializing and validated by ETag.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, NamedTuple, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .metrics import count_cache
+
+logger = logging.getLogger(__name__)
+
+
+def make_key(prefix: str, *parts: Any) -> str:
+    """
+    Build a fixed-length cache key from arbitrary JSON-serializable parts.
+
+    Args:
+        prefix: Namespace for the key
+        *parts: Values identifying the cached item
+
+    Returns:
+        Key of the form ``prefix:<sha256>``
+    """
+    raw = json.dumps(parts, sort_keys=True, default=str).encode('utf-8')
+    return f"{prefix}:{hashlib.sha256(raw).hexdigest()}"
+
+
+class TieredCache:
+    """
+    Read-through pair of caches with hit/miss counters.
+
+    Reads check the local tier first, then the shared tier (promoting hits
+    into the local tier). Writes go to both. TTL and size bounds come from
+    each backend's TIMEOUT and MAX_ENTRIES settings. Errors from the shared
+    tier (e.g. the cache table was not created) degrade to local-only.
+    """
+
+    def __init__(self, local_alias: str, shared_alias: Optional[str] = None, name: str = 'default'):
+        """
+        Args:
+            local_alias: Alias in settings.CACHES for the in-process tier
+            shared_alias: Alias in settings.CACHES for the shared tier
+            name: Label of this cache in the lookup metrics
+        """
+        self.name = name
+        self.local_alias = local_alias
+        self.shared_alias = shared_alias
+        self._lock = threading.Lock()
+        self._counts = {"local_hits": 0, "shared_hits": 0, "misses": 0, "sets": 0, "shared_errors": 0}
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counts[name] += 1
+
+    def get(self, key: str) -> Any:
+        """
+        Look a key up in both tiers.
+
+        Args:
+            key: Cache key (see make_key)
+
+        Returns:
+            Cached value, or None on a miss
+        """
+        value = caches[self.local_alias].get(key)
+        if value is not None:
+            self._count("local_hits")
+            count_cache(self.name, True)
+            return value
+
+        if self.shared_alias:
+            try:
+                value = caches[self.shared_alias].get(key)
+            except Exception as e:
+                self._count("shared_errors")
+                logger.warning("Shared cache read failed: %s", e)
+                value = None
+            if value is not None:
+                caches[self.local_alias].set(key, value)
+                self._count("shared_hits")
+                count_cache(self.name, True)
+                return value
+
+        self._count("misses")
+        count_cache(self.name, False)
+        return None
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Store a value in both tiers.
+
+        Args:
+            key: Cache key (see make_key)
+            value: Value to cache (must not be None)
+        """
+        caches[self.local_alias].set(key, value)
+        if self.shared_alias:
+            try:
+                caches[self.shared_alias].set(key, value)
+            except Exception as e:
+                self._count("shared_errors")
+                logger.warning("Shared cache write failed: %s", e)
+        self._count("sets")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters for this process."""
+        with self._lock:
+            counts = dict(self._counts)
+        lookups = counts["local_hits"] + counts["shared_hits"] + counts["misses"]
+        hits = counts["local_hits"] + counts["shared_hits"]
+        counts["hit_ratio"] = round(hits / lookups, 4) if lookups else 0.0
+        return counts
+
+
+class CachedResponse(NamedTuple):
+    """Rendered response body and its validator."""
+    body: bytes
+    etag: str
+    expires: float
+
+
+class ResponseCache:
+    """
+    In-process LRU of rendered response bodies, bounded by entries and bytes.
+
+    Each entry carries a strong ETag derived from its body. Entries expire
+    after ``ttl`` seconds; the least recently used ones are evicted when
+    either bound is exceeded.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl: float, name: str = 'response'):
+        """
+        Args:
+            max_entries: Maximum number of cached responses
+            max_bytes: Maximum total size of cached bodies
+            ttl: Seconds an entry stays valid
+            name: Label of this cache in the lookup metrics
+        """
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._bytes = 0
+        self._counts = {"hits": 0, "misses": 0, "sets": 0, "evictions": 0, "expirations": 0}
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """
+        Look up a rendered response.
+
+        Args:
+            key: Cache key (see make_key)
+
+        Returns:
+            Cached response, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires <= time.monotonic():
+                self._remove(key)
+                self._counts["expirations"] += 1
+                entry = None
+            if entry is None:
+                self._counts["misses"] += 1
+            else:
+                self._entries.move_to_end(key)
+                self._counts["hits"] += 1
+        count_cache(self.name, entry is not None)
+        return entry
+
+    def set(self, key: str, body: bytes) -> CachedResponse:
+        """
+        Store a rendered response.
+
+        Bodies larger than the byte bound are returned but not kept.
+
+        Args:
+            key: Cache key (see make_key)
+            body: Rendered response body
+
+        Returns:
+            The entry, with its ETag
+        """
+        entry = CachedResponse(
+            body=body,
+            etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+            expires=time.monotonic() + self.ttl,
+        )
+        if len(body) > self.max_bytes:
+            return entry
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self._bytes += len(body)
+            self._counts["sets"] += 1
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self._counts["evictions"] += 1
+        return entry
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= len(entry.body)
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss/eviction counters and memory use for this process."""
+        with self._lock:
+            counts = dict(self._counts)
+            counts["entries"] = len(self._entries)
+            counts["bytes"] = self._bytes
+        counts["max_entries"] = self.max_entries
+        counts["max_bytes"] = self.max_bytes
+        lookups = counts["hits"] + counts["misses"]
+        counts["hit_ratio"] = round(counts["hits"] / lookups, 4) if lookups else 0.0
+        return counts
+
+
+summary_cache = TieredCache('summaries-local', 'summaries-shared', name='summary')
+
+response_cache = ResponseCache(
+    max_entries=settings.QUERY_CACHE_MAX_ENTRIES,
+    max_bytes=settings.QUERY_CACHE_MAX_BYTES,
+    ttl=settings.QUERY_CACHE_TTL,
+)
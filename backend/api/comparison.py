@@ -0,0 +1,117 @@
+"""
+N-way comparison of locations on a shared year axis.
+The rows of every requested location are gathered by position from the
+location index and pivoted (location x year) in one vectorized pass, so
+years missing for a location stay empty instead of shifting its series.
+"""
+
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .aggregates import RATE_COLUMN
+from .indexes import LocationIndex, normalize_location
+
+
+class Comparison:
+    """Aligned rate matrix for a set of locations."""
+
+    def __init__(self, areas: List[str], keys: List[str], years: np.ndarray, rates: np.ndarray):
+        """
+        Args:
+            areas: Area names as requested (found areas only, in request order)
+            keys: Normalized location keys matching ``areas``
+            years: Sorted years of the shared axis
+            rates: Mean rate per (area, year); NaN where an area has no data
+        """
+        self.areas = areas
+        self.keys = keys
+        self.years = years
+        self.rates = rates
+
+    def __len__(self) -> int:
+        return len(self.areas)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Return the matrix as a DataFrame (areas x years)."""
+        return pd.DataFrame(self.rates, index=self.areas, columns=self.years)
+
+    def chart(self) -> Dict[str, Any]:
+        """
+        Chart payload: the year axis and one aligned series per area.
+
+        Missing years are None so every series has one value per year.
+        """
+        values = self.rates.astype(object)
+        values[np.isnan(self.rates)] = None
+        return {
+            "years": [str(year) for year in self.years.tolist()],
+            "areas": {area: row.tolist() for area, row in zip(self.areas, values)},
+        }
+
+
+def compare_locations(
+    index: LocationIndex,
+    areas: List[str],
+    value_column: str = RATE_COLUMN,
+    year_from: Optional[int] = None,
+    year_to: Optional[int] = None,
+) -> Comparison:
+    """
+    Pivot the requested locations onto a shared year axis.
+
+    The axis is the union of the years present for the requested areas.
+    Duplicate rows for the same (location, year) are averaged. Unknown
+    areas and repeats of the same area are left out. Only rows inside the
+    year window are gathered.
+
+    Args:
+        index: Location index of the dataset
+        areas: Area names in any casing
+        value_column: Column to compare
+        year_from: First year to include (None for no lower bound)
+        year_to: Last year to include (None for no upper bound)
+
+    Returns:
+        Comparison for the areas that have data
+    """
+    found: List[str] = []
+    keys: List[str] = []
+    slices = []
+    seen = set()
+    for area in areas:
+        key = normalize_location(area)
+        block = index.window(key, year_from, year_to)
+        if block is None or key in seen:
+            continue
+        seen.add(key)
+        found.append(area)
+        keys.append(key)
+        slices.append(block)
+
+    df = index.df
+    if not slices or df is None or 'year' not in df.columns or value_column not in df.columns:
+        return Comparison(found, keys, np.array([], dtype=int), np.empty((len(found), 0)))
+
+    # Row positions of every requested area, plus which area each belongs to
+    lengths = np.array([block.stop - block.start for block in slices])
+    starts = np.array([block.start for block in slices])
+    offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    positions = np.repeat(starts, lengths) + offsets
+    area_codes = np.repeat(np.arange(len(slices)), lengths)
+
+    years = df['year'].to_numpy()[positions]
+    values = df[value_column].to_numpy()[positions].astype(float)
+    valid = ~(pd.isna(years) | np.isnan(values))
+    years, values, area_codes = years[valid].astype(int), values[valid], area_codes[valid]
+
+    axis, year_codes = np.unique(years, return_inverse=True)
+    shape = (len(slices), len(axis))
+    totals = np.zeros(shape)
+    counts = np.zeros(shape)
+    np.add.at(totals, (area_codes, year_codes), values)
+    np.add.at(counts, (area_codes, year_codes), 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rates = totals / counts
+    return Comparison(found, keys, axis, rates)
@@ -0,0 +1,119 @@
+"""
+Immutable, fully indexed versions of the real estate dataset.
+A Dataset is built completely before it is published, so readers never
+see a half-loaded frame or indexes from a different version.
+"""
+
+import hashlib
+import os
+from typing import Any, Dict, Iterable, Optional
+
+import pandas as pd
+from django.conf import settings
+
+from .aggregates import location_metrics
+from .indexes import AreaMatcher, LocationIndex, prepare_dataset
+from .prompts import compile_data_blocks
+from .rankings import Leaderboard
+from .schema import compact_frame
+from .snapshot import load_dataset, snapshot_key
+
+
+def prepare_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Compact a freshly parsed workbook and sort it for the indexes."""
+    return prepare_dataset(compact_frame(df))
+
+
+class Dataset:
+    """One version of the data: the frame, its derived indexes and aggregates, and a version id."""
+
+    def __init__(self, df: pd.DataFrame, version: str, load_info: Optional[Dict[str, Any]] = None):
+        """
+        Build all derived structures for a frame.
+
+        Args:
+            df: Loaded dataset
+            version: Identifier of this data version (used in cache keys)
+            load_info: Details about where and how the frame was loaded
+        """
+        self.version = version
+        self.load_info = load_info or {}
+        self.location_index = LocationIndex(df)
+        # Rows are reordered so each location is one contiguous block
+        self.df = self.location_index.df
+        self.rows = len(self.df)
+        self.area_matcher = AreaMatcher(self.location_index.names)
+        # One row of precomputed metrics per location, keyed by normalized name
+        self.metrics = location_metrics(self.df, self.location_index.keys)
+        self.metric_rows = self.metrics.to_dict('index')
+        # Per-metric sorted orders of the locations (see api/rankings.py)
+        self.leaderboard = Leaderboard(self.metrics)
+        # LLM prompt data block per location, rendered once per version
+        self.prompt_blocks = compile_data_blocks(
+            self.df, self.location_index.blocks, settings.LLM_PROMPT_MAX_CHARS
+        )
+        # Encoded JSON of each location's table, filled on first use
+        self.table_fragments: Dict[str, bytes] = {}
+        # Resident size of the frame (memory-mapped columns count in full)
+        self.memory_bytes = int(self.df.memory_usage(deep=True, index=False).sum())
+
+    @classmethod
+    def from_file(cls, file_path: str, mmap_mode: Optional[str] = None) -> 'Dataset':
+        """
+        Load and index a data file (via the columnar snapshot cache).
+
+        A freshly parsed workbook is compacted (see api/schema.py) before
+        it is snapshotted, so snapshot hits come back compact.
+
+        Args:
+            file_path: Source workbook path
+            mmap_mode: Memory-map mode for snapshot columns
+
+        Returns:
+            Dataset versioned by the source file fingerprint
+
+        Raises:
+            Exception: If the file cannot be read or parsed
+        """
+        df, load_info = load_dataset(file_path, prepare=prepare_frame, mmap_mode=mmap_mode)
+        return cls(df, snapshot_key(load_info["source"]), load_info)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'Dataset':
+        """
+        Compact and wrap an in-memory frame, versioned by a hash of its contents.
+
+        Args:
+            df: Dataset (any extra columns are dropped, see api/schema.py)
+
+        Returns:
+            Dataset for the frame
+        """
+        df = compact_frame(df)
+        digest = hashlib.sha256(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+        return cls(df, f"frame-{digest.hexdigest()[:16]}", {"source": None})
+
+    def index_for(self, areas: Iterable[str]) -> LocationIndex:
+        """Location index covering the given areas (the whole dataset's)."""
+        return self.location_index
+
+    def is_stale(self, file_path: str) -> bool:
+        """
+        Check whether the source file changed since this version was loaded.
+
+        Only size and mtime are compared, so the check is a single stat call.
+
+        Args:
+            file_path: Source workbook path
+
+        Returns:
+            True if the file differs from the one this dataset came from
+            (or appeared after an in-memory fallback was loaded)
+        """
+        if not os.path.exists(file_path):
+            return False
+        source = self.load_info.get("source")
+        if not source:
+            return True
+        stat = os.stat(file_path)
+        return (stat.st_size, stat.st_mtime_ns) != (source["size"], source["mtime_ns"])
@@ -0,0 +1,289 @@
+"""
+Lookup structures precomputed once per dataset load.
+Keeps per-request work independent of the number of rows.
+"""
+
+from collections import deque
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+LOCATION_COLUMN = 'final location'
+
+
+def normalize_location(name: Any) -> str:
+    """
+    Normalize a location name for case- and whitespace-insensitive lookup.
+
+    Args:
+        name: Raw location name
+
+    Returns:
+        Lowercased name with internal whitespace collapsed
+    """
+    return " ".join(str(name).split()).lower()
+
+
+def location_keys(series: pd.Series) -> np.ndarray:
+    """
+    Normalize a location column into lookup keys.
+
+    Categorical columns are normalized once per category rather than
+    once per row.
+
+    Args:
+        series: Column of location names
+
+    Returns:
+        Object array of normalized keys ('' for missing values)
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        categories = np.array(
+            [normalize_location(name) for name in series.cat.categories] + [''],
+            dtype=object,
+        )
+        # Missing values have code -1, which selects the trailing ''
+        return categories[series.cat.codes.to_numpy()]
+    return series.fillna('').astype(str).str.split().str.join(' ').str.lower().to_numpy()
+
+
+def sort_by_location(df: pd.DataFrame, column: str = LOCATION_COLUMN) -> pd.DataFrame:
+    """
+    Stably sort a frame by normalized location and year.
+
+    Frames that are already in that order are returned unchanged, without
+    copying, so memory-mapped snapshots stay memory-mapped.
+
+    Args:
+        df: Dataset
+        column: Column holding location names
+
+    Returns:
+        Frame with each location in one contiguous block
+    """
+    if df is None or column not in df.columns:
+        return df
+
+    order_frame = pd.DataFrame({'key': location_keys(df[column])})
+    if 'year' in df.columns:
+        order_frame['year'] = df['year'].to_numpy()
+    order = order_frame.sort_values(list(order_frame.columns), kind='mergesort').index.to_numpy()
+    if np.array_equal(order, np.arange(len(df))):
+        return df
+    return df.take(order).reset_index(drop=True)
+
+
+def prepare_dataset(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Put a freshly parsed frame into the layout the indexes expect.
+
+    Rows are sorted by location and year, and the location and city
+    columns become categoricals (integer codes into a string table), so
+    snapshots can be memory-mapped and indexed without reordering.
+
+    Args:
+        df: Parsed dataset
+
+    Returns:
+        Prepared frame
+    """
+    df = sort_by_location(df)
+    for column in (LOCATION_COLUMN, 'city'):
+        if column in df.columns and df[column].dtype == object:
+            df[column] = df[column].astype('category')
+    return df
+
+
+class LocationIndex:
+    """
+    Partition index mapping each normalized location to its row block.
+
+    The source frame is stably sorted by location (and year, when present)
+    so every location occupies one contiguous positional slice. Lookups
+    are a dict access plus an ``iloc`` slice instead of a column scan, and
+    a year window within a block is a binary search on its sorted years.
+    """
+
+    def __init__(self, df: pd.DataFrame, column: str = LOCATION_COLUMN):
+        """
+        Sort the frame and record the slice of every location.
+
+        Args:
+            df: Raw dataset
+            column: Column holding location names
+        """
+        self.column = column
+        self.blocks: Dict[str, slice] = {}
+        self.names: Dict[str, str] = {}
+        self.keys = None
+        self.years = None
+        self.df = sort_by_location(df, column)
+
+        if self.df is None or column not in self.df.columns or len(self.df) == 0:
+            return
+
+        sorted_keys = location_keys(self.df[column])
+        # Normalized key of every row, reused by derived tables
+        self.keys = sorted_keys
+        if 'year' in self.df.columns:
+            self.years = self.df['year'].to_numpy()
+        starts = np.concatenate(([0], np.flatnonzero(sorted_keys[1:] != sorted_keys[:-1]) + 1))
+        stops = np.append(starts[1:], len(sorted_keys))
+        raw_names = self.df[column].to_numpy()
+        for start, stop in zip(starts, stops):
+            key = sorted_keys[start]
+            if key:
+                self.blocks[key] = slice(int(start), int(stop))
+                self.names[key] = raw_names[start]
+
+    def get(
+        self,
+        area: str,
+        year_from: Optional[int] = None,
+        year_to: Optional[int] = None,
+        columns: Optional[Sequence[str]] = None,
+    ) -> Optional[pd.DataFrame]:
+        """
+        Return the rows for an area, or None if the area is unknown.
+
+        Args:
+            area: Area name in any casing
+            year_from: First year to include (None for no lower bound)
+            year_to: Last year to include (None for no upper bound)
+            columns: Columns to materialize (None for all; missing ones are skipped)
+
+        Returns:
+            Rows of the area in the year window (a positional slice of the
+            sorted frame)
+        """
+        block = self.window(area, year_from, year_to)
+        if block is None:
+            return None
+        if columns is None:
+            return self.df.iloc[block]
+        positions = [self.df.columns.get_loc(name) for name in columns if name in self.df.columns]
+        return self.df.iloc[block, positions]
+
+    def window(self, area: str, year_from: Optional[int] = None, year_to: Optional[int] = None) -> Optional[slice]:
+        """
+        Positions of an area's rows within an inclusive year window.
+
+        Args:
+            area: Area name in any casing
+            year_from: First year to include (None for no lower bound)
+            year_to: Last year to include (None for no upper bound)
+
+        Returns:
+            Slice of the sorted frame, or None if the area is unknown
+        """
+        block = self.blocks.get(normalize_location(area))
+        if block is None or self.years is None or (year_from is None and year_to is None):
+            return block
+        years = self.years[block]
+        start = np.searchsorted(years, year_from, 'left') if year_from is not None else 0
+        stop = np.searchsorted(years, year_to, 'right') if year_to is not None else len(years)
+        return slice(block.start + int(start), block.start + max(int(start), int(stop)))
+
+    def year_bounds(self, area: str) -> Optional[Tuple[int, int]]:
+        """First and last year of an area, or None if unknown or without years."""
+        block = self.blocks.get(normalize_location(area))
+        if block is None or self.years is None or block.stop == block.start:
+            return None
+        return int(self.years[block.start]), int(self.years[block.stop - 1])
+
+
+class AreaMatcher:
+    """
+    Aho-Corasick automaton over normalized location names.
+
+    Scans a message once, in time linear in its length, and reports
+    whole-word location mentions. Overlapping candidates are resolved
+    leftmost-longest, so "Ambegaon Budruk" does not also report a shorter
+    location such as "Ambegaon".
+    """
+
+    def __init__(self, names: Dict[str, str]):
+        """
+        Build the automaton.
+
+        Args:
+            names: Mapping of normalized location name to display name
+        """
+        self.names = dict(names)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Patterns ending at each state, own and inherited via fail links
+        self._out: List[List[str]] = [[]]
+
+        for key in self.names:
+            self._add(key)
+        self._link()
+
+    def _add(self, key: str) -> None:
+        """Insert one pattern into the trie."""
+        state = 0
+        for char in key:
+            nxt = self._goto[state].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append(key)
+
+    def _link(self) -> None:
+        """Compute failure links breadth-first and merge outputs."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find(self, message: str) -> List[str]:
+        """
+        Find location mentions in a message.
+
+        Args:
+            message: User query message
+
+        Returns:
+            Display names of matched locations, in order of first mention
+        """
+        text = normalize_location(message)
+        candidates = []
+        state = 0
+        for end, char in enumerate(text, start=1):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for key in self._out[state]:
+                start = end - len(key)
+                if _is_boundary(text, start - 1) and _is_boundary(text, end):
+                    candidates.append((start, -len(key), key))
+
+        found = []
+        seen = set()
+        covered = 0
+        for start, neg_length, key in sorted(candidates):
+            if start < covered:
+                continue
+            covered = start - neg_length
+            if key not in seen:
+                seen.add(key)
+                found.append(self.names[key])
+        return found
+
+
+def _is_boundary(text: str, pos: int) -> bool:
+    """Return True if position ``pos`` of ``text`` is outside any word."""
+    return pos < 0 or pos >= len(text) or not text[pos].isalnum()
@@ -0,0 +1,227 @@
+"""
+Background LLM summary jobs.
+Slow HuggingFace calls run on a small bounded thread pool so request
+threads never wait on them. Job state lives in the shared summary cache,
+so any worker can answer a poll for a job started by another worker.
+
+Under ASGI the worker's event loop is bound with ``bind_loop`` and job
+bodies may be coroutines: they then run on that loop, where each waiting
+HuggingFace call costs a socket rather than a thread.
+"""
+
+import asyncio
+import inspect
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Optional
+
+from .offload import run_sync
+
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+
+
+def summary_job_id(cache_key: str) -> str:
+    """
+    Derive a job id from a summary cache key.
+
+    Identical requests map to the same job, so a summary that is already
+    being generated is not requested twice.
+    """
+    return cache_key.split(':', 1)[-1][:32]
+
+
+class SummaryJobs:
+    """Bounded executor plus a cross-worker record of job outcomes."""
+
+    def __init__(self, store_alias: str = 'summaries-shared', fallback_alias: str = 'summaries-local'):
+        """
+        Args:
+            store_alias: Cache alias shared by all workers for job records
+            fallback_alias: In-process cache holding this worker's own job
+                records (and all of them when the shared one fails)
+        """
+        self.store_alias = store_alias
+        self.fallback_alias = fallback_alias
+        self._lock = threading.Lock()
+        self._executor = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._running: Dict[str, Future] = {}
+
+    def bind_loop(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Run coroutine job bodies on ``loop`` (the ASGI worker's event loop)."""
+        self._loop = loop
+
+    @property
+    def event_loop(self) -> Optional[asyncio.AbstractEventLoop]:
+        """The bound event loop, if it is still running."""
+        loop = self._loop
+        if loop is None or loop.is_closed() or not loop.is_running():
+            return None
+        return loop
+
+    def _store_get(self, key: str) -> Optional[Dict[str, Any]]:
+        # Jobs run by this worker are answered locally; the shared store may
+        # have dropped a write (DatabaseCache ignores errors such as a locked
+        # SQLite table)
+        record = caches[self.fallback_alias].get(key)
+        if record is not None:
+            return record
+        try:
+            return caches[self.store_alias].get(key)
+        except Exception as e:
+            logger.warning("Job store read failed: %s", e)
+            return None
+
+    def _store_set(self, key: str, record: Dict[str, Any]) -> None:
+        timeout = settings.SUMMARY_JOB_TTL
+        caches[self.fallback_alias].set(key, record, timeout)
+        try:
+            caches[self.store_alias].set(key, record, timeout)
+        except Exception as e:
+            logger.warning("Job store write failed: %s", e)
+
+    def submit(self, job_id: str, fn: Callable[..., Any], *args: Any) -> bool:
+        """
+        Run ``fn(*args)`` in the background under ``job_id``.
+
+        ``fn`` must return a ``(status, summary)`` tuple where status is
+        DONE or FAILED. A coroutine function runs on the bound event loop
+        (see bind_loop) and is limited by LLM_ASYNC_MAX_PENDING instead of
+        LLM_MAX_PENDING.
+
+        Args:
+            job_id: Job identifier (see summary_job_id)
+            fn: Job body
+            *args: Arguments for the job body
+
+        Returns:
+            True if the job is running (newly or already), False if the
+            executor is saturated and the job was not accepted
+        """
+        is_async = inspect.iscoroutinefunction(fn)
+        loop = self.event_loop if is_async else None
+        if is_async and loop is None:
+            raise RuntimeError("async summary job submitted without a running event loop")
+        limit = settings.LLM_ASYNC_MAX_PENDING if is_async else settings.LLM_MAX_PENDING
+        with self._lock:
+            if job_id in self._running:
+                return True
+            if len(self._running) >= limit:
+                return False
+            self._store_set(self._key(job_id), {"status": PENDING, "summary": None})
+            if is_async:
+                self._running[job_id] = asyncio.run_coroutine_threadsafe(self._arun(job_id, fn, args), loop)
+                return True
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=settings.LLM_MAX_WORKERS, thread_name_prefix='llm-summary'
+                )
+            self._running[job_id] = self._executor.submit(self._run, job_id, fn, args)
+        return True
+
+    def _run(self, job_id: str, fn: Callable[..., Any], args: tuple) -> None:
+        try:
+            status, summary = fn(*args)
+        except Exception as e:
+            print(f"[LLM] Summary job {job_id} failed: {e}")
+            status, summary = FAILED, None
+        # Publish before leaving the running set so a resubmit never sees a stale pending record
+        self._store_set(self._key(job_id), {"status": status, "summary": summary})
+        with self._lock:
+            self._running.pop(job_id, None)
+
+    async def _arun(self, job_id: str, fn: Callable[..., Any], args: tuple) -> None:
+        try:
+            status, summary = await fn(*args)
+        except Exception as e:
+            print(f"[LLM] Summary job {job_id} failed: {e}")
+            status, summary = FAILED, None
+        await run_sync(self._store_set, self._key(job_id), {"status": status, "summary": summary})
+        with self._lock:
+            self._running.pop(job_id, None)
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a job.
+
+        Args:
+            job_id: Job identifier
+
+        Returns:
+            Record with ``status`` and ``summary``, or None if unknown
+        """
+        return self._store_get(self._key(job_id))
+
+    def wait(self, job_id: str, timeout: float) -> Optional[Dict[str, Any]]:
+        """
+        Long-poll a job until it leaves the pending state or time runs out.
+
+        Args:
+            job_id: Job identifier
+            timeout: Maximum seconds to wait
+
+        Returns:
+            Latest job record, or None if unknown
+        """
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            future = self._running.get(job_id)
+        if future is not None:
+            try:
+                future.exception(timeout=max(0.0, deadline - time.monotonic()))
+            except FutureTimeoutError:
+                pass
+
+        record = self.status(job_id)
+        while record is not None and record["status"] == PENDING and time.monotonic() < deadline:
+            time.sleep(0.25)
+            record = self.status(job_id)
+        return record
+
+    async def await_job(self, job_id: str, timeout: float) -> Optional[Dict[str, Any]]:
+        """
+        Async version of wait: long-poll without holding a thread.
+
+        Args:
+            job_id: Job identifier
+            timeout: Maximum seconds to wait
+
+        Returns:
+            Latest job record, or None if unknown
+        """
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            future = self._running.get(job_id)
+        if future is not None:
+            try:
+                await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+        record = await run_sync(self.status, job_id)
+        while record is not None and record["status"] == PENDING and time.monotonic() < deadline:
+            await asyncio.sleep(0.25)
+            record = await run_sync(self.status, job_id)
+        return record
+
+    def running(self) -> int:
+        """Number of jobs queued or running in this process."""
+        with self._lock:
+            return len(self._running)
+
+    @staticmethod
+    def _key(job_id: str) -> str:
+        return f"summary-job:{job_id}"
+
+
+summary_jobs = SummaryJobs()
@@ -0,0 +1,379 @@
+"""
+HTTP client for the HuggingFace Inference API.
+Keeps a pooled keep-alive session and a circuit breaker, so an outage costs
+one timeout per cool-down window instead of one per request.
+
+The ``a``-prefixed methods are the async equivalents for ASGI deployments:
+they share the circuit breaker but use an httpx connection pool bound to
+the worker's event loop, so hundreds of calls can wait without a thread each.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Tuple
+
+import httpx
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+
+class LLMError(Exception):
+    """Raised when the HuggingFace API cannot produce a summary."""
+
+    def __init__(self, message: str, reason: str = "error"):
+        super().__init__(message)
+        # Short machine-readable cause: "410", "503", "timeout", "circuit_open", ...
+        self.reason = reason
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    closed:    calls go through; failures are counted
+    open:      calls are refused until the cool-down expires
+    half_open: one trial call is let through; success closes the circuit,
+               failure opens it again
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, cooldown: float):
+        """
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            cooldown: Seconds to stay open before allowing a trial call
+        """
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._last_reason = None
+
+    def allow(self) -> bool:
+        """Return True if a call may be attempted now."""
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+                self._state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        """Close the circuit after a successful call."""
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self, reason: str, trip: bool = False) -> None:
+        """
+        Count a failed call.
+
+        Args:
+            reason: Failure cause, kept for the debug endpoint
+            trip: Open the circuit immediately (e.g. endpoint gone)
+        """
+        with self._lock:
+            self._failures += 1
+            self._last_reason = reason
+            self._trial_in_flight = False
+            if trip or self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def abandon(self) -> None:
+        """Forget an unfinished trial call (e.g. a stream closed by the consumer)."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def is_open(self) -> bool:
+        """Return True if calls are currently being refused."""
+        with self._lock:
+            return self._state == self.OPEN and time.monotonic() - self._opened_at < self.cooldown
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Describe the breaker state for diagnostics."""
+        with self._lock:
+            retry_in = 0.0
+            if self._state == self.OPEN:
+                retry_in = max(0.0, self.cooldown - (time.monotonic() - self._opened_at))
+            return {
+                "state": self._state,
+                "consecutive_failures": self._failures,
+                "last_failure": self._last_reason,
+                "retry_in_seconds": round(retry_in, 1),
+            }
+
+
+class LLMClient:
+    """Pooled, circuit-broken client for HuggingFace text generation."""
+
+    def __init__(self):
+        self._session = None
+        self._session_lock = threading.Lock()
+        self._async_client = None
+        self._async_loop = None
+        self.breaker = CircuitBreaker(
+            failure_threshold=settings.LLM_BREAKER_FAILURES,
+            cooldown=settings.LLM_BREAKER_COOLDOWN,
+        )
+
+    @property
+    def session(self) -> requests.Session:
+        """Shared keep-alive session (created on first use)."""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(
+                        pool_connections=1,
+                        pool_maxsize=settings.LLM_POOL_SIZE,
+                    )
+                    session.mount('http://', adapter)
+                    session.mount('https://', adapter)
+                    self._session = session
+        return self._session
+
+    def async_client(self) -> httpx.AsyncClient:
+        """
+        Shared async connection pool for the running event loop.
+
+        httpx pools cannot be used across event loops; a new one is created
+        if the loop changed (only happens outside a long-lived ASGI worker).
+        """
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_loop is not loop:
+            self._async_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=settings.LLM_ASYNC_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.LLM_ASYNC_MAX_CONNECTIONS,
+                ),
+                timeout=httpx.Timeout(settings.LLM_READ_TIMEOUT, connect=settings.LLM_CONNECT_TIMEOUT),
+            )
+            self._async_loop = loop
+        return self._async_client
+
+    @property
+    def timeout(self):
+        return (settings.LLM_CONNECT_TIMEOUT, settings.LLM_READ_TIMEOUT)
+
+    def _url(self, model_name: str) -> str:
+        return f"{settings.HUGGINGFACE_API_URL}/{model_name}"
+
+    def _headers(self, stream: bool = False) -> Dict[str, str]:
+        headers = {
+            "Authorization": f"Bearer {settings.HUGGINGFACE_API_KEY}",
+            "Content-Type": "application/json",
+        }
+        if stream:
+            headers["Accept"] = "text/event-stream"
+        return headers
+
+    def _check_open(self) -> None:
+        if not self.breaker.allow():
+            raise LLMError("circuit open, skipping HuggingFace call", reason="circuit_open")
+
+    def _fail(self, message: str, reason: str, trip: bool = False) -> LLMError:
+        self.breaker.record_failure(reason, trip=trip)
+        return LLMError(message, reason=reason)
+
+    def _check_status(self, response) -> None:
+        if response.status_code == 200:
+            return
+        if response.status_code == 410:
+            # Endpoint gone: no point retrying until the cool-down passes
+            raise self._fail("HuggingFace API endpoint deprecated (410)", "410", trip=True)
+        if response.status_code == 503:
+            raise self._fail("HuggingFace model is loading (503)", "503")
+        raise self._fail(f"HF API error {response.status_code}", str(response.status_code))
+
+    def generate(self, prompt: str, parameters: Dict[str, Any], model_name: str) -> str:
+        """
+        Generate text for a prompt.
+
+        Args:
+            prompt: Model input
+            parameters: Generation parameters
+            model_name: HuggingFace model id
+
+        Returns:
+            Generated continuation with the prompt removed
+
+        Raises:
+            LLMError: On any failure, including an open circuit
+        """
+        self._check_open()
+        try:
+            response = self.session.post(
+                self._url(model_name),
+                headers=self._headers(),
+                json={"inputs": prompt, "parameters": parameters},
+                timeout=self.timeout,
+            )
+        except requests.exceptions.Timeout:
+            raise self._fail("HuggingFace API timeout", "timeout")
+        except requests.exceptions.RequestException as e:
+            raise self._fail(f"HuggingFace API error: {e}", "connection")
+
+        return self._generated_text(response, prompt)
+
+    async def agenerate(self, prompt: str, parameters: Dict[str, Any], model_name: str) -> str:
+        """
+        Async version of generate (same arguments, result and errors).
+        """
+        self._check_open()
+        try:
+            response = await self.async_client().post(
+                self._url(model_name),
+                headers=self._headers(),
+                json={"inputs": prompt, "parameters": parameters},
+            )
+        except httpx.TimeoutException:
+            raise self._fail("HuggingFace API timeout", "timeout")
+        except httpx.HTTPError as e:
+            raise self._fail(f"HuggingFace API error: {e}", "connection")
+        except asyncio.CancelledError:
+            self.breaker.abandon()
+            raise
+
+        return self._generated_text(response, prompt)
+
+    def _generated_text(self, response, prompt: str) -> str:
+        """Check a generation response and extract its text."""
+        self._check_status(response)
+        try:
+            result = response.json()
+        except ValueError:
+            raise self._fail("HuggingFace API returned invalid JSON", "bad_response")
+        if not isinstance(result, list) or len(result) == 0 or not isinstance(result[0], dict):
+            raise self._fail(f"Unexpected HF response format: {result}", "bad_response")
+        generated_text = result[0].get('generated_text', '')
+        if not isinstance(generated_text, str):
+            raise self._fail(f"Unexpected HF response format: {result}", "bad_response")
+
+        self.breaker.record_success()
+        # Remove the prompt from the response
+        return generated_text.replace(prompt, '').strip()
+
+    def _stream_event(self, line: str) -> Tuple[Optional[str], bool]:
+        """
+        Parse one line of a token stream.
+
+        Returns:
+            Tuple of (token text or None, whether this was the final event)
+        """
+        if not line or not line.startswith('data:'):
+            return None, False
+        event = json.loads(line[len('data:'):].strip())
+        if 'error' in event:
+            raise self._fail(f"HF stream error: {event['error']}", "stream_error")
+        token = event.get('token') or {}
+        text = token['text'] if token.get('text') and not token.get('special') else None
+        if event.get('generated_text') is not None:
+            # Final event of the stream
+            self.breaker.record_success()
+            return text, True
+        return text, False
+
+    def stream(self, prompt: str, parameters: Dict[str, Any], model_name: str) -> Iterator[str]:
+        """
+        Stream generated tokens for a prompt.
+
+        Args:
+            prompt: Model input
+            parameters: Generation parameters
+            model_name: HuggingFace model id
+
+        Yields:
+            Generated text fragments as they arrive
+
+        Raises:
+            LLMError: On any failure, including an open circuit or a stream
+                that ends before its final event
+        """
+        self._check_open()
+        payload = {"inputs": prompt, "parameters": parameters, "stream": True}
+        try:
+            with self.session.post(
+                self._url(model_name),
+                headers=self._headers(stream=True),
+                json=payload,
+                stream=True,
+                timeout=self.timeout,
+            ) as response:
+                self._check_status(response)
+                # chunk_size=None hands over each chunk as soon as it arrives
+                for line in response.iter_lines(chunk_size=None, decode_unicode=True):
+                    text, final = self._stream_event(line)
+                    if text:
+                        yield text
+                    if final:
+                        return
+                raise self._fail("HF stream ended before the final event", "stream_error")
+        except GeneratorExit:
+            self.breaker.abandon()
+            raise
+        except requests.exceptions.Timeout:
+            raise self._fail("HuggingFace API timeout", "timeout")
+        except requests.exceptions.RequestException as e:
+            raise self._fail(f"HuggingFace API error: {e}", "connection")
+        except ValueError as e:
+            raise self._fail(f"HF stream sent invalid JSON: {e}", "bad_response")
+
+    async def astream(self, prompt: str, parameters: Dict[str, Any], model_name: str) -> AsyncIterator[str]:
+        """
+        Async version of stream (same arguments, tokens and errors).
+        """
+        self._check_open()
+        payload = {"inputs": prompt, "parameters": parameters, "stream": True}
+        try:
+            async with self.async_client().stream(
+                'POST',
+                self._url(model_name),
+                headers=self._headers(stream=True),
+                json=payload,
+            ) as response:
+                self._check_status(response)
+                async for line in response.aiter_lines():
+                    text, final = self._stream_event(line)
+                    if text:
+                        yield text
+                    if final:
+                        return
+                raise self._fail("HF stream ended before the final event", "stream_error")
+        except (GeneratorExit, asyncio.CancelledError):
+            self.breaker.abandon()
+            raise
+        except httpx.TimeoutException:
+            raise self._fail("HuggingFace API timeout", "timeout")
+        except httpx.HTTPError as e:
+            raise self._fail(f"HuggingFace API error: {e}", "connection")
+        except ValueError as e:
+            raise self._fail(f"HF stream sent invalid JSON: {e}", "bad_response")
+
+
+_client: Optional[LLMClient] = None
+_client_lock = threading.Lock()
+
+
+def get_llm_client() -> LLMClient:
+    """Return the process-wide LLM client."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = LLMClient()
+    return _client
@@ -0,0 +1,54 @@
+"""
+Benchmark the comparison engine against the per-area filter loop it replaced.
+"""
+
+import pandas as pd
+from django.core.management.base import BaseCommand
+
+from api.aggregates import RATE_COLUMN
+from api.benchmarking import best_of
+from api.comparison import compare_locations
+from api.indexes import LOCATION_COLUMN, LocationIndex
+from api.synthetic import generate_frame
+
+
+def legacy_trend(df: pd.DataFrame, areas):
+    """The pre-pivot implementation: one column scan per area, unaligned lists."""
+    years = sorted(df['year'].unique())
+    result = {"years": [str(y) for y in years], "areas": {}}
+    for area in areas:
+        area_data = df[df[LOCATION_COLUMN].str.lower() == area.lower()]
+        if not area_data.empty:
+            trend = area_data[['year', RATE_COLUMN]].sort_values('year').dropna()
+            result["areas"][area] = trend[RATE_COLUMN].tolist()
+    return result
+
+
+class Command(BaseCommand):
+    help = "Time N-way comparisons (pivot engine vs. per-area filtering) on synthetic data."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--areas', type=int, nargs='+', default=[2, 10, 100],
+                            help="Numbers of areas per comparison")
+        parser.add_argument('--locations', type=int, default=2000, help="Locations in the synthetic dataset")
+        parser.add_argument('--years', type=int, default=15, help="Years per location")
+        parser.add_argument('--gap-rate', type=float, default=0.1, help="Share of missing (location, year) rows")
+        parser.add_argument('--repeat', type=int, default=5, help="Runs per measurement (best is reported)")
+
+    def handle(self, *args, **options):
+        df = generate_frame(localities=options['locations'], years=options['years'], gap_rate=options['gap_rate'])
+        index = LocationIndex(df)
+        names = list(index.names.values())
+        self.stdout.write(
+            f"Synthetic dataset: {len(df)} rows, {len(names)} locations, {options['years']} years, "
+            f"{options['gap_rate']:.0%} missing"
+        )
+        self.stdout.write(f"{'areas':>6} {'engine ms':>10} {'legacy ms':>10} {'speedup':>8}")
+
+        for count in options['areas']:
+            areas = names[:count]
+            engine = best_of(lambda: compare_locations(index, areas).chart(), options['repeat'])
+            legacy = best_of(lambda: legacy_trend(df, areas), options['repeat'])
+            self.stdout.write(
+                f"{len(areas):>6} {engine * 1000:>10.2f} {legacy * 1000:>10.2f} {legacy / engine:>7.1f}x"
+            )
@@ -0,0 +1,53 @@
+"""
+Benchmark query response rendering: DRF serializer + JSONRenderer vs. the fast path.
+"""
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from api.benchmarking import best_of
+from api.dataset import Dataset
+from api.renderers import dumps
+from api.serializers import QueryResponseSerializer, query_response_payload
+from api.services import RealEstateService
+from api.synthetic import generate_frame
+
+
+class Command(BaseCommand):
+    help = "Time comparison-response rendering through DRF serializers and through the orjson fast path."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--areas', type=int, nargs='+', default=[2, 10, 100],
+                            help="Numbers of areas per comparison")
+        parser.add_argument('--locations', type=int, default=500, help="Locations in the synthetic dataset")
+        parser.add_argument('--years', type=int, default=15, help="Years per location")
+        parser.add_argument('--repeat', type=int, default=5, help="Runs per measurement (best is reported)")
+
+    def handle(self, *args, **options):
+        dataset = Dataset.from_frame(
+            generate_frame(localities=options['locations'], years=options['years'], gap_rate=0.1)
+        )
+        service = RealEstateService()
+        names = list(dataset.location_index.names.values())
+        repeat = options['repeat']
+        self.stdout.write(f"Synthetic dataset: {len(dataset.df)} rows, {len(names)} locations")
+        self.stdout.write(
+            f"{'areas':>6} {'KB':>8} {'drf ms':>8} {'fast ms':>8} {'cached ms':>10} {'speedup':>8}"
+        )
+
+        with service.pinned(dataset):
+            for count in options['areas']:
+                areas = names[:count]
+                rows = service.analyze_intent(True, areas, background_summary=False)
+                drf_body = JSONRenderer().render(QueryResponseSerializer(rows).data)
+                drf = best_of(lambda: JSONRenderer().render(QueryResponseSerializer(rows).data), repeat)
+                # Fast path from row lists, then with the per-area table fragments in place
+                fast = best_of(lambda: dumps(query_response_payload(rows)), repeat)
+                fragments = service.analyze_intent(True, areas, background_summary=False, fragments=True)
+                cached = best_of(lambda: dumps(query_response_payload(fragments)), repeat)
+                if dumps(query_response_payload(fragments)) != drf_body:
+                    self.stderr.write(f"Output differs from the DRF path for {count} areas")
+                self.stdout.write(
+                    f"{count:>6} {len(drf_body) / 1024:>8.1f} {drf * 1000:>8.2f} {fast * 1000:>8.2f} "
+                    f"{cached * 1000:>10.3f} {drf / cached:>7.0f}x"
+                )
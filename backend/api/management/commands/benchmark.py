@@ -0,0 +1,180 @@
+"""
+Benchmark the data and query paths on synthetic datasets of several sizes.
+
+    python manage.py benchmark --sizes 1000 100000 --output bench.json
+    python manage.py benchmark --sizes 1000 100000 --baseline bench.json
+
+Results are written as JSON: one record per (rows, stage) with timing
+statistics, plus the environment they were measured in. With --baseline
+the run is compared stage by stage and fails if any median regressed by
+more than --tolerance.
+"""
+
+import itertools
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from rest_framework.renderers import JSONRenderer
+
+from api.benchmarking import environment, measure
+from api.dataset import Dataset
+from api.renderers import dumps
+from api.serializers import QueryResponseSerializer, query_response_payload
+from api.services import RealEstateService
+from api.snapshot import read_snapshot, write_snapshot
+from api.synthetic import frame_with_rows
+
+RESULTS_SCHEMA = 1
+
+
+class Command(BaseCommand):
+    help = "Time loading, area detection, filtering, analysis and rendering at several dataset sizes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 100_000, 10_000_000],
+                            help="Dataset sizes in rows")
+        parser.add_argument('--years', type=int, default=10, help="Years per locality")
+        parser.add_argument('--repeat', type=int, default=20, help="Timed runs per query stage")
+        parser.add_argument('--load-repeat', type=int, default=3, help="Timed runs per load stage")
+        parser.add_argument('--excel-max-rows', type=int, default=10_000,
+                            help="Also time Excel parsing up to this many rows (slow to write)")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', help="Write JSON results to this file ('-' for stdout)")
+        parser.add_argument('--baseline', help="JSON results of an earlier run to compare against")
+        parser.add_argument('--tolerance', type=float, default=0.25,
+                            help="Allowed median slowdown against the baseline (0.25 = 25%%)")
+
+    def handle(self, *args, **options):
+        # The benchmark measures the data path only; never call the LLM. Status
+        # prints from the service go to stderr so --output - stays valid JSON.
+        with override_settings(HUGGINGFACE_API_KEY=''), redirect_stdout(sys.stderr):
+            service = RealEstateService()
+            results = []
+            for rows in options['sizes']:
+                results.extend(self._run_size(service, rows, options))
+
+        report = {
+            "schema": RESULTS_SCHEMA,
+            "created": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            "environment": environment(),
+            "config": {key: options[key] for key in ('sizes', 'years', 'repeat', 'load_repeat', 'seed')},
+            "results": results,
+        }
+        self._write(report, options['output'])
+        if options['baseline']:
+            self._compare(report, options['baseline'], options['tolerance'])
+
+    def _log(self, message):
+        self.stderr.write(message, style_func=lambda text: text)
+
+    def _run_size(self, service, rows, options):
+        repeat = options['repeat']
+        load_repeat = options['load_repeat']
+        results = []
+
+        def record(stage, stats, **extra):
+            results.append({"rows": rows, "stage": stage, **stats, **extra})
+            self._log(f"  {stage:<28} median {stats['median_ms']:>10.3f} ms  p95 {stats['p95_ms']:>10.3f} ms")
+
+        start = time.perf_counter()
+        df = frame_with_rows(rows, years=options['years'], seed=options['seed'])
+        self._log(
+            f"{len(df)} rows, {df['final location'].nunique()} localities, {df['city'].nunique()} cities "
+            f"(generated in {time.perf_counter() - start:.1f} s)"
+        )
+
+        # Load: build the indexed dataset, snapshot round trip, Excel parse (small sizes only)
+        record("load.build_dataset", measure(lambda: Dataset.from_frame(df), load_repeat, warmup=0))
+        dataset = Dataset.from_frame(df)
+        workdir = tempfile.mkdtemp(prefix='benchmark-')
+        try:
+            fingerprint = {"synthetic_rows": rows, "seed": options['seed']}
+            record("load.snapshot_write", measure(
+                lambda: write_snapshot(dataset.df, fingerprint, root=workdir), load_repeat, warmup=0
+            ))
+            path = write_snapshot(dataset.df, fingerprint, root=workdir)
+            record("load.snapshot_read", measure(lambda: read_snapshot(path), load_repeat))
+            record("load.snapshot_read_mmap", measure(lambda: read_snapshot(path, mmap_mode='r'), load_repeat))
+            if rows <= options['excel_max_rows']:
+                workbook = os.path.join(workdir, 'data.xlsx')
+                df.to_excel(workbook, index=False)
+                record("load.excel_parse", measure(
+                    lambda: pd.read_excel(workbook, engine='openpyxl'), load_repeat, warmup=0
+                ))
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+        # Queries against the dataset, as a request would see it
+        rng = np.random.default_rng(options['seed'])
+        names = list(dataset.location_index.names.values())
+        picks = [names[i] for i in rng.integers(0, len(names), repeat)]
+        singles = [f"Analyze {name} price trends" for name in picks]
+        pairs = [f"Compare {a} and {b}" for a, b in zip(picks, reversed(picks)) if a != b] or singles
+        wide = "Compare " + ", ".join(names[:10])
+        cycle = {"single": itertools.cycle(singles), "pair": itertools.cycle(pairs), "area": itertools.cycle(picks)}
+
+        with service.pinned(dataset):
+            record("query.detect_areas", measure(lambda: service.detect_areas(next(cycle["single"])), repeat))
+            record("query.filter_by_area", measure(lambda: service.filter_by_area(next(cycle["area"])), repeat))
+            record("query.analyze_single", measure(
+                lambda: service.analyze_query(next(cycle["single"]), background_summary=False), repeat
+            ))
+            record("query.analyze_comparison", measure(
+                lambda: service.analyze_query(next(cycle["pair"]), background_summary=False), repeat
+            ))
+            record("query.analyze_comparison_10", measure(
+                lambda: service.analyze_query(wide, background_summary=False), repeat
+            ))
+
+            single = service.analyze_intent(False, [picks[0]], background_summary=False, fragments=True)
+            comparison = service.analyze_intent(True, names[:10], background_summary=False, fragments=True)
+            plain = service.analyze_intent(True, names[:10], background_summary=False)
+            size = len(dumps(query_response_payload(comparison)))
+            record("render.single_fast", measure(lambda: dumps(query_response_payload(single)), repeat))
+            record("render.comparison_10_fast", measure(
+                lambda: dumps(query_response_payload(comparison)), repeat
+            ), bytes=size)
+            record("render.comparison_10_drf", measure(
+                lambda: JSONRenderer().render(QueryResponseSerializer(plain).data), repeat
+            ), bytes=size)
+
+        return results
+
+    def _write(self, report, output):
+        if not output:
+            return
+        text = json.dumps(report, indent=2)
+        if output == '-':
+            sys.stdout.write(text + '\n')
+        else:
+            with open(output, 'w') as handle:
+                handle.write(text + '\n')
+            self._log(f"Results written to {output}")
+
+    def _compare(self, report, baseline_path, tolerance):
+        with open(baseline_path) as handle:
+            baseline = json.load(handle)
+        before = {(item["rows"], item["stage"]): item for item in baseline.get("results", [])}
+        regressions = []
+        self._log(f"Compared with {baseline_path} (commit {baseline.get('environment', {}).get('commit')}):")
+        for item in report["results"]:
+            previous = before.get((item["rows"], item["stage"]))
+            if previous is None or not previous["median_ms"]:
+                continue
+            ratio = item["median_ms"] / previous["median_ms"]
+            flag = "  REGRESSION" if ratio > 1 + tolerance else ""
+            self._log(f"  {item['rows']:>9} {item['stage']:<28} {ratio:>6.2f}x{flag}")
+            if flag:
+                regressions.append(f"{item['stage']} at {item['rows']} rows ({ratio:.2f}x)")
+        if regressions:
+            raise CommandError("Slower than baseline: " + ", ".join(regressions))
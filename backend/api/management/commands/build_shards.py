@@ -0,0 +1,59 @@
+"""
+Split the data workbook into one workbook per city for sharded serving.
+
+    python manage.py build_shards --path data/synthetic_data.xlsx --output data/cities
+    DATA_SHARD_DIR=data/cities python manage.py runserver
+
+Each city is written to <output>/<city>.xlsx, and its catalog entry and
+snapshot are built right away, so the first server start does not parse
+every shard (see api/shards.py).
+"""
+
+import os
+import re
+import time
+
+import pandas as pd
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.shards import catalog_entry
+
+
+def shard_name(city: str) -> str:
+    """File-system friendly shard name for a city."""
+    return re.sub(r'[^a-z0-9]+', '-', str(city).lower()).strip('-') or 'unknown'
+
+
+class Command(BaseCommand):
+    help = "Write one workbook per city from the data workbook and catalogue the shards."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default=settings.DATA_FILE_PATH,
+                            help="Source workbook (defaults to settings.DATA_FILE_PATH)")
+        parser.add_argument('--output', default=settings.DATA_SHARD_DIR,
+                            help="Shard directory (defaults to settings.DATA_SHARD_DIR)")
+
+    def handle(self, *args, **options):
+        path, output = options['path'], options['output']
+        if not output:
+            raise CommandError("No shard directory: pass --output or set DATA_SHARD_DIR")
+        if not os.path.exists(path):
+            raise CommandError(f"Data file not found: {path}")
+
+        df = pd.read_excel(path, engine='openpyxl')
+        if 'city' not in df.columns:
+            raise CommandError(f"{path} has no 'city' column to shard by")
+        os.makedirs(output, exist_ok=True)
+
+        groups = df.groupby(df['city'].fillna('unknown').map(shard_name), sort=True)
+        for name, rows in groups:
+            start = time.perf_counter()
+            target = os.path.join(output, f"{name}.xlsx")
+            rows.to_excel(target, index=False)
+            entry, _ = catalog_entry(name, target)
+            self.stdout.write(
+                f"✓ {target}: {entry['rows']} rows, {len(entry['locations'])} locations "
+                f"({time.perf_counter() - start:.1f} s)"
+            )
+        self.stdout.write(f"✓ {groups.ngroups} shards written to {output}")
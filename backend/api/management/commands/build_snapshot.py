@@ -0,0 +1,64 @@
+"""
+Rebuild the columnar snapshot of the data file.
+"""
+
+import os
+import shutil
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.dataset import prepare_frame
+from api.snapshot import (
+    load_dataset,
+    read_snapshot,
+    prune_snapshots,
+    snapshot_dir,
+    snapshot_key,
+    source_fingerprint,
+)
+
+
+class Command(BaseCommand):
+    help = "Convert the data workbook into a columnar snapshot and report load times."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default=settings.DATA_FILE_PATH,
+            help="Source workbook (defaults to settings.DATA_FILE_PATH)",
+        )
+        parser.add_argument(
+            '--prune',
+            action='store_true',
+            help="Delete snapshots of older versions of the data file",
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.exists(path):
+            raise CommandError(f"Data file not found: {path}")
+
+        fingerprint = source_fingerprint(path)
+        target = os.path.join(snapshot_dir(), snapshot_key(fingerprint))
+        if os.path.exists(target):
+            shutil.rmtree(target)
+
+        df, info = load_dataset(path, prepare=prepare_frame)
+        parse_seconds = info["load_seconds"]
+        target = info["snapshot"]
+        if target is None:
+            raise CommandError(f"Could not write snapshot under {snapshot_dir()}")
+
+        start = time.perf_counter()
+        read_snapshot(target)
+        snapshot_seconds = time.perf_counter() - start
+
+        self.stdout.write(f"Snapshot written to {target} ({len(df)} rows, {len(df.columns)} columns)")
+        self.stdout.write(f"  workbook parse: {parse_seconds * 1000:.1f} ms")
+        self.stdout.write(f"  snapshot load:  {snapshot_seconds * 1000:.1f} ms")
+
+        if options['prune']:
+            removed = prune_snapshots(target)
+            self.stdout.write(f"Pruned {removed} stale snapshot(s)")
@@ -0,0 +1,156 @@
+"""
+Load-test LLM summaries on a running server against the local LLM stub.
+
+    python manage.py stub_llm --first-token-delay 2 --delay 0
+    export HUGGINGFACE_API_KEY=stub HUGGINGFACE_API_URL=http://127.0.0.1:8081/models
+    SERVER_MODE=asgi bash start.sh        # or the default sync WSGI workers
+    python manage.py load_test --clients 300
+
+Each client asks about a different area (POST /api/query/), then long-polls
+its summary job until the LLM summary arrives. The report gives throughput,
+latency to the first response and to the final summary, and the peak number
+of calls the stub had in flight, i.e. how many LLM requests the server
+kept open at once. Area names come from the dataset configured here, so run
+it with the same DATA_FILE_PATH as the server.
+"""
+
+import asyncio
+import json
+import time
+
+import httpx
+from django.core.management.base import BaseCommand, CommandError
+
+from api.benchmarking import summarize
+
+
+class Command(BaseCommand):
+    help = "Fire concurrent summary requests at a running server and report concurrency and throughput."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000', help="Server base URL")
+        parser.add_argument('--stub-url', default='http://127.0.0.1:8081',
+                            help="LLM stub base URL, for its in-flight counters ('' to skip)")
+        parser.add_argument('--clients', type=int, default=200, help="Concurrent clients (one area each)")
+        parser.add_argument('--rounds', type=int, default=1, help="Requests per client")
+        parser.add_argument('--wait', type=float, default=10, help="Long-poll seconds per summary poll")
+        parser.add_argument('--timeout', type=float, default=120, help="Give up on a summary after this long")
+        parser.add_argument('--output', help="Also write the report as JSON to this file")
+
+    def handle(self, *args, **options):
+        from api.services import RealEstateService
+
+        names = sorted(RealEstateService().load().location_index.names.values())
+        if not names:
+            raise CommandError("The configured dataset has no locations")
+        needed = options['clients'] * options['rounds']
+        if len(names) < needed:
+            self.stderr.write(
+                f"Only {len(names)} locations for {needed} requests; repeated areas share one LLM call"
+            )
+        report = asyncio.run(self._run(names, options))
+        self._print(report)
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                json.dump(report, handle, indent=2)
+
+    async def _run(self, names, options):
+        clients = options['clients']
+        limits = httpx.Limits(max_connections=clients + 1, max_keepalive_connections=clients + 1)
+        timeout = httpx.Timeout(options['timeout'], connect=30)
+        rounds = options['rounds']
+        plans = [[names[(client * rounds + r) % len(names)] for r in range(rounds)] for client in range(clients)]
+        async with httpx.AsyncClient(base_url=options['url'], limits=limits, timeout=timeout) as http:
+            await self._stub_stats(options['stub_url'], reset=True)
+            start = time.perf_counter()
+            samples = await asyncio.gather(*(self._client(http, areas, options) for areas in plans))
+            elapsed = time.perf_counter() - start
+            stub = await self._stub_stats(options['stub_url'])
+
+        results = [sample for client in samples for sample in client]
+        outcomes = {}
+        for sample in results:
+            outcomes[sample["outcome"]] = outcomes.get(sample["outcome"], 0) + 1
+        first = [sample["first_ms"] for sample in results if sample["first_ms"] is not None]
+        final = [sample["final_ms"] for sample in results if sample["outcome"] == "llm"]
+        report = {
+            "url": options['url'],
+            "clients": clients,
+            "requests": len(results),
+            "elapsed_s": round(elapsed, 3),
+            "throughput_rps": round(len(results) / elapsed, 2),
+            "llm_summaries_per_s": round(outcomes.get("llm", 0) / elapsed, 2),
+            "outcomes": outcomes,
+            "first_response": summarize(first) if first else None,
+            "final_summary": summarize(final) if final else None,
+        }
+        if stub is not None:
+            report["stub"] = {"llm_requests": stub["requests"], "peak_in_flight": stub["peak_in_flight"]}
+        return report
+
+    async def _client(self, http, areas, options):
+        samples = []
+        for area in areas:
+            samples.append(await self._summary(http, area, options))
+        return samples
+
+    async def _summary(self, http, area, options):
+        """One query and its summary job; returns timings and how it ended."""
+        start = time.perf_counter()
+        sample = {"area": area, "first_ms": None, "final_ms": None}
+        try:
+            response = await http.post('/api/query/', json={"message": f"Analyze {area}"})
+            sample["first_ms"] = (time.perf_counter() - start) * 1000
+            if response.status_code != 200:
+                sample["outcome"] = f"http_{response.status_code}"
+                return sample
+            job = response.json().get("summary_job")
+            if not job:
+                # Cached LLM summary, or the server fell back to the analytical one
+                sample["outcome"] = "immediate"
+                return sample
+            deadline = start + options['timeout']
+            record = {"status": "pending"}
+            while record.get("status") == "pending" and time.perf_counter() < deadline:
+                poll = await http.get(f'/api/summary/{job}/', params={"wait": options['wait']})
+                if poll.status_code != 200:
+                    sample["outcome"] = f"poll_http_{poll.status_code}"
+                    return sample
+                record = poll.json()
+        except httpx.HTTPError as e:
+            sample["outcome"] = type(e).__name__
+            return sample
+
+        sample["final_ms"] = (time.perf_counter() - start) * 1000
+        sample["outcome"] = {"done": "llm", "failed": "llm_failed"}.get(record.get("status"), "timeout")
+        return sample
+
+    async def _stub_stats(self, stub_url, reset=False):
+        if not stub_url:
+            return None
+        try:
+            async with httpx.AsyncClient(timeout=5) as http:
+                response = await http.get(f"{stub_url.rstrip('/')}/stats" + ("/reset" if reset else ""))
+            return response.json()
+        except (httpx.HTTPError, ValueError):
+            self.stderr.write(f"No stub statistics at {stub_url}")
+            return None
+
+    def _print(self, report):
+        self.stdout.write(
+            f"{report['requests']} requests from {report['clients']} clients in {report['elapsed_s']:.1f} s "
+            f"({report['throughput_rps']:.1f} req/s, {report['llm_summaries_per_s']:.1f} LLM summaries/s)"
+        )
+        self.stdout.write(f"Outcomes: {report['outcomes']}")
+        for label, key in (("First response", "first_response"), ("Final summary", "final_summary")):
+            stats = report[key]
+            if stats:
+                self.stdout.write(
+                    f"{label:<15} median {stats['median_ms']:>9.1f} ms  p95 {stats['p95_ms']:>9.1f} ms  "
+                    f"max {stats['max_ms']:>9.1f} ms"
+                )
+        if "stub" in report:
+            self.stdout.write(
+                f"LLM stub: {report['stub']['llm_requests']} calls, "
+                f"peak {report['stub']['peak_in_flight']} in flight"
+            )
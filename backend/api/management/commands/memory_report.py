@@ -0,0 +1,69 @@
+"""
+Report the memory footprint of the dataset before and after compaction.
+
+    python manage.py memory_report
+    python manage.py memory_report --rows 1000000 --output memory.json
+
+Parses the workbook (or generates a synthetic frame with the same schema)
+and lists the bytes of every column as parsed and as the service holds it
+(see api/schema.py).
+"""
+
+import json
+import os
+import time
+
+import pandas as pd
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.schema import compact_frame, memory_report
+from api.synthetic import COLUMNS, frame_with_rows
+
+
+class Command(BaseCommand):
+    help = "Show bytes per column of the dataset as parsed and after the load-time schema stage."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default=settings.DATA_FILE_PATH,
+                            help="Source workbook (defaults to settings.DATA_FILE_PATH)")
+        parser.add_argument('--rows', type=int,
+                            help="Measure a synthetic dataset of this many rows instead of the workbook")
+        parser.add_argument('--output', help="Also write the report as JSON to this file")
+
+    def handle(self, *args, **options):
+        if options['rows']:
+            raw = frame_with_rows(options['rows'])
+            # The generator builds names and ranges as categoricals; measure
+            # them as object strings, the way the workbook parses
+            raw = raw.astype({
+                name: object for name in COLUMNS if isinstance(raw[name].dtype, pd.CategoricalDtype)
+            })
+            source = f"synthetic ({len(raw)} rows)"
+        else:
+            path = options['path']
+            if not os.path.exists(path):
+                raise CommandError(f"Data file not found: {path}")
+            raw = pd.read_excel(path, engine='openpyxl')
+            source = path
+
+        start = time.perf_counter()
+        compact = compact_frame(raw)
+        seconds = time.perf_counter() - start
+        report = memory_report(raw, compact)
+        report["source"] = source
+        report["compact_seconds"] = round(seconds, 4)
+
+        self.stdout.write(f"{source}: {report['rows']} rows, compacted in {seconds * 1000:.1f} ms")
+        self.stdout.write(f"{'column':<40} {'before':>10} {'bytes':>12}   {'after':>10} {'bytes':>12}")
+        for row in report["columns"]:
+            before = f"{row['dtype_before']:>10} {row['bytes_before']:>12,}" if row['dtype_before'] else f"{'':>23}"
+            after = f"{row['dtype_after']:>10} {row['bytes_after']:>12,}" if row['dtype_after'] else f"{'(dropped)':>10}"
+            self.stdout.write(f"{row['column'][:40]:<40} {before}   {after}")
+        self.stdout.write(
+            f"Total: {report['bytes_before']:,} -> {report['bytes_after']:,} bytes "
+            f"({report['ratio'] * 100:.1f}% of parsed size)"
+        )
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                json.dump(report, handle, indent=2)
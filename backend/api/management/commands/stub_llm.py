@@ -0,0 +1,159 @@
+"""
+Local stand-in for the HuggingFace Inference API.
+Point HUGGINGFACE_API_URL at it to exercise summaries without the network.
+GET /stats reports requests served and the peak number in flight;
+GET /stats/reset starts a new measurement.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.management.base import BaseCommand
+
+
+DEFAULT_TEXT = (
+    "Prices in this locality have risen steadily over the period, with demand "
+    "holding firm and transaction volumes recovering after a brief dip."
+)
+
+
+class StubServer(ThreadingHTTPServer):
+    # Accept bursts of hundreds of connections (load tests)
+    request_queue_size = 1024
+    daemon_threads = True
+
+
+class Stats:
+    """Request counters shared by the handler threads."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def __enter__(self):
+        with self.lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def __exit__(self, *exc):
+        with self.lock:
+            self.in_flight -= 1
+
+    def reset(self):
+        with self.lock:
+            self.requests = 0
+            self.peak_in_flight = self.in_flight
+
+    def snapshot(self):
+        with self.lock:
+            return {"requests": self.requests, "in_flight": self.in_flight, "peak_in_flight": self.peak_in_flight}
+
+
+def make_handler(options):
+    """Build a request handler class bound to the command options."""
+    stats = Stats()
+
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            if options['verbosity'] > 1:
+                super().log_message(format, *args)
+
+        def do_GET(self):
+            path = self.path.rstrip('/')
+            if path == '/stats/reset':
+                stats.reset()
+            elif path != '/stats':
+                self._send_json(404, {"error": "not found"})
+                return
+            self._send_json(200, stats.snapshot())
+
+        def do_POST(self):
+            with stats:
+                self._generate()
+
+        def _generate(self):
+            length = int(self.headers.get('Content-Length', 0))
+            payload = json.loads(self.rfile.read(length) or b'{}')
+
+            time.sleep(options['first_token_delay'])
+            if options['status'] != 200:
+                self._send_json(options['status'], {"error": "stub failure"})
+                return
+
+            tokens = [word + ' ' for word in options['text'].split()]
+            if payload.get('stream'):
+                self._stream(tokens)
+            else:
+                time.sleep(options['delay'] * len(tokens))
+                text = payload.get('inputs', '') + ' ' + ''.join(tokens).strip()
+                self._send_json(200, [{"generated_text": text}])
+
+        def _send_json(self, code, body):
+            data = json.dumps(body).encode('utf-8')
+            self.send_response(code)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _chunk(self, text):
+            data = text.encode('utf-8')
+            self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b"\r\n")
+            self.wfile.flush()
+
+        def _stream(self, tokens):
+            # Chunked transfer encoding, like the real API
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            for position, text in enumerate(tokens):
+                if options['fail_after'] is not None and position >= options['fail_after']:
+                    # Drop the connection mid-stream
+                    self.close_connection = True
+                    return
+                time.sleep(options['delay'])
+                event = {"token": {"id": position, "text": text, "special": False}, "generated_text": None}
+                self._chunk(f"data: {json.dumps(event)}\n\n")
+            final = {"token": {"id": len(tokens), "text": "</s>", "special": True},
+                     "generated_text": ''.join(tokens).strip()}
+            self._chunk(f"data: {json.dumps(final)}\n\n")
+            self.wfile.write(b"0\r\n\r\n")
+            self.wfile.flush()
+
+    return StubHandler
+
+
+class Command(BaseCommand):
+    help = "Serve a fake HuggingFace Inference API that emits tokens with configurable delays."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8081)
+        parser.add_argument('--delay', type=float, default=0.05, help="Seconds between tokens")
+        parser.add_argument('--first-token-delay', type=float, default=0.5,
+                            help="Seconds before the first token (or before any error response)")
+        parser.add_argument('--status', type=int, default=200, help="Respond with this HTTP status instead")
+        parser.add_argument('--fail-after', type=int, default=None,
+                            help="Drop streaming connections after this many tokens")
+        parser.add_argument('--text', default=DEFAULT_TEXT, help="Text to generate")
+
+    def handle(self, *args, **options):
+        server = StubServer((options['host'], options['port']), make_handler(options))
+        self.stdout.write(
+            f"Stub LLM listening on http://{options['host']}:{options['port']} "
+            f"(set HUGGINGFACE_API_URL=http://{options['host']}:{options['port']}/models)"
+        )
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
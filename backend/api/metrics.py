@@ -0,0 +1,286 @@
+"""
+Lightweight request instrumentation.
+Stage timers feed per-process Prometheus histograms (served by
+GET /api/metrics/) and, while a request is being timed, the entries of its
+Server-Timing header. Recording a sample is a couple of clock reads and a
+short locked update, cheap enough to leave on in production.
+
+Metrics are kept per process: with several gunicorn workers each scrape
+reaches one of them, so aggregate with sum()/rate() across scrapes or
+scrape the workers individually.
+"""
+
+import asyncio
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, Iterator, List, Tuple
+
+# Latency buckets in seconds (0.1 ms to 60 s)
+DEFAULT_BUCKETS = (
+    0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names: Tuple[str, ...], values: LabelValues, extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Counter:
+    """Monotonic counter with labels."""
+
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_labels(self.labelnames, key)} {value:g}" for key, value in values]
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels."""
+
+    kind = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        # Per label set: [bucket counts..., +Inf count], sum
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            entry[0][index] += 1
+            entry[1][0] += value
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = sorted((key, (list(counts), total[0])) for key, (counts, total) in self._values.items())
+        lines = []
+        for key, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else f'{bound:g}'
+                bucket_labels = _labels(self.labelnames, key, 'le="' + le + '"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {total:.6f}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class Gauge:
+    """Value read from a callback at scrape time."""
+
+    kind = 'gauge'
+
+    def __init__(self, name: str, documentation: str, read: Callable[[], float]):
+        self.name = name
+        self.documentation = documentation
+        self.read = read
+
+    def samples(self) -> List[str]:
+        try:
+            return [f"{self.name} {float(self.read()):g}"]
+        except Exception:
+            return []
+
+
+class Registry:
+    """Collection of metrics rendered in the Prometheus text format."""
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def gauge(self, name: str, documentation: str, read: Callable[[], float]) -> Gauge:
+        return self.register(Gauge(name, documentation, read))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+stage_seconds = registry.register(Histogram(
+    'realestate_stage_seconds', 'Time spent in each stage of request handling.', ('stage',)
+))
+request_seconds = registry.register(Histogram(
+    'realestate_request_seconds', 'Total time to answer API requests.', ('endpoint',)
+))
+llm_fallbacks = registry.register(Counter(
+    'realestate_llm_fallbacks_total', 'Analytical summaries served instead of an LLM summary, by cause.', ('reason',)
+))
+cache_lookups = registry.register(Counter(
+    'realestate_cache_lookups_total', 'Cache lookups by cache and result.', ('cache', 'result')
+))
+
+
+class _Timings(threading.local):
+    def __init__(self):
+        # Stages being timed in this thread
+        self.active = set()
+
+
+_timings = _Timings()
+# Stage durations of the request being timed, or None. A context variable
+# rather than a thread-local so that work an async view hands to a thread
+# pool (with the context copied) still reports to its request.
+_request_stages: contextvars.ContextVar = contextvars.ContextVar('request_stages', default=None)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """
+    Time a block as one stage.
+
+    Nested blocks of the same stage are counted once (the outer one).
+    """
+    if name in _timings.active:
+        yield
+        return
+    _timings.active.add(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _timings.active.discard(name)
+        record_stage(name, time.perf_counter() - start)
+
+
+def record_stage(name: str, seconds: float) -> None:
+    """Record a stage duration measured by the caller (e.g. across generator yields)."""
+    stage_seconds.observe(seconds, stage=name)
+    stages = _request_stages.get()
+    if stages is not None:
+        stages[name] = stages.get(name, 0.0) + seconds
+
+
+def timed(name: str) -> Callable:
+    """Decorator form of ``stage``."""
+    def decorator(fn: Callable) -> Callable:
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class RequestTimings:
+    """Stage durations collected for one request."""
+
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+        self.stages: Dict[str, float] = {}
+        self.start = time.perf_counter()
+        self.total = 0.0
+
+    def server_timing(self) -> str:
+        """Server-Timing header value, durations in milliseconds."""
+        entries = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in self.stages.items()]
+        entries.append(f"total;dur={self.total * 1000:.2f}")
+        return ', '.join(entries)
+
+
+@contextmanager
+def request_timings(endpoint: str) -> Iterator[RequestTimings]:
+    """
+    Collect the stages run in this context into a RequestTimings.
+
+    Args:
+        endpoint: Label for the request latency histogram
+    """
+    timings = RequestTimings(endpoint)
+    token = _request_stages.set(timings.stages)
+    try:
+        yield timings
+    finally:
+        _request_stages.reset(token)
+        timings.total = time.perf_counter() - timings.start
+        request_seconds.observe(timings.total, endpoint=endpoint)
+
+
+def count_fallback(reason: str) -> None:
+    """Count an analytical summary served in place of an LLM summary."""
+    llm_fallbacks.inc(reason=reason)
+
+
+def count_cache(cache: str, hit: bool) -> None:
+    """Count a cache lookup."""
+    cache_lookups.inc(cache=cache, result='hit' if hit else 'miss')
+
+
+def server_timed(endpoint: str) -> Callable:
+    """
+    Decorator for view methods (sync or async): time the request and add a
+    Server-Timing header.
+
+    Args:
+        endpoint: Label for the request latency histogram
+    """
+    def decorator(method: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(method):
+            @wraps(method)
+            async def async_wrapper(view, request, *args, **kwargs):
+                with request_timings(endpoint) as timings:
+                    response = await method(view, request, *args, **kwargs)
+                response['Server-Timing'] = timings.server_timing()
+                return response
+            return async_wrapper
+
+        @wraps(method)
+        def wrapper(view, request, *args, **kwargs):
+            with request_timings(endpoint) as timings:
+                response = method(view, request, *args, **kwargs)
+            response['Server-Timing'] = timings.server_timing()
+            return response
+        return wrapper
+    return decorator
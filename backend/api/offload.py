@@ -0,0 +1,50 @@
+"""
+Thread pool for blocking work started from async views.
+Pandas analysis, response rendering and cache-store access run here so the
+event loop only ever waits on sockets. The pool is bounded: requests beyond
+its size queue instead of adding threads. pandas and numpy release the GIL
+in most of their inner loops, and the dataset lives in process memory, so
+threads (not processes) are the right unit here.
+"""
+
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from django.conf import settings
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Return the process-wide offload pool (created on first use)."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.ASYNC_CPU_WORKERS, thread_name_prefix='offload'
+                )
+    return _executor
+
+
+async def run_sync(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Run a blocking call on the offload pool and await its result.
+
+    The caller's context variables (e.g. request timings) are visible to the call.
+
+    Args:
+        fn: Blocking function
+        *args, **kwargs: Its arguments
+
+    Returns:
+        Whatever ``fn`` returns (exceptions propagate)
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(get_executor(), functools.partial(context.run, fn, *args, **kwargs))
@@ -0,0 +1,234 @@
+"""
+Structured reading of narrower questions.
+"Office rates in Baner since 2021" or "compare flat sales in Aundh and
+Wakad 2019-2022" become a QueryPlan: the areas, an inclusive year window,
+a metric and a property type. The service runs a plan against the
+location index, using year-bounded slices and only the columns the plan
+needs (see RealEstateService.analyze_plan). Messages without any of these
+filters get the default plan, the full-history flat-rate analysis.
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from .aggregates import UNITS_COLUMN
+from .indexes import normalize_location
+from .schema import SUPPLY_COLUMN, rate_column, sold_column, total_column
+
+METRICS = ('rate', 'sales', 'units', 'supply')
+DEFAULT_METRIC = 'rate'
+DEFAULT_PROPERTY_TYPE = 'flat'
+
+# Metrics summed over years (rates are averaged instead)
+COUNT_METRICS = ('sales', 'units', 'supply')
+
+# Phrases naming each metric; the earliest mention in the message wins
+_METRIC_PATTERNS = [
+    ('sales', r'units?\s+sold|sales|sold|transactions?|registrations?|demand'),
+    ('supply', r'carpet\s+area|supply|supplied'),
+    ('units', r'units|inventory|stock'),
+    ('rate', r'rates?|prices?|pricing|costs?|per\s+sq\.?\s*ft|psf|valuations?'),
+]
+
+_PROPERTY_PATTERNS = [
+    ('flat', r'flats?|apartments?|residential|homes?|housing'),
+    ('office', r'offices?|office\s+space'),
+    ('shop', r'shops?|retail|stores?'),
+    ('others', r'other\s+(?:property|properties|types?|segments?|categor(?:y|ies))|others'),
+]
+
+_YEAR = r'((?:19|20)\d{2})'
+
+# (pattern, how its captured years map to (year_from, year_to)), tried in order
+_WINDOW_PATTERNS = [
+    (rf'\b(?:from|between)\s+{_YEAR}\s*(?:to|and|until|till|through|-|–)\s*{_YEAR}\b', lambda a, b: (a, b)),
+    (rf'\b{_YEAR}\s*(?:-|–|to|through)\s*{_YEAR}\b', lambda a, b: (a, b)),
+    (rf'\b(?:since|from|starting(?:\s+in)?)\s+{_YEAR}\b', lambda a: (a, None)),
+    (rf'\bafter\s+{_YEAR}\b', lambda a: (a + 1, None)),
+    (rf'\bbefore\s+{_YEAR}\b', lambda a: (None, a - 1)),
+    (rf'\b(?:until|till|through|up\s+to|upto)\s+{_YEAR}\b', lambda a: (None, a)),
+    (rf'\b(?:in|for|during|of)\s+{_YEAR}\b', lambda a: (a, a)),
+    (rf'\b{_YEAR}\b', lambda a: (a, a)),
+]
+
+_LAST_YEARS = re.compile(r'\b(?:last|past|previous|recent)\s+(\d{1,2})\s+years?\b')
+_LAST_YEAR = re.compile(r'\b(?:last|past|previous)\s+year\b')
+
+
+class QueryPlan:
+    """What a query asks for: areas, mode, year window, metric and property type."""
+
+    def __init__(
+        self,
+        areas: List[str],
+        is_comparison: bool,
+        year_from: Optional[int] = None,
+        year_to: Optional[int] = None,
+        last_years: Optional[int] = None,
+        metric: str = DEFAULT_METRIC,
+        property_type: Optional[str] = None,
+    ):
+        """
+        Args:
+            areas: Detected areas, in order of mention
+            is_comparison: Comparison mode flag (see RealEstateService.detect_mode)
+            year_from: First year asked for (None for no lower bound)
+            year_to: Last year asked for (None for no upper bound)
+            last_years: "Last N years", resolved against the data's latest year
+            metric: One of METRICS
+            property_type: One of schema.PROPERTY_TYPES, or None if not mentioned
+        """
+        self.areas = areas
+        self.is_comparison = is_comparison
+        self.year_from = year_from
+        self.year_to = year_to
+        self.last_years = last_years
+        self.metric = metric
+        self.property_type = property_type
+
+    @property
+    def narrowed(self) -> bool:
+        """True if the plan differs from the default full-history flat-rate analysis."""
+        return self.column != rate_column(DEFAULT_PROPERTY_TYPE) or self.has_window
+
+    @property
+    def has_window(self) -> bool:
+        """True if the plan restricts years."""
+        return self.year_from is not None or self.year_to is not None or self.last_years is not None
+
+    @property
+    def effective_type(self) -> Optional[str]:
+        """Property type the metric is read for (None for all-type totals)."""
+        if self.metric == 'supply' or (self.metric == 'units' and not self.property_type):
+            return None
+        return self.property_type or DEFAULT_PROPERTY_TYPE
+
+    @property
+    def column(self) -> str:
+        """Dataset column holding the planned metric."""
+        kind = self.property_type or DEFAULT_PROPERTY_TYPE
+        if self.metric == 'sales':
+            return sold_column(kind)
+        if self.metric == 'units':
+            return total_column(self.property_type) if self.property_type else UNITS_COLUMN
+        if self.metric == 'supply':
+            return SUPPLY_COLUMN
+        return rate_column(kind)
+
+    @property
+    def label(self) -> str:
+        """Human-readable name of the planned metric."""
+        kind = (self.property_type or DEFAULT_PROPERTY_TYPE).capitalize()
+        if self.metric == 'sales':
+            return f"{kind} units sold"
+        if self.metric == 'units':
+            return f"{kind} units" if self.property_type else "Total units"
+        if self.metric == 'supply':
+            return "Carpet area supplied (sqft)"
+        return f"{kind} rate (Rs/sqft)"
+
+    @property
+    def noun(self) -> str:
+        """Lower-case name of the planned metric, for summaries."""
+        kind = self.property_type or DEFAULT_PROPERTY_TYPE
+        if self.metric == 'sales':
+            return f"{kind} units sold"
+        if self.metric == 'units':
+            return f"{kind} units" if self.property_type else "total units"
+        if self.metric == 'supply':
+            return "carpet area supplied (sqft)"
+        return f"{kind} rates"
+
+    def years(self, latest: Optional[int]) -> Tuple[Optional[int], Optional[int]]:
+        """
+        Resolve the year window.
+
+        Args:
+            latest: Latest year in the data for the plan's areas (for "last N years")
+
+        Returns:
+            Tuple of (year_from, year_to), either None when unbounded
+        """
+        if self.last_years is not None and latest is not None:
+            return latest - self.last_years + 1, latest
+        return self.year_from, self.year_to
+
+    def key(self) -> Tuple[Any, ...]:
+        """Hashable description of the filters (for cache keys)."""
+        return (self.metric, self.column, self.year_from, self.year_to, self.last_years)
+
+    def describe(
+        self,
+        year_from: Optional[int] = None,
+        year_to: Optional[int] = None,
+        columns: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
+        """Plan as returned to clients, with the resolved year window and table columns."""
+        return {
+            "metric": self.metric,
+            "property_type": self.effective_type,
+            "column": self.column,
+            "label": self.label,
+            "year_from": year_from,
+            "year_to": year_to,
+            "columns": columns,
+        }
+
+
+def _earliest(patterns: List[Tuple[str, str]], text: str) -> Optional[str]:
+    """Name of the pattern matching earliest in ``text`` (longest on ties)."""
+    best = None
+    for name, pattern in patterns:
+        match = re.search(rf'\b(?:{pattern})\b', text)
+        if match:
+            rank = (match.start(), -len(match.group()))
+            if best is None or rank < best[0]:
+                best = (rank, name)
+    return best[1] if best else None
+
+
+def _window(text: str) -> Tuple[Optional[int], Optional[int], Optional[int]]:
+    """Year window mentioned in ``text`` as (year_from, year_to, last_years)."""
+    match = _LAST_YEARS.search(text)
+    if match and int(match.group(1)) > 0:
+        return None, None, int(match.group(1))
+    if _LAST_YEAR.search(text):
+        return None, None, 1
+    for pattern, bounds in _WINDOW_PATTERNS:
+        match = re.search(pattern, text)
+        if match:
+            year_from, year_to = bounds(*(int(group) for group in match.groups()))
+            if year_from is not None and year_to is not None and year_from > year_to:
+                year_from, year_to = year_to, year_from
+            return year_from, year_to, None
+    return None, None, None
+
+
+def parse_query(message: str, areas: List[str], is_comparison: bool) -> QueryPlan:
+    """
+    Read the year window, metric and property type from a message.
+
+    Area names are removed first, so a locality called e.g. "Shop Street"
+    or "Sector 2021" does not read as a filter.
+
+    Args:
+        message: User query message
+        areas: Areas detected in the message
+        is_comparison: Comparison mode flag
+
+    Returns:
+        QueryPlan for the message
+    """
+    text = normalize_location(message)
+    for area in sorted(areas, key=len, reverse=True):
+        text = re.sub(rf'\b{re.escape(normalize_location(area))}\b', ' ', text)
+    year_from, year_to, last_years = _window(text)
+    return QueryPlan(
+        areas,
+        is_comparison,
+        year_from=year_from,
+        year_to=year_to,
+        last_years=last_years,
+        metric=_earliest(_METRIC_PATTERNS, text) or DEFAULT_METRIC,
+        property_type=_earliest(_PROPERTY_PATTERNS, text),
+    )
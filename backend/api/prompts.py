@@ -0,0 +1,186 @@
+"""
+LLM prompt compilation.
+Data blocks are rendered with vectorized string operations over whole
+columns and compiled for every location when a dataset is built, so a
+summary request only wraps a ready-made block in the prompt template.
+Long histories are kept within a character budget by merging older years
+into multi-year ranges.
+"""
+
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from .aggregates import RATE_COLUMN, SALES_COLUMN, UNITS_COLUMN
+
+PROMPT_TEMPLATE = """Write a concise real-estate analysis summary (5-8 lines) for the locality '{area}' using the following dataset. Focus on price trend, demand trend, growth patterns, and any notable changes.
+
+Data:
+{data}
+
+Summary:"""
+
+NO_DATA = "No data available."
+
+# Most recent rows that are never merged into ranges when enforcing the budget
+RECENT_ROWS = 3
+
+
+def build_prompt(area: str, data_block: str) -> str:
+    """Wrap a compiled data block in the summary prompt template."""
+    return PROMPT_TEMPLATE.format(area=area, data=data_block)
+
+
+def _thousands(values: np.ndarray) -> pd.Series:
+    """Format numbers like ``f"{value:,.0f}"``, one column at a time."""
+    values = np.asarray(values, dtype=float)
+    rounded = pd.Series(np.round(values))
+    text = rounded.astype('Int64').astype(str).str.replace(r'(\d)(?=(\d{3})+$)', r'\1,', regex=True)
+    return text.where(~rounded.isna(), 'nan')
+
+
+def _plain(values: np.ndarray) -> pd.Series:
+    """Format values like ``str(value)``."""
+    return pd.Series(np.asarray(values)).astype(str)
+
+
+def format_rows(df: pd.DataFrame) -> np.ndarray:
+    """
+    Render one prompt line per row.
+
+    Args:
+        df: Rows with year, rate, sales and units columns
+
+    Returns:
+        Array of lines such as "Year 2024: Price ₹8,219/sqft, Sales 497, Units 666"
+    """
+    if len(df) == 0:
+        return np.array([], dtype=object)
+    years = _plain(df['year'].to_numpy().astype(int))
+    lines = (
+        "Year " + years
+        + ": Price ₹" + _thousands(df[RATE_COLUMN].to_numpy()) + "/sqft, "
+        + "Sales " + _plain(df[SALES_COLUMN].to_numpy())
+        + ", Units " + _plain(df[UNITS_COLUMN].to_numpy())
+    )
+    return lines.to_numpy(dtype=object)
+
+
+def _widen(values: np.ndarray) -> np.ndarray:
+    """Upcast integers to int64 (and float32 to float64) for accumulation."""
+    return values.astype(np.result_type(values.dtype, np.int64), copy=False)
+
+
+def _range_lines(df: pd.DataFrame, group_size: int) -> list:
+    """Merge consecutive rows into ranges of ``group_size`` years."""
+    starts = np.arange(0, len(df), group_size)
+    counts = np.diff(np.append(starts, len(df)))
+    years = df['year'].to_numpy().astype(int)
+    rate_values = df[RATE_COLUMN].to_numpy(dtype=float)
+    known = ~np.isnan(rate_values)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Mean of the known rates in each range (nan if there are none)
+        rates = np.add.reduceat(np.where(known, rate_values, 0.0), starts) / np.add.reduceat(known, starts)
+    # Counts may be stored in narrow integer types; sum them in 64 bits
+    sales = np.add.reduceat(_widen(df[SALES_COLUMN].to_numpy()), starts)
+    units = np.add.reduceat(_widen(df[UNITS_COLUMN].to_numpy()), starts)
+    # Only a handful of ranges per block, so plain formatting is cheap here
+    return [
+        f"Years {years[start]}-{years[start + count - 1]}: Avg price ₹{rate:,.0f}/sqft, "
+        f"Sales {sold}, Units {unit}"
+        for start, count, rate, sold, unit in zip(starts, counts, rates, sales, units)
+    ]
+
+
+def _block_length(lines) -> int:
+    return sum(len(line) for line in lines) + max(len(lines) - 1, 0)
+
+
+def fit_to_budget(df: pd.DataFrame, lines: np.ndarray, max_chars: int) -> str:
+    """
+    Join prompt lines, merging older years into ranges if they exceed the budget.
+
+    The most recent RECENT_ROWS rows are always kept as they are; older rows
+    are merged into ever wider year ranges until the block fits. If even a
+    single range does not fit, the oldest lines are dropped.
+
+    Args:
+        df: Rows the lines were rendered from, in year order
+        lines: Output of format_rows for ``df``
+        max_chars: Character budget for the block (0 or less disables it)
+
+    Returns:
+        Data block text
+    """
+    if len(lines) == 0:
+        return NO_DATA
+    if max_chars <= 0 or _block_length(lines) <= max_chars:
+        return "\n".join(lines)
+
+    recent = list(lines[-RECENT_ROWS:])
+    older = df.iloc[:-RECENT_ROWS] if len(df) > RECENT_ROWS else df.iloc[0:0]
+    candidate = recent
+    if len(older) > 0:
+        # Start from the group size the average line length suggests, then widen
+        room = max(max_chars - _block_length(recent), 1)
+        line_length = _block_length(lines) / len(lines) + 1
+        group_size = max(2, int(np.ceil(len(older) * line_length / room)))
+        while True:
+            candidate = _range_lines(older, group_size) + recent
+            if _block_length(candidate) <= max_chars or group_size >= len(older):
+                break
+            group_size *= 2
+
+    while len(candidate) > 1 and _block_length(candidate) > max_chars:
+        candidate = candidate[1:]
+    return "\n".join(candidate)
+
+
+def format_data_block(area_data: pd.DataFrame, max_chars: int = 0) -> str:
+    """
+    Render an area's rows as the prompt data block.
+
+    Args:
+        area_data: Rows for one area, in year order
+        max_chars: Character budget (0 or less disables it)
+
+    Returns:
+        Data block text
+    """
+    if area_data is None or area_data.empty:
+        return NO_DATA
+    return fit_to_budget(area_data, format_rows(area_data), max_chars)
+
+
+def compile_data_blocks(
+    df: pd.DataFrame,
+    blocks: Dict[str, slice],
+    max_chars: int = 0,
+) -> Dict[str, str]:
+    """
+    Render the data block of every location in one pass.
+
+    Lines for the whole frame are formatted at once; each location's block
+    is then a join over its slice.
+
+    Args:
+        df: Dataset sorted so each location is a contiguous block
+        blocks: Location key to positional slice (see LocationIndex)
+        max_chars: Character budget per block (0 or less disables it)
+
+    Returns:
+        Location key to data block text
+    """
+    required = ['year', RATE_COLUMN, SALES_COLUMN, UNITS_COLUMN]
+    if df is None or len(df) == 0 or any(column not in df.columns for column in required):
+        return {}
+    lines = format_rows(df)
+    compiled = {}
+    for key, block in blocks.items():
+        block_lines = lines[block]
+        if max_chars <= 0 or _block_length(block_lines) <= max_chars:
+            compiled[key] = "\n".join(block_lines)
+        else:
+            compiled[key] = fit_to_budget(df.iloc[block], block_lines, max_chars)
+    return compiled
@@ -0,0 +1,162 @@
+"""
+Leaderboards of locations by precomputed metrics.
+For every ranking metric the locations are sorted once per dataset
+version, globally and within each city. A top-K or value-range query is
+then a binary search plus a K-element slice, so its cost does not depend
+on the number of locations. A new dataset version builds a new
+Leaderboard, so rankings never mix versions.
+"""
+
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .indexes import normalize_location
+
+
+# Ranking name -> column of the metrics table (see aggregates.METRIC_COLUMNS)
+RANKINGS = {
+    'cagr': 'rate_cagr_pct',
+    'growth': 'rate_growth_pct',
+    'rate': 'last_rate',
+    'avg_rate': 'avg_rate',
+    'sales': 'total_sales',
+    'sales_growth': 'sales_growth_pct',
+    'volatility': 'volatility_pct',
+    'units': 'total_units',
+}
+
+# Metrics columns kept for leaderboards (also stored in shard catalogs)
+RANKING_FIELDS = ['location', 'city', 'year_start', 'year_end'] + list(RANKINGS.values())
+
+ASCENDING = 'asc'
+DESCENDING = 'desc'
+
+
+def _json_number(value: float) -> Any:
+    """Python int for whole numbers, float otherwise (for JSON output)."""
+    return int(value) if float(value).is_integer() else float(value)
+
+
+class Leaderboard:
+    """Per-metric sorted orders of the locations in a metrics table."""
+
+    def __init__(self, metrics: pd.DataFrame):
+        """
+        Sort every ranking metric, globally and per city.
+
+        Locations without a value for a metric (e.g. CAGR over a single
+        year) are left out of that metric's ranking.
+
+        Args:
+            metrics: Per-location metrics indexed by normalized location key
+                (see aggregates.location_metrics); needs RANKING_FIELDS
+        """
+        self.size = len(metrics)
+        self.locations = metrics['location'].astype(str).to_numpy(dtype=object)
+        self.city_names = metrics['city'].astype(object).where(metrics['city'].notna(), None).to_numpy()
+        self.year_start = metrics['year_start'].to_numpy()
+        self.year_end = metrics['year_end'].to_numpy()
+        # Alphabetical position of each location, for breaking ties
+        name_order = np.argsort(self.locations.astype(str), kind='stable')
+        name_rank = np.empty(self.size, dtype=int)
+        name_rank[name_order] = np.arange(self.size)
+
+        # Normalized city -> display name, and each location's city code
+        self.cities: Dict[str, str] = {}
+        city_keys = [normalize_location(city) if city is not None else '' for city in self.city_names]
+        for key, city in zip(city_keys, self.city_names):
+            if key and key not in self.cities:
+                self.cities[key] = str(city)
+        codes = {key: code for code, key in enumerate(self.cities)}
+        city_codes = np.array([codes.get(key, -1) for key in city_keys], dtype=int)
+
+        # Ranking -> value of every location
+        self.values: Dict[str, np.ndarray] = {}
+        # (ranking, city key or None, order) -> (positions in rank order, their
+        # sort keys: the values, negated for DESCENDING so keys always ascend)
+        self._orders: Dict[Tuple[str, Optional[str], str], Tuple[np.ndarray, np.ndarray]] = {}
+        for name, column in RANKINGS.items():
+            values = pd.to_numeric(metrics[column], errors='coerce').to_numpy(dtype=float)
+            self.values[name] = values
+            valid = np.flatnonzero(~np.isnan(values))
+            for direction, keys in ((ASCENDING, values), (DESCENDING, -values)):
+                # Ties are broken by location name, in either direction
+                order = valid[np.lexsort((name_rank[valid], keys[valid]))]
+                self._orders[(name, None, direction)] = (order, keys[order])
+
+                # Stable grouping keeps each city's locations in rank order
+                grouped = order[np.argsort(city_codes[order], kind='stable')]
+                grouped_codes = city_codes[grouped]
+                for key, code in codes.items():
+                    start, stop = np.searchsorted(grouped_codes, [code, code + 1])
+                    positions = grouped[start:stop]
+                    self._orders[(name, key, direction)] = (positions, keys[positions])
+
+    def rank(
+        self,
+        metric: str,
+        k: int = 10,
+        city: Optional[str] = None,
+        order: str = DESCENDING,
+        offset: int = 0,
+        min_value: Optional[float] = None,
+        max_value: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        Top (or bottom) K locations by a metric.
+
+        Args:
+            metric: One of RANKINGS
+            k: Number of locations to return
+            city: Only rank locations in this city (any casing)
+            order: DESCENDING for the highest values first, ASCENDING for the lowest
+            offset: Number of ranked locations to skip (for paging)
+            min_value: Only locations with a value of at least this
+            max_value: Only locations with a value of at most this
+
+        Returns:
+            Dict with the query, "total" (locations matching the filters)
+            and "items" ({rank, location, city, value, year_start, year_end})
+
+        Raises:
+            KeyError: If the metric is unknown
+        """
+        column = RANKINGS[metric]
+        city_key = normalize_location(city) if city else None
+        direction = ASCENDING if order == ASCENDING else DESCENDING
+        positions, keys = self._orders.get(
+            (metric, city_key, direction), (np.array([], dtype=int), np.array([]))
+        )
+
+        # Value bounds as bounds on the sort keys
+        if direction == ASCENDING:
+            first, last = min_value, max_value
+        else:
+            first = -max_value if max_value is not None else None
+            last = -min_value if min_value is not None else None
+        low = int(np.searchsorted(keys, first, 'left')) if first is not None else 0
+        high = int(np.searchsorted(keys, last, 'right')) if last is not None else len(keys)
+        high = max(low, high)
+        selected = positions[low + offset:min(low + offset + k, high)]
+
+        items = []
+        for rank, position in enumerate(selected.tolist(), start=offset + 1):
+            items.append({
+                "rank": rank,
+                "location": self.locations[position],
+                "city": self.city_names[position],
+                "value": _json_number(self.values[metric][position]),
+                "year_start": int(self.year_start[position]),
+                "year_end": int(self.year_end[position]),
+            })
+        return {
+            "metric": metric,
+            "column": column,
+            "order": order,
+            "city": self.cities.get(city_key, city) if city_key else None,
+            "total": high - low,
+            "offset": offset,
+            "items": items,
+        }
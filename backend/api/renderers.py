@@ -0,0 +1,95 @@
+"""
+Fast JSON rendering for API responses.
+orjson encodes dicts, lists and NumPy/pandas values natively, and
+pre-serialized fragments (e.g. an area's table, rendered once per data
+version) are spliced into the output verbatim instead of being encoded
+again. The output matches DRF's compact, non-ASCII-escaping JSONRenderer,
+except that NaN becomes null instead of an error.
+"""
+
+import datetime
+import decimal
+from typing import Any
+
+import numpy as np
+import orjson
+import pandas as pd
+from django.utils.functional import Promise
+from rest_framework.renderers import BaseRenderer
+
+OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+class Fragment:
+    """Already encoded JSON value, written to the output as is."""
+
+    __slots__ = ('data',)
+
+    def __init__(self, data: bytes):
+        self.data = data
+
+    def __repr__(self) -> str:
+        return f"Fragment({len(self.data)} bytes)"
+
+
+def _default(obj: Any) -> Any:
+    """Convert values orjson does not encode by itself."""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return obj.tolist()
+    if obj is pd.NA or obj is pd.NaT:
+        return None
+    if isinstance(obj, pd.Timestamp):
+        return obj.isoformat()
+    if isinstance(obj, datetime.timedelta):
+        return str(obj.total_seconds())
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if isinstance(obj, Promise):
+        return str(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _has_fragment(obj: Any) -> bool:
+    # Fragments are looked for in (nested) dict values only, never inside lists
+    return any(
+        isinstance(value, Fragment) or (isinstance(value, dict) and _has_fragment(value))
+        for value in obj.values()
+    )
+
+
+def dumps(obj: Any) -> bytes:
+    """
+    Encode a value as compact UTF-8 JSON.
+
+    Args:
+        obj: Value to encode; dict values may be Fragments
+
+    Returns:
+        JSON bytes
+    """
+    if isinstance(obj, Fragment):
+        return obj.data
+    if isinstance(obj, dict) and _has_fragment(obj):
+        members = [
+            orjson.dumps(str(key)) + b':' + dumps(value)
+            for key, value in obj.items()
+        ]
+        return b'{' + b','.join(members) + b'}'
+    return orjson.dumps(obj, default=_default, option=OPTIONS)
+
+
+class FastJSONRenderer(BaseRenderer):
+    """DRF renderer backed by orjson."""
+
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return dumps(data)
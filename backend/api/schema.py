@@ -0,0 +1,195 @@
+"""
+Load-time schema for the source workbook.
+The workbook has 28 columns with pandas' default dtypes (object strings,
+int64, float64), of which the service reads only a few. compact_frame
+keeps those, stores location and city names as categoricals, narrows
+every numeric column to the smallest dtype that still holds each value
+exactly, and parses "low-high" prevailing-rate ranges into two numeric
+columns. Runs before a frame is snapshotted, so snapshots and every
+worker that maps them get the compact layout.
+"""
+
+import re
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .aggregates import UNITS_COLUMN
+from .indexes import LOCATION_COLUMN
+
+
+PROPERTY_TYPES = ('flat', 'office', 'others', 'shop')
+
+SUPPLY_COLUMN = 'total carpet area supplied (sqft)'
+
+
+def rate_column(property_type: str) -> str:
+    """Weighted average rate column of a property type."""
+    return f'{property_type} - weighted average rate'
+
+
+def sold_column(property_type: str) -> str:
+    """Units sold (IGR registrations) column of a property type."""
+    return f'{property_type}_sold - igr'
+
+
+def total_column(property_type: str) -> str:
+    """Total units supplied column of a property type."""
+    return f'{property_type} total'
+
+
+# Columns read by the service (including query plans, see api/planner.py),
+# in workbook order
+KEEP_COLUMNS = (
+    [LOCATION_COLUMN, 'year', 'city']
+    + [sold_column(kind) for kind in PROPERTY_TYPES]
+    + [rate_column(kind) for kind in PROPERTY_TYPES]
+    + [UNITS_COLUMN, SUPPLY_COLUMN]
+    + [total_column(kind) for kind in ('flat', 'shop', 'office', 'others')]
+)
+
+CATEGORY_COLUMNS = (LOCATION_COLUMN, 'city')
+
+# Range strings such as "8216-9081", parsed into (low, high) columns
+RANGE_COLUMNS = {
+    f'{kind} - most prevailing rate - range': (
+        f'{kind} - most prevailing rate - low', f'{kind} - most prevailing rate - high',
+    )
+    for kind in PROPERTY_TYPES
+}
+
+_RANGE_PATTERN = re.compile(r'^\s*([\d,]+(?:\.\d+)?)\s*[-–]\s*([\d,]+(?:\.\d+)?)\s*$')
+
+
+def parse_ranges(series: pd.Series) -> pd.DataFrame:
+    """
+    Parse "low-high" range strings into numbers.
+
+    Categorical columns are parsed once per category rather than once per
+    row. Values that are not a range (missing, "-", free text) become NaN.
+
+    Args:
+        series: Column of range strings
+
+    Returns:
+        DataFrame with float 'low' and 'high' columns aligned with ``series``
+    """
+    def parse(values: np.ndarray) -> np.ndarray:
+        bounds = np.full((len(values), 2), np.nan)
+        for position, value in enumerate(values):
+            match = _RANGE_PATTERN.match(value) if isinstance(value, str) else None
+            if match:
+                bounds[position] = [float(group.replace(',', '')) for group in match.groups()]
+        return bounds
+
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Missing values have code -1, which selects the trailing NaN row
+        table = np.vstack([parse(series.cat.categories.to_numpy()), [np.nan, np.nan]])
+        bounds = table[series.cat.codes.to_numpy()]
+    else:
+        bounds = parse(series.to_numpy(dtype=object))
+    return pd.DataFrame({'low': bounds[:, 0], 'high': bounds[:, 1]}, index=series.index)
+
+
+def downcast(series: pd.Series) -> pd.Series:
+    """
+    Narrow a numeric column to the smallest dtype that holds it exactly.
+
+    Integers go to the smallest signed integer type that fits their range.
+    Floats go to float32 only when every value survives the round trip
+    unchanged; floats are never turned into integers, so values render
+    the same as before (4417.0 stays 4417.0).
+
+    Args:
+        series: Column to narrow
+
+    Returns:
+        Narrowed column (the input itself when nothing narrower is exact)
+    """
+    kind = series.dtype.kind
+    if kind in 'iu':
+        return pd.to_numeric(series, downcast='integer')
+    if kind == 'f' and series.dtype.itemsize > 4:
+        values = series.to_numpy()
+        with np.errstate(over='ignore'):
+            narrow = values.astype(np.float32)
+        if np.array_equal(narrow.astype(values.dtype), values, equal_nan=True):
+            return pd.Series(narrow, index=series.index, name=series.name)
+    return series
+
+
+def compact_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Project a parsed workbook onto the columns in use, with compact dtypes.
+
+    Columns missing from the source are skipped, so partial workbooks
+    still load (the service reports what it cannot compute).
+
+    Args:
+        df: Parsed dataset
+
+    Returns:
+        New frame with KEEP_COLUMNS (where present) and the parsed range
+        columns
+    """
+    columns = {}
+    for name in KEEP_COLUMNS:
+        if name not in df.columns:
+            continue
+        series = df[name]
+        if name in CATEGORY_COLUMNS:
+            if not isinstance(series.dtype, pd.CategoricalDtype):
+                series = series.astype('category')
+            # Drop categories no row uses (e.g. after filtering a larger frame)
+            columns[name] = series.cat.remove_unused_categories()
+        else:
+            columns[name] = downcast(series)
+    for source, (low, high) in RANGE_COLUMNS.items():
+        if source in df.columns:
+            bounds = parse_ranges(df[source])
+            columns[low] = downcast(bounds['low'])
+            columns[high] = downcast(bounds['high'])
+    return pd.DataFrame(columns, index=df.index)
+
+
+def column_bytes(df: pd.DataFrame) -> Dict[str, int]:
+    """Bytes held by each column, counting string contents (deep)."""
+    usage = df.memory_usage(deep=True, index=False)
+    return {str(name): int(size) for name, size in usage.items()}
+
+
+def memory_report(before: pd.DataFrame, after: Optional[pd.DataFrame] = None) -> Dict[str, Any]:
+    """
+    Compare the memory footprint of a raw frame and its compact form.
+
+    Args:
+        before: Parsed workbook
+        after: Compact frame (defaults to compact_frame(before))
+
+    Returns:
+        Dict with per-column rows (dtype and bytes before/after, None for
+        columns only on one side) and before/after/ratio totals
+    """
+    if after is None:
+        after = compact_frame(before)
+    bytes_before = column_bytes(before)
+    bytes_after = column_bytes(after)
+    columns: List[Dict[str, Any]] = []
+    for name in list(bytes_before) + [name for name in bytes_after if name not in bytes_before]:
+        columns.append({
+            "column": name,
+            "dtype_before": str(before[name].dtype) if name in bytes_before else None,
+            "bytes_before": bytes_before.get(name),
+            "dtype_after": str(after[name].dtype) if name in bytes_after else None,
+            "bytes_after": bytes_after.get(name),
+        })
+    total_before = sum(bytes_before.values())
+    total_after = sum(bytes_after.values())
+    return {
+        "rows": len(before),
+        "columns": columns,
+        "bytes_before": total_before,
+        "bytes_after": total_after,
+        "ratio": round(total_after / total_before, 4) if total_before else None,
+    }
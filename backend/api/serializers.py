@@ -2,12 +2,69 @@
 Serializers for API requests and responses.
 """
 
+from typing import Any, Dict
+
+from django.conf import settings
 from rest_framework import serializers
 
+from .rankings import ASCENDING, DESCENDING, RANKINGS
+from .tables import COLUMNS, ROWS
+
 
 class QueryRequestSerializer(serializers.Serializer):
     """Serializer for user query request."""
     message = serializers.CharField(max_length=500, required=True)
+    # False leaves the tables out (clients page them from /api/table/); /api/query/ only
+    tables = serializers.BooleanField(default=True)
+
+
+class BatchQueryRequestSerializer(serializers.Serializer):
+    """Serializer for a batch of user queries."""
+    messages = serializers.ListField(
+        child=serializers.CharField(max_length=500),
+        min_length=1,
+        max_length=settings.BATCH_MAX_MESSAGES,
+    )
+    llm_summaries = serializers.BooleanField(default=True)
+
+
+class RankingRequestSerializer(serializers.Serializer):
+    """Serializer for leaderboard query parameters."""
+    metric = serializers.ChoiceField(choices=list(RANKINGS))
+    k = serializers.IntegerField(min_value=1, max_value=settings.RANKING_MAX_K, default=10)
+    city = serializers.CharField(max_length=100, required=False, allow_blank=True)
+    order = serializers.ChoiceField(choices=[DESCENDING, ASCENDING], default=DESCENDING)
+    offset = serializers.IntegerField(min_value=0, default=0)
+    min = serializers.FloatField(required=False)
+    max = serializers.FloatField(required=False)
+
+
+class TableRequestSerializer(serializers.Serializer):
+    """Serializer for table page query parameters."""
+    area = serializers.CharField(max_length=200)
+    # Comma-separated column names (defaults to the standard table columns)
+    columns = serializers.CharField(max_length=1000, required=False, allow_blank=True)
+    cursor = serializers.CharField(max_length=100, required=False, allow_blank=True)
+    limit = serializers.IntegerField(
+        min_value=1, max_value=settings.TABLE_PAGE_MAX_ROWS, default=settings.TABLE_PAGE_SIZE
+    )
+    year_from = serializers.IntegerField(required=False)
+    year_to = serializers.IntegerField(required=False)
+    layout = serializers.ChoiceField(choices=[ROWS, COLUMNS], default=ROWS)
+
+    def validate_columns(self, value):
+        return [name.strip() for name in value.split(',') if name.strip()] or None
+
+
+class TablePageSerializer(serializers.Serializer):
+    """Serializer for one page of an area's table."""
+    area = serializers.CharField()
+    columns = serializers.ListField(child=serializers.CharField())
+    layout = serializers.ChoiceField(choices=[ROWS, COLUMNS])
+    total = serializers.IntegerField()
+    next_cursor = serializers.CharField(allow_null=True)
+    rows = serializers.ListField(child=serializers.DictField(), required=False)
+    data = serializers.DictField(child=serializers.ListField(), required=False)
 
 
 class ChartDataSerializer(serializers.Serializer):
@@ -23,6 +80,65 @@ class QueryResponseSerializer(serializers.Serializer):
     area = serializers.CharField(required=False, allow_blank=True)
     areas = serializers.ListField(required=False)
     summary = serializers.CharField()
+    summary_job = serializers.CharField(required=False, allow_null=True)
     chart = ChartDataSerializer()
     table = serializers.ListField(required=False)
     tables = serializers.DictField(required=False)
+    plan = serializers.DictField(required=False)
+
+
+# Output fields of QueryResponseSerializer in order, with whether a missing
+# value is rendered as null (allow_null) rather than omitted
+QUERY_RESPONSE_FIELDS = [(name, field.allow_null) for name, field in QueryResponseSerializer().fields.items()]
+
+
+class SummaryJobSerializer(serializers.Serializer):
+    """Serializer for the status of a background LLM summary job."""
+    job = serializers.CharField()
+    status = serializers.CharField()
+    summary = serializers.CharField(allow_null=True)
+
+
+def chart_payload(chart: Dict[str, Any]) -> Dict[str, Any]:
+    """Fast equivalent of ``ChartDataSerializer(chart).data`` for service output."""
+    payload = {"years": [str(year) for year in chart["years"]]}
+    if "values" in chart:
+        payload["values"] = [int(value) for value in chart["values"]]
+    if "areas" in chart:
+        payload["areas"] = chart["areas"]
+    return payload
+
+
+def query_response_payload(result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Fast equivalent of ``QueryResponseSerializer(result).data``.
+
+    For trusted results of RealEstateService only: the shape is reproduced
+    (field order, int chart values, omitted optional fields) without
+    per-field validation, and table values such as Fragments pass through.
+    Set settings.API_VALIDATE_RESPONSES to check rendered output against
+    QueryResponseSerializer (see validate_query_response).
+    """
+    payload = {}
+    for name, allow_null in QUERY_RESPONSE_FIELDS:
+        if name not in result:
+            if allow_null:
+                payload[name] = None
+            continue
+        value = result[name]
+        if name == "chart":
+            value = chart_payload(value)
+        elif name in ("type", "area", "summary") or (name == "summary_job" and value is not None):
+            value = str(value)
+        payload[name] = value
+    return payload
+
+
+def validate_query_response(data: Dict[str, Any]) -> None:
+    """
+    Check a decoded response against QueryResponseSerializer.
+
+    Raises:
+        serializers.ValidationError: If the response does not match the schema
+    """
+    QueryResponseSerializer(data=data).is_valid(raise_exception=True)
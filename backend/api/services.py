@@ -5,75 +5,366 @@ Handles Excel parsing, data filtering, and LLM-powered summaries.
 
 import os
 import json
-import requests
+import threading
+import time
+import numpy as np
 import pandas as pd
 import logging
-from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import List, Dict, Any, AsyncIterator, Iterator, Optional, Tuple
 from django.conf import settings
 
+from .aggregates import RATE_COLUMN, location_metrics
+from .cache import make_key, summary_cache
+from .comparison import Comparison, compare_locations
+from .dataset import Dataset
+from .indexes import AreaMatcher, LocationIndex, normalize_location
+from .jobs import summary_job_id, summary_jobs
+from .llm import LLMError, get_llm_client
+from .metrics import count_fallback, record_stage, stage, timed
+from .offload import run_sync
+from .planner import COUNT_METRICS, QueryPlan, parse_query
+from .prompts import build_prompt, format_data_block
+from .rankings import DESCENDING
+from .renderers import Fragment, dumps
+from .shards import ShardedDataset
+from .singleflight import summary_flights
+from .tables import ROWS, table_page
+
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Dataset states (see RealEstateService.status)
+IDLE = "idle"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+# Table columns of a default (flat rate) response
+TABLE_COLUMNS = ['year', 'final location', 'flat_sold - igr', 'flat - weighted average rate', 'total units']
+
+# Generation parameters for HuggingFace summaries (part of the cache key)
+LLM_GENERATION_PARAMETERS = {
+    "max_new_tokens": 150,
+    "temperature": 0.7,
+    "top_p": 0.95,
+}
+
+
+def _year_span(start: int, end: int) -> str:
+    """Year range for summaries ("2021-2023", or "2021" for a single year)."""
+    return f"{start}" if start == end else f"{start}-{end}"
+
+
+class DataNotReady(Exception):
+    """Raised when the dataset is used before it has loaded."""
 
 
 class RealEstateService:
-    """Service for reading and analyzing real estate data from Excel."""
+    """
+    Service for reading and analyzing real estate data from Excel.
+
+    Creating the service does not read the data file. ``start_loading``
+    reads and indexes it on a background thread (the WSGI/ASGI entry points
+    call it at startup, and the health and data views on first use);
+    ``status`` reports the state: idle, loading, ready or failed.
+    """
 
     def __init__(self):
-        """Initialize service with Excel file path."""
-        self.file_path = settings.DATA_FILE_PATH
-        self.df = None
-        self._load_data()
-
-    def _load_data(self) -> None:
-        """Load Excel file into pandas DataFrame."""
-        if os.path.exists(self.file_path):
+        """Initialize service with Excel file path (or shard directory)."""
+        self.file_path = settings.DATA_SHARD_DIR or settings.DATA_FILE_PATH
+        self._local = threading.local()
+        self._dataset: Optional[Dataset] = None
+        self._state = IDLE
+        self._error = None
+        self._state_lock = threading.Lock()
+        self._settled = threading.Event()
+        self._reload_lock = threading.Lock()
+        self._reload_thread = None
+        self._failed_stat = None
+        self.last_reload = {}
+
+    def start_loading(self) -> bool:
+        """
+        Read and index the data file on a background thread.
+
+        Returns:
+            True if loading was started by this call, False if it had
+            already been started
+        """
+        with self._state_lock:
+            if self._state != IDLE:
+                return False
+            self._state = LOADING
+        threading.Thread(target=self._initial_load, name='data-loader', daemon=True).start()
+        return True
+
+    def load(self, timeout: Optional[float] = None) -> Dataset:
+        """
+        Load the data file and wait for it (for scripts and commands).
+
+        Args:
+            timeout: Maximum seconds to wait (None waits indefinitely)
+
+        Returns:
+            The loaded Dataset
+
+        Raises:
+            DataNotReady: If loading failed or did not finish in time
+        """
+        self.start_loading()
+        self._settled.wait(timeout)
+        return self.dataset
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for the first load attempt to finish.
+
+        Returns:
+            True if the dataset is ready
+        """
+        self._settled.wait(timeout)
+        return self.ready
+
+    @property
+    def ready(self) -> bool:
+        """True once a dataset has been published."""
+        return self._dataset is not None
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Describe the data state (for health checks).
+
+        Returns:
+            Dict with state, error, data version, rows, memory and load time
+        """
+        dataset = self._dataset
+        status = {
+            "state": self._state,
+            "error": self._error,
+            "data_version": None,
+            "rows": None,
+            "memory_bytes": None,
+            "load_seconds": None,
+        }
+        if dataset is not None:
+            status.update(
+                data_version=dataset.version,
+                rows=dataset.rows,
+                memory_bytes=dataset.memory_bytes,
+                load_seconds=dataset.load_info.get("load_seconds"),
+            )
+            if isinstance(dataset, ShardedDataset):
+                status["shards"] = dataset.stats()
+        return status
+
+    def _initial_load(self) -> None:
+        """Load the data file for the first time (runs on the loader thread)."""
+        if not os.path.exists(self.file_path):
+            kind = "Shard directory" if settings.DATA_SHARD_DIR else "Excel file"
+            error = f"{kind} not found at {self.file_path}"
+            print(f"✗ {error}")
+            self._fail_load(error)
+        else:
             try:
-                self.df = pd.read_excel(self.file_path, engine='openpyxl')
-                print(f"✓ Data loaded successfully. Rows: {len(self.df)}")
+                dataset = self._read_dataset()
             except Exception as e:
                 print(f"✗ Error loading Excel file: {e}")
-                self.df = self._get_sample_data()
-        else:
-            print(f"✗ Excel file not found at {self.file_path}")
-            self.df = self._get_sample_data()
-
-    def _get_sample_data(self) -> pd.DataFrame:
-        """Return sample data for testing when Excel file is unavailable."""
-        return pd.DataFrame({
-            'Year': [2020, 2021, 2022, 2023, 2024, 2020, 2021, 2022, 2023, 2024],
-            'Area': ['Wakad', 'Wakad', 'Wakad', 'Wakad', 'Wakad', 'Akurdi', 'Akurdi', 'Akurdi', 'Akurdi', 'Akurdi'],
-            'Price': [45, 48, 52, 58, 65, 35, 37, 40, 44, 48],
-            'Demand': [85, 88, 90, 92, 95, 75, 78, 80, 82, 85],
-            'Size': [1200, 1250, 1300, 1400, 1500, 1100, 1150, 1200, 1250, 1300],
-        })
+                stat = os.stat(self.file_path)
+                self._failed_stat = (stat.st_size, stat.st_mtime_ns)
+                self._fail_load(str(e))
+            else:
+                self._publish(dataset)
+        self._settled.set()
+        if settings.DATA_RELOAD_INTERVAL > 0:
+            self.start_watcher(settings.DATA_RELOAD_INTERVAL)
+
+    def _publish(self, dataset: Dataset) -> None:
+        with self._state_lock:
+            self._dataset = dataset
+            self._state = READY
+            self._error = None
+
+    def _fail_load(self, error: str) -> None:
+        # A failed reload leaves a published dataset in service (see last_reload)
+        with self._state_lock:
+            if self._dataset is None:
+                self._state = FAILED
+                self._error = error
+
+    @property
+    def dataset(self) -> Dataset:
+        """
+        Dataset pinned by the current request, or the latest published one.
+
+        Raises:
+            DataNotReady: If no dataset has been loaded yet
+        """
+        dataset = getattr(self._local, 'dataset', None) or self._dataset
+        if dataset is None:
+            raise DataNotReady(self._error or f"Data is {self._state}")
+        return dataset
 
+    @property
+    def df(self) -> pd.DataFrame:
+        """Rows of the current dataset."""
+        return self.dataset.df
+
+    @property
+    def location_index(self) -> LocationIndex:
+        """Location partition index of the current dataset."""
+        return self.dataset.location_index
+
+    @property
+    def area_matcher(self) -> AreaMatcher:
+        """Area name matcher of the current dataset."""
+        return self.dataset.area_matcher
+
+    @property
+    def load_info(self) -> Dict[str, Any]:
+        """Load details of the current dataset."""
+        return self.dataset.load_info
+
+    @property
+    def data_version(self) -> str:
+        """Version id of the data in use; include it in any cache key."""
+        return self.dataset.version
+
+    @contextmanager
+    def pinned(self, dataset: Optional[Dataset] = None):
+        """
+        Pin the current dataset for the duration of a request.
+
+        A reload that publishes a new version mid-request does not affect
+        code running inside this block; nested pins reuse the outer one.
+
+        Args:
+            dataset: Pin this dataset instead of the published one (e.g. a
+                synthetic dataset in benchmarks)
+        """
+        if getattr(self._local, 'dataset', None) is not None:
+            yield self._local.dataset
+            return
+        self._local.dataset = dataset or self.dataset
+        try:
+            yield self._local.dataset
+        finally:
+            self._local.dataset = None
+
+    def _read_dataset(self, previous: Optional[Dataset] = None) -> Dataset:
+        """Read and index the data file (or shard catalog), raising on failure."""
+        # Shared mode memory-maps snapshot columns so all workers read the same pages
+        mmap_mode = 'r' if settings.DATA_SHARED_MEMORY else None
+        if settings.DATA_SHARD_DIR:
+            dataset = ShardedDataset.from_directory(
+                self.file_path,
+                int(settings.DATA_SHARD_MEMORY_MB * 1e6),
+                mmap_mode=mmap_mode,
+                previous=previous if isinstance(previous, ShardedDataset) else None,
+            )
+            print(
+                f"✓ Shard catalog loaded from {self.file_path}. Shards: {len(dataset.shards)}, "
+                f"locations: {len(dataset.location_index.names)}, rows: {dataset.rows} "
+                f"({dataset.load_info['load_seconds'] * 1000:.1f} ms, version {dataset.version})"
+            )
+            return dataset
+        dataset = Dataset.from_file(self.file_path, mmap_mode=mmap_mode)
+        info = dataset.load_info
+        source = "snapshot" if info["snapshot_hit"] else "workbook"
+        mode = ", shared" if info["mmap"] else ""
+        print(
+            f"✓ Data loaded successfully from {source}{mode}. Rows: {len(dataset.df)} "
+            f"({info['load_seconds'] * 1000:.1f} ms, {dataset.memory_bytes / 1e6:.1f} MB, version {dataset.version})"
+        )
+        return dataset
+
+    def reload(self, wait: bool = False) -> bool:
+        """
+        Rebuild the dataset in the background and swap it in atomically.
+
+        Requests already running keep the version they pinned. If the new
+        file cannot be loaded, the current version stays in service. After
+        a failed first load, a successful reload makes the service ready.
+
+        Args:
+            wait: Block until the reload finishes
+
+        Returns:
+            True if a reload was started, False if one is already running
+        """
+        with self._reload_lock:
+            if self._reload_thread is not None and self._reload_thread.is_alive():
+                return False
+            self._reload_thread = threading.Thread(target=self._reload, daemon=True)
+            self._reload_thread.start()
+        if wait:
+            self._reload_thread.join()
+        return True
+
+    def _reload(self) -> None:
+        """Build a new Dataset and publish it (runs on the reload thread)."""
+        started = time.time()
+        previous = self._dataset.version if self._dataset is not None else None
+        try:
+            dataset = self._read_dataset(previous=self._dataset)
+        except Exception as e:
+            if os.path.exists(self.file_path):
+                stat = os.stat(self.file_path)
+                self._failed_stat = (stat.st_size, stat.st_mtime_ns)
+            print(f"✗ Reload failed, keeping data version {previous}: {e}")
+            self._fail_load(str(e))
+            self.last_reload = {"at": started, "ok": False, "error": str(e), "version": previous}
+            return
+        self._failed_stat = None
+        self._publish(dataset)
+        self.last_reload = {"at": started, "ok": True, "previous_version": previous, "version": dataset.version}
+
+    def start_watcher(self, interval: float) -> threading.Thread:
+        """
+        Poll the data file and reload when it changes.
+
+        Args:
+            interval: Seconds between checks
+
+        Returns:
+            The daemon watcher thread
+        """
+        def watch():
+            while True:
+                time.sleep(interval)
+                try:
+                    dataset = self._dataset
+                    if dataset is not None and not dataset.is_stale(self.file_path):
+                        continue
+                    stat = os.stat(self.file_path)
+                    if (stat.st_size, stat.st_mtime_ns) == self._failed_stat:
+                        continue
+                    self.reload()
+                except OSError:
+                    continue
+
+        thread = threading.Thread(target=watch, name='data-file-watcher', daemon=True)
+        thread.start()
+        return thread
+
+    @timed('detect')
     def detect_areas(self, message: str) -> List[str]:
         """
         Detect multiple area names from user message using keyword matching.
         Supports comparison queries like "Compare Area1 and Area2".
+        Matches whole words only; overlapping names resolve to the longest.
         
         Args:
             message: User query message
             
         Returns:
-            List of area names found (empty list if none found)
+            List of area names found, in order of mention (empty list if none found)
         """
-        message_lower = message.lower()
-        
-        # Get unique areas from data
-        if self.df is None or len(self.df) == 0:
+        if self.area_matcher is None:
             return []
         
-        areas = self.df['final location'].unique()
-        found_areas = []
-        
-        # Check for exact or partial matches
-        for area in areas:
-            if area.lower() in message_lower:
-                found_areas.append(area)
-        
-        return found_areas
+        return self.area_matcher.find(message)
 
     def detect_area(self, message: str) -> str:
         """
@@ -88,6 +379,7 @@ class RealEstateService:
         areas = self.detect_areas(message)
         return areas[0] if areas else ""
 
+    @timed('filter')
     def filter_by_area(self, area: str) -> pd.DataFrame:
         """
         Filter data by area name.
@@ -101,14 +393,17 @@ class RealEstateService:
         if self.df is None or area == "":
             return self.df
         
-        return self.df[self.df['final location'].str.lower() == area.lower()]
+        area_data = self.location_index.get(area)
+        return area_data if area_data is not None else self.df.iloc[0:0]
 
-    def get_price_trend(self, area_data: pd.DataFrame) -> Dict[str, List]:
+    @timed('trend')
+    def get_price_trend(self, area_data: pd.DataFrame, value_column: str = RATE_COLUMN) -> Dict[str, List]:
         """
         Extract price trend data for charting.
         
         Args:
             area_data: Filtered DataFrame for specific area
+            value_column: Column to chart (a query plan's metric; flat rate by default)
             
         Returns:
             Dictionary with years and prices for chart
@@ -116,45 +411,71 @@ class RealEstateService:
         if area_data.empty:
             return {"years": [], "values": []}
         
-        trend = area_data[['year', 'flat - weighted average rate']].sort_values('year')
+        trend = area_data[['year', value_column]].sort_values('year')
         trend = trend.dropna()
         
         return {
             "years": trend['year'].astype(str).tolist(),
-            "values": trend['flat - weighted average rate'].tolist(),
+            "values": trend[value_column].tolist(),
         }
 
-    def get_comparison_trend(self, areas: List[str]) -> Dict[str, Any]:
+    @timed('trend')
+    def compare_areas(self, areas: List[str]) -> Comparison:
+        """
+        Pivot the requested areas onto a shared, NaN-aligned year axis.
+        
+        Args:
+            areas: List of area names to compare
+            
+        Returns:
+            Comparison of the areas that have data (see api/comparison.py)
+        """
+        return compare_locations(self.dataset.index_for(areas), areas)
+
+    @timed('trend')
+    def get_comparison_trend(self, areas: List[str], comparison: Optional[Comparison] = None) -> Dict[str, Any]:
         """
         Extract comparison data for multiple areas.
         
+        Every area's values line up with ``years``; years without data for
+        an area are None.
+        
         Args:
             areas: List of area names to compare
+            comparison: Precomputed comparison of ``areas``
             
         Returns:
             Dictionary with comparison data for charting
         """
-        if not areas or self.df is None or self.df.empty:
+        if not areas:
             return {"years": [], "areas": {}}
         
-        # Get years
-        years = sorted(self.df['year'].unique())
-        
-        comparison_data = {
-            "years": [str(y) for y in years],
-            "areas": {}
-        }
+        if comparison is None:
+            comparison = self.compare_areas(areas)
+        return comparison.chart()
+
+    def _area_metrics(self, area: str, area_data: pd.DataFrame) -> Dict[str, Any]:
+        """
+        Metrics for an area's rows.
         
-        # Get data for each area
-        for area in areas:
-            area_data = self.filter_by_area(area)
-            if not area_data.empty:
-                trend = area_data[['year', 'flat - weighted average rate']].sort_values('year')
-                trend = trend.dropna()
-                comparison_data["areas"][area] = trend['flat - weighted average rate'].tolist()
+        Uses the precomputed row from the dataset's metrics table when
+        ``area_data`` is the area's full block, and aggregates ``area_data``
+        directly otherwise (e.g. for a caller-filtered subset).
         
-        return comparison_data
+        Args:
+            area: Area name
+            area_data: Filtered DataFrame for specific area
+            
+        Returns:
+            Dictionary of metric name to value (see aggregates.METRIC_COLUMNS)
+        """
+        metrics = self.dataset.metric_rows.get(normalize_location(area))
+        if metrics is not None and metrics['rows'] == len(area_data):
+            return metrics
+        computed = location_metrics(area_data)
+        return computed.iloc[0].to_dict()
 
+    @timed('summary')
     def get_summary(self, area: str, area_data: pd.DataFrame) -> str:
         """
         Generate natural language summary for area analysis.
@@ -169,57 +490,61 @@ class RealEstateService:
         if area_data.empty:
             return f"No data found for {area}."
         
-        avg_price = area_data['flat - weighted average rate'].mean()
-        total_sales = area_data['flat_sold - igr'].sum()
-        total_units = area_data['total units'].sum()
+        metrics = self._area_metrics(area, area_data)
+        avg_price = metrics['avg_rate']
+        total_sales = metrics['total_sales']
+        total_units = metrics['total_units']
         
         return f"Area: {area} | Avg Rate: ₹{avg_price:,.0f}/sqft | Total Sales: {total_sales} | Units: {total_units}"
 
-    def get_comparison_summary(self, areas: List[str]) -> str:
+    @timed('summary')
+    def get_comparison_summary(self, areas: List[str], comparison: Optional[Comparison] = None) -> str:
         """
         Generate summary for comparison of multiple areas.
         
         Args:
             areas: List of area names to compare
+            comparison: Precomputed comparison of ``areas``
             
         Returns:
             Summary text with comparison
         """
+        if comparison is None:
+            comparison = self.compare_areas(areas)
+        
         summaries = []
-        for area in areas:
-            area_data = self.filter_by_area(area)
-            if not area_data.empty:
-                avg_price = area_data['flat - weighted average rate'].mean()
+        metric_rows = self.dataset.metric_rows
+        for area, key in zip(comparison.areas, comparison.keys):
+            metrics = metric_rows.get(key)
+            if metrics is not None:
+                avg_price = metrics['avg_rate']
                 summaries.append(f"{area}: ₹{avg_price:,.0f}/sqft")
         
         return " | ".join(summaries) if summaries else "No data found for comparison."
 
-    def _format_table_as_text(self, area_data: pd.DataFrame) -> str:
+    def _format_table_as_text(self, area: str, area_data: pd.DataFrame) -> str:
         """
         Format DataFrame rows as readable text for LLM prompt.
         
+        Uses the block precompiled for this data version when ``area_data``
+        is the area's full row block, and renders ``area_data`` otherwise.
+        
         Args:
+            area: Area name
             area_data: Filtered DataFrame for specific area
             
         Returns:
             Formatted text representation of the data
         """
-        if area_data.empty:
-            return "No data available."
-        
-        text_lines = []
-        for idx, row in area_data.iterrows():
-            year = int(row['year'])
-            price = row['flat - weighted average rate']
-            sales = row['flat_sold - igr']
-            units = row['total units']
-            text_lines.append(
-                f"Year {year}: Price ₹{price:,.0f}/sqft, "
-                f"Sales {sales}, Units {units}"
-            )
-        
-        return "\n".join(text_lines)
+        dataset = self.dataset
+        key = normalize_location(area)
+        block = dataset.location_index.blocks.get(key)
+        compiled = dataset.prompt_blocks.get(key)
+        if compiled is not None and block is not None and block.stop - block.start == len(area_data):
+            return compiled
+        return format_data_block(area_data, settings.LLM_PROMPT_MAX_CHARS)
 
+    @timed('summary')
     def _generate_analytical_summary(self, area: str, area_data: pd.DataFrame) -> str:
         """
         Generate a sophisticated summary by analyzing data patterns.
@@ -228,27 +553,24 @@ class RealEstateService:
         if area_data.empty:
             return f"No data available for {area}."
         
-        # Extract key metrics
-        prices = area_data['flat - weighted average rate'].astype(float)
-        sales = area_data['flat_sold - igr'].astype(float)
-        years = area_data['year'].astype(int)
+        # Precomputed metrics for the area
+        metrics = self._area_metrics(area, area_data)
         
         # Calculate trends
-        price_trend = ((prices.iloc[-1] - prices.iloc[0]) / prices.iloc[0] * 100) if len(prices) > 1 else 0
-        sales_trend = ((sales.iloc[-1] - sales.iloc[0]) / sales.iloc[0] * 100) if len(sales) > 1 else 0
+        price_trend = metrics['rate_growth_pct']
+        sales_trend = metrics['sales_growth_pct']
         
         # Get price range
-        min_price = prices.min()
-        max_price = prices.max()
-        avg_price = prices.mean()
+        min_price = metrics['min_rate']
+        max_price = metrics['max_rate']
+        avg_price = metrics['avg_rate']
         
         # Total transactions
-        total_sales = sales.sum()
-        avg_sales_per_year = sales.mean()
+        total_sales = metrics['total_sales']
         
         # Year range
-        start_year = years.min()
-        end_year = years.max()
+        start_year = metrics['year_start']
+        end_year = metrics['year_end']
         
         # Generate insights
         price_direction = "upward" if price_trend > 0 else "downward"
@@ -258,7 +580,7 @@ class RealEstateService:
         sales_magnitude = f"{abs(sales_trend):.1f}%"
         
         # Volatility assessment
-        price_volatility = prices.std() / prices.mean() * 100 if prices.mean() > 0 else 0
+        price_volatility = metrics['volatility_pct']
         volatility_desc = "stable" if price_volatility < 10 else "moderate" if price_volatility < 20 else "volatile"
         
         # Build comprehensive summary
@@ -270,6 +592,79 @@ class RealEstateService:
         
         return " ".join(summary_lines)
 
+    def _summary_cache_key(self, area: str) -> str:
+        """Cache key for an area's LLM summary under the current data version and model."""
+        return make_key(
+            'summary', area, self.data_version, settings.HUGGINGFACE_MODEL, LLM_GENERATION_PARAMETERS
+        )
+
+    def _build_llm_prompt(self, area: str, area_data: pd.DataFrame, dataset: Optional[Dataset] = None) -> str:
+        """
+        Build the HuggingFace prompt for an area.
+
+        Args:
+            area: Area name
+            area_data: Filtered DataFrame for specific area
+            dataset: Version to read precompiled data from, for callers that
+                run outside the request's pin (default: the pinned one)
+        """
+        with self.pinned(dataset):
+            return build_prompt(area, self._format_table_as_text(area, area_data))
+
+    @timed('llm')
+    def _request_llm_summary(self, area: str, area_data: pd.DataFrame) -> Optional[str]:
+        """
+        Call the HuggingFace Inference API once.
+        
+        Args:
+            area: Area name
+            area_data: Filtered DataFrame for specific area
+            
+        Returns:
+            Generated summary text, or None if the call failed or was skipped
+            because the circuit breaker is open
+        """
+        model_name = settings.HUGGINGFACE_MODEL
+        prompt = self._build_llm_prompt(area, area_data)
+        
+        print(f"[LLM] Calling HuggingFace API ({model_name}) for {area}...")
+        try:
+            summary = get_llm_client().generate(prompt, LLM_GENERATION_PARAMETERS, model_name)
+        except LLMError as e:
+            print(f"[LLM] {e} for {area}, using analytical summary")
+            count_fallback(e.reason)
+            return None
+        
+        if not summary:
+            count_fallback("empty")
+            return None
+        print(f"[LLM] Summary generated for {area}")
+        return summary
+
+    async def _arequest_llm_summary(
+        self, area: str, area_data: pd.DataFrame, dataset: Optional[Dataset] = None
+    ) -> Optional[str]:
+        """Async version of _request_llm_summary; the prompt is built from ``dataset``."""
+        model_name = settings.HUGGINGFACE_MODEL
+        prompt = await run_sync(self._build_llm_prompt, area, area_data, dataset)
+        
+        print(f"[LLM] Calling HuggingFace API ({model_name}) for {area}...")
+        start = time.perf_counter()
+        try:
+            summary = await get_llm_client().agenerate(prompt, LLM_GENERATION_PARAMETERS, model_name)
+        except LLMError as e:
+            print(f"[LLM] {e} for {area}, using analytical summary")
+            count_fallback(e.reason)
+            return None
+        finally:
+            record_stage("llm", time.perf_counter() - start)
+        
+        if not summary:
+            count_fallback("empty")
+            return None
+        print(f"[LLM] Summary generated for {area}")
+        return summary
+
     def generate_llm_summary(self, area: str, area_data: pd.DataFrame) -> str:
         """
         Generate LLM-powered summary using HuggingFace Inference API.
@@ -289,96 +684,290 @@ class RealEstateService:
         api_key = settings.HUGGINGFACE_API_KEY
         if not api_key:
             logger.warning("HuggingFace API key not found, using fallback summary")
+            count_fallback("missing_key")
             return self.get_summary(area, area_data)
         
-        # Format data for LLM prompt
-        table_text = self._format_table_as_text(area_data)
+        # Serve repeated questions about the same area and data version from cache
+        cache_key = self._summary_cache_key(area)
+        cached = summary_cache.get(cache_key)
+        if cached is not None:
+            return cached
         
-        # Build prompt following the template
-        prompt = f"""Write a concise real-estate analysis summary (5-8 lines) for the locality '{area}' using the following dataset. Focus on price trend, demand trend, growth patterns, and any notable changes.
-
-Data:
-{table_text}
+        summary = self._coalesced_llm_summary(cache_key, area, area_data)
+        if summary is None:
+            return self._generate_analytical_summary(area, area_data)
+        return summary
 
-Summary:"""
+    def _coalesced_llm_summary(self, cache_key: str, area: str, area_data: pd.DataFrame) -> Optional[str]:
+        """
+        Fetch an LLM summary, sharing one call among concurrent identical requests.
         
-        try:
-            # Call HuggingFace Inference API
-            headers = {
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json"
-            }
-            
-            payload = {
-                "inputs": prompt,
-                "parameters": {
-                    "max_new_tokens": 150,
-                    "temperature": 0.7,
-                    "top_p": 0.95,
-                }
-            }
+        Requests with the same cache key (area, data version, model and
+        parameters) wait for a single prompt build and HuggingFace call, in
+        this worker or in another one, and all receive its result or None.
+        
+        Args:
+            cache_key: Summary cache key for the area
+            area: Area name
+            area_data: Filtered DataFrame for specific area
             
-            # Use a reliable model with HuggingFace Inference API
-            # Note: Mistral-7B might require private deployment, so we use a more accessible model
-            # You can replace with any model ID available in HuggingFace's inference API
-            model_name = "mistralai/Mistral-7B-Instruct-v0.1"
+        Returns:
+            Generated summary text, or None if it could not be produced
+        """
+        def compute():
+            summary = self._request_llm_summary(area, area_data)
+            if summary is not None:
+                summary_cache.set(cache_key, summary)
+            return summary
+        
+        return summary_flights.do(cache_key, compute, wait_for=lambda: summary_cache.get(cache_key))
+
+    async def _acoalesced_llm_summary(
+        self, cache_key: str, area: str, area_data: pd.DataFrame, dataset: Optional[Dataset] = None
+    ) -> Optional[str]:
+        """Async version of _coalesced_llm_summary; the prompt is built from ``dataset``."""
+        async def compute():
+            summary = await self._arequest_llm_summary(area, area_data, dataset)
+            if summary is not None:
+                await run_sync(summary_cache.set, cache_key, summary)
+            return summary
+        
+        return await summary_flights.ado(cache_key, compute, wait_for=lambda: summary_cache.get(cache_key))
+
+    def start_llm_summary(
+        self, area: str, area_data: pd.DataFrame, background: bool = True
+    ) -> Tuple[str, Optional[str]]:
+        """
+        Return a summary immediately and upgrade it to an LLM summary in the background.
+        
+        A cached LLM summary is returned directly. Otherwise the analytical
+        summary is returned together with a job id; the LLM call runs on
+        the bounded summary executor (or, under ASGI, on the event loop) and
+        its result can be fetched from GET /api/summary/<job_id>/.
+        
+        Args:
+            area: Area name
+            area_data: Filtered DataFrame for specific area
+            background: Start the LLM job (False when the caller streams it instead)
             
-            # Try with inference endpoint
-            url = f"https://api-inference.huggingface.co/models/{model_name}"
+        Returns:
+            Tuple of (summary to show now, job id or None if no upgrade is coming)
+        """
+        if area_data.empty:
+            return f"No data available for {area}.", None
+        
+        analytical = self._generate_analytical_summary(area, area_data)
+        if not settings.HUGGINGFACE_API_KEY:
+            count_fallback("missing_key")
+            return analytical, None
+        
+        cache_key = self._summary_cache_key(area)
+        cached = summary_cache.get(cache_key)
+        if cached is not None:
+            return cached, None
+        
+        if not background:
+            return analytical, None
+        if get_llm_client().breaker.is_open():
+            # Nothing to upgrade to while the circuit breaker is open
+            count_fallback("circuit_open")
+            return analytical, None
+        
+        job_id = summary_job_id(cache_key)
+        job = self._arun_summary_job if summary_jobs.event_loop is not None else self._run_summary_job
+        # Jobs run outside this request's pin: hand them the version the cache key names
+        if not summary_jobs.submit(job_id, job, self.dataset, cache_key, area, area_data, analytical):
+            # Executor is saturated; the analytical summary is the answer
+            count_fallback("saturated")
+            return analytical, None
+        return analytical, job_id
+
+    def _run_summary_job(
+        self, dataset: Dataset, cache_key: str, area: str, area_data: pd.DataFrame, fallback: str
+    ) -> Tuple[str, str]:
+        """Background body of an LLM summary job, run with ``dataset`` pinned."""
+        with self.pinned(dataset):
+            summary = self._coalesced_llm_summary(cache_key, area, area_data)
+        if summary is None:
+            return "failed", fallback
+        return "done", summary
+
+    async def _arun_summary_job(
+        self, dataset: Dataset, cache_key: str, area: str, area_data: pd.DataFrame, fallback: str
+    ) -> Tuple[str, str]:
+        """Background body of an LLM summary job, run on the event loop."""
+        summary = await self._acoalesced_llm_summary(cache_key, area, area_data, dataset)
+        if summary is None:
+            return "failed", fallback
+        return "done", summary
+
+    def _stream_llm_tokens(self, area: str, area_data: pd.DataFrame, dataset: Dataset) -> Iterator[str]:
+        """
+        Stream summary tokens from the HuggingFace Inference API.
+        
+        Args:
+            area: Area name
+            area_data: Filtered DataFrame for specific area
+            dataset: Version the prompt is built from (the stream outlives
+                the request's pin)
             
-            print(f"[LLM] Calling HuggingFace API ({model_name}) for {area}...")
-            response = requests.post(
-                url,
-                headers=headers,
-                json=payload,
-                timeout=30
-            )
+        Yields:
+            Generated text fragments as they arrive
             
-            # Check response status
-            if response.status_code == 200:
-                result = response.json()
-                
-                # Extract generated text
-                if isinstance(result, list) and len(result) > 0:
-                    generated_text = result[0].get('generated_text', '')
-                    # Remove the prompt from the response
-                    summary = generated_text.replace(prompt, '').strip()
-                    print(f"[LLM] Summary generated for {area}")
-                    return summary if summary else self._generate_analytical_summary(area, area_data)
-                else:
-                    print(f"[LLM] Unexpected HF response format: {result}")
-                    return self._generate_analytical_summary(area, area_data)
-            
-            elif response.status_code == 410:
-                print(f"[LLM] HuggingFace API endpoint deprecated (410), using analytical summary")
-                return self._generate_analytical_summary(area, area_data)
-            
-            elif response.status_code == 503:
-                print(f"[LLM] HuggingFace model is loading, using analytical summary")
-                return self._generate_analytical_summary(area, area_data)
+        Raises:
+            LLMError: If the API rejects the request or the stream breaks
+        """
+        model_name = settings.HUGGINGFACE_MODEL
+        prompt = self._build_llm_prompt(area, area_data, dataset)
+        
+        print(f"[LLM] Streaming HuggingFace API ({model_name}) for {area}...")
+        yield from get_llm_client().stream(prompt, LLM_GENERATION_PARAMETERS, model_name)
+
+    async def _astream_llm_tokens(self, area: str, area_data: pd.DataFrame, dataset: Dataset) -> AsyncIterator[str]:
+        """Async version of _stream_llm_tokens (the prompt is built on the offload pool)."""
+        model_name = settings.HUGGINGFACE_MODEL
+        prompt = await run_sync(self._build_llm_prompt, area, area_data, dataset)
+        
+        print(f"[LLM] Streaming HuggingFace API ({model_name}) for {area}...")
+        async for token in get_llm_client().astream(prompt, LLM_GENERATION_PARAMETERS, model_name):
+            yield token
+
+    def stream_query(self, message: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Analysis pipeline that streams the LLM summary.
+        
+        The full result (chart, table and an immediate analytical summary)
+        is yielded first, then summary tokens as the model produces them,
+        then the final summary. A failed stream falls back to the
+        analytical summary.
+        
+        Args:
+            message: User query message
             
-            else:
-                print(f"[LLM] HF API error {response.status_code}: {response.text[:200]}")
-                return self._generate_analytical_summary(area, area_data)
+        Yields:
+            (event, data) pairs: "result", any number of "token", then "summary"
+        """
+        result, area, area_data, dataset, cache_key, cached = self._prepare_stream(message)
+        yield "result", result
         
-        except requests.exceptions.Timeout:
-            print(f"[LLM] HuggingFace API timeout for {area}, using analytical summary")
-            return self._generate_analytical_summary(area, area_data)
+        summary = self._stream_shortcut(result, cache_key, cached)
+        if summary is not None:
+            yield "summary", summary
+            return
         
-        except requests.exceptions.RequestException as e:
-            print(f"[LLM] HuggingFace API error: {str(e)}, using analytical summary")
-            return self._generate_analytical_summary(area, area_data)
+        tokens, error = [], None
+        start = time.perf_counter()
+        try:
+            for token in self._stream_llm_tokens(area, area_data, dataset):
+                tokens.append(token)
+                yield "token", {"text": token}
+        except LLMError as e:
+            error = e
+        summary, text = self._stream_outcome(result, area, tokens, error, start)
+        if text is not None:
+            summary_cache.set(cache_key, text)
+        yield "summary", summary
+
+    async def astream_query(self, message: str) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Async version of stream_query: the analysis runs on the offload pool
+        and the LLM stream on the event loop.
+        """
+        result, area, area_data, dataset, cache_key, cached = await run_sync(self._prepare_stream, message)
+        yield "result", result
         
-        except Exception as e:
-            print(f"[LLM] Unexpected error generating summary: {str(e)}")
-            return self._generate_analytical_summary(area, area_data)
+        summary = self._stream_shortcut(result, cache_key, cached)
+        if summary is not None:
+            yield "summary", summary
+            return
+        
+        tokens, error = [], None
+        start = time.perf_counter()
+        try:
+            async for token in self._astream_llm_tokens(area, area_data, dataset):
+                tokens.append(token)
+                yield "token", {"text": token}
+        except LLMError as e:
+            error = e
+        summary, text = self._stream_outcome(result, area, tokens, error, start)
+        if text is not None:
+            await run_sync(summary_cache.set, cache_key, text)
+        yield "summary", summary
+
+    @staticmethod
+    def _stream_shortcut(
+        result: Dict[str, Any], cache_key: Optional[str], cached: Optional[str]
+    ) -> Optional[Dict[str, Any]]:
+        """Final "summary" event of a stream that needs no LLM call, or None if it does."""
+        if cache_key is None:
+            return {"summary": result["summary"], "source": "analytical"}
+        if cached is not None:
+            return {"summary": cached, "source": "llm"}
+        return None
+
+    def _stream_outcome(
+        self, result: Dict[str, Any], area: str, tokens: List[str], error: Optional[LLMError], start: float
+    ) -> Tuple[Dict[str, Any], Optional[str]]:
+        """
+        Final "summary" event once an LLM token stream has ended.
+        
+        Args:
+            result: Streamed analysis (its analytical summary is the fallback)
+            area: Area name
+            tokens: Text fragments received
+            error: Error that ended the stream, or None if it completed
+            start: perf_counter() reading taken when the stream started
+            
+        Returns:
+            Tuple of (event data, LLM summary to cache or None)
+        """
+        record_stage("llm_stream", time.perf_counter() - start)
+        fallback = {"summary": result["summary"], "source": "analytical"}
+        if error is not None:
+            print(f"[LLM] Stream failed for {area}: {error}, using analytical summary")
+            count_fallback(error.reason)
+            return fallback, None
+        summary = "".join(tokens).strip()
+        if not summary:
+            count_fallback("empty")
+            return fallback, None
+        return {"summary": summary, "source": "llm"}, summary
+
+    def _prepare_stream(
+        self, message: str
+    ) -> Tuple[Dict[str, Any], str, pd.DataFrame, Dataset, Optional[str], Optional[str]]:
+        """
+        Analysis half of a streamed query.
+        
+        Args:
+            message: User query message
+            
+        Returns:
+            Tuple of (result, area, area data, the dataset they were read
+            from, summary cache key or None if no LLM summary is coming,
+            cached LLM summary or None)
+        """
+        with self.pinned() as dataset:
+            result = self.analyze_query(message, background_summary=False)
+            area = result.get("area", "")
+            area_data = self.filter_by_area(area) if area else pd.DataFrame()
+            # Narrowed plans keep their analytical summary (see analyze_plan)
+            if result["type"] != "single" or "plan" in result or area_data.empty:
+                return result, area, area_data, dataset, None, None
+            if not settings.HUGGINGFACE_API_KEY:
+                count_fallback("missing_key")
+                return result, area, area_data, dataset, None, None
+            cache_key = self._summary_cache_key(area)
+        return result, area, area_data, dataset, cache_key, summary_cache.get(cache_key)
 
-    def get_table_data(self, area_data: pd.DataFrame) -> List[Dict[str, Any]]:
+    @timed('table')
+    def get_table_data(self, area_data: pd.DataFrame, columns: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         """
         Convert DataFrame to list of dictionaries for JSON response.
         
         Args:
             area_data: Filtered DataFrame for specific area
+            columns: Columns to include (defaults to TABLE_COLUMNS)
             
         Returns:
             List of row dictionaries
@@ -390,12 +979,169 @@ Summary:"""
         area_data = area_data.sort_values('year')
         
         # Select key columns for display
-        display_cols = ['year', 'final location', 'flat_sold - igr', 'flat - weighted average rate', 'total units']
+        display_cols = TABLE_COLUMNS if columns is None else columns
         available_cols = [col for col in display_cols if col in area_data.columns]
         
         return area_data[available_cols].to_dict('records')
 
-    def analyze_query(self, message: str) -> Dict[str, Any]:
+    @timed('table')
+    def get_table_page(
+        self,
+        area: str,
+        columns: Optional[List[str]] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        year_from: Optional[int] = None,
+        year_to: Optional[int] = None,
+        layout: str = ROWS,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        One page of an area's table (see api/tables.py).
+        
+        Args:
+            area: Area name
+            columns: Columns to return (defaults to TABLE_COLUMNS present in the data)
+            limit: Most rows to return (defaults to settings.TABLE_PAGE_SIZE)
+            cursor: ``next_cursor`` of the previous page
+            year_from: First year to include
+            year_to: Last year to include
+            layout: "rows" for row objects, "columns" for one array per column
+            
+        Returns:
+            Page dictionary, or None if the area is unknown
+            
+        Raises:
+            ValueError: If a column does not exist or the cursor is malformed
+        """
+        with self.pinned():
+            index = self.dataset.index_for([area])
+            if columns is None:
+                columns = [name for name in TABLE_COLUMNS if name in index.df.columns]
+            return table_page(
+                index,
+                area,
+                list(dict.fromkeys(columns)),
+                limit or settings.TABLE_PAGE_SIZE,
+                cursor=cursor,
+                year_from=year_from,
+                year_to=year_to,
+                layout=layout,
+            )
+
+    @timed('table')
+    def get_table_fragment(self, area: str) -> Fragment:
+        """
+        Table of an area as pre-encoded JSON.
+        
+        Encoded once per area and data version, then spliced into responses
+        by the fast renderer (see api/renderers.py).
+        
+        Args:
+            area: Area name
+            
+        Returns:
+            Fragment holding the JSON of get_table_data for the area
+        """
+        dataset = self.dataset
+        key = normalize_location(area)
+        data = dataset.table_fragments.get(key)
+        if data is None:
+            data = dumps(self.get_table_data(self.filter_by_area(area) if area else pd.DataFrame()))
+            if key in dataset.location_index.blocks:
+                dataset.table_fragments[key] = data
+        return Fragment(data)
+
+    @timed('rank')
+    def get_rankings(
+        self,
+        metric: str,
+        k: int = 10,
+        city: Optional[str] = None,
+        order: str = DESCENDING,
+        offset: int = 0,
+        min_value: Optional[float] = None,
+        max_value: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        Leaderboard of locations by a precomputed metric.
+        
+        Reads the sorted orders built with the dataset (see api/rankings.py),
+        so the cost grows with ``k``, not with the number of locations.
+        
+        Args:
+            metric: Ranking name (see rankings.RANKINGS)
+            k: Number of locations to return
+            city: Only rank locations in this city
+            order: "desc" for the highest values first, "asc" for the lowest
+            offset: Number of ranked locations to skip
+            min_value: Only locations with a value of at least this
+            max_value: Only locations with a value of at most this
+            
+        Returns:
+            Dictionary with the ranked locations and how many match
+        """
+        return self.dataset.leaderboard.rank(metric, k, city, order, offset, min_value, max_value)
+
+    def detect_mode(self, message: str) -> Tuple[bool, List[str]]:
+        """
+        Detect areas and decide between single-area and comparison mode.
+        
+        Args:
+            message: User query message
+            
+        Returns:
+            Tuple of (is comparison, detected areas)
+        """
+        areas = self.detect_areas(message)
+        is_comparison = len(areas) > 1 or 'compare' in message.lower()
+        return is_comparison and len(areas) > 1, areas
+
+    def plan_query(self, message: str) -> QueryPlan:
+        """
+        Detect areas and mode, and read any year window, metric and property
+        type from the message (see api/planner.py).
+        
+        Args:
+            message: User query message
+            
+        Returns:
+            QueryPlan for the message
+        """
+        is_comparison, areas = self.detect_mode(message)
+        return parse_query(message, areas, is_comparison)
+
+    def query_cache_key(
+        self, is_comparison: bool, areas: List[str], plan: Optional[QueryPlan] = None, tables: bool = True
+    ) -> str:
+        """
+        Cache key for the response to a resolved query.
+        
+        Messages that detect the same areas in the same mode share a key
+        ("Analyze Wakad", "wakad trends"). The key also covers the data
+        version and, for single-area queries, whether the LLM summary is
+        ready, so a cached analytical answer is replaced once it is.
+        Narrowed plans add their filters to the key, and responses without
+        tables are keyed apart from full ones.
+        
+        Args:
+            is_comparison: Comparison mode flag (see detect_mode)
+            areas: Detected areas
+            plan: Query plan of the message (see plan_query)
+            tables: Whether the response includes the tables
+            
+        Returns:
+            Cache key
+        """
+        area_keys = sorted(normalize_location(area) for area in areas)
+        parts = [] if tables else ['no-tables']
+        if plan is not None and plan.narrowed:
+            return make_key('query', self.data_version, is_comparison, area_keys, 'plan', plan.key(), *parts)
+        llm_ready = False
+        if not is_comparison and areas and settings.HUGGINGFACE_API_KEY:
+            llm_ready = summary_cache.get(self._summary_cache_key(areas[0])) is not None
+        return make_key('query', self.data_version, is_comparison, area_keys, llm_ready, *parts)
+
+    def analyze_query(self, message: str, background_summary: bool = True) -> Dict[str, Any]:
         """
         Complete analysis pipeline for user query.
         Supports single area analysis and comparison of multiple areas.
@@ -403,44 +1149,394 @@ Summary:"""
         
         Args:
             message: User query message
+            background_summary: Start a background LLM summary job for single-area queries
             
         Returns:
             Dictionary with LLM summary, chart data, and table
         """
-        # Detect areas
-        areas = self.detect_areas(message)
+        # Pin one data version for the whole request
+        with self.pinned():
+            # Detect areas, comparison mode and any narrowing filters
+            plan = self.plan_query(message)
+            return self.analyze_intent(plan.is_comparison, plan.areas, background_summary, plan=plan)
+
+    def analyze_intent(
+        self,
+        is_comparison: bool,
+        areas: List[str],
+        background_summary: bool = True,
+        fragments: bool = False,
+        plan: Optional[QueryPlan] = None,
+        tables: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Build the response for an already resolved query.
         
-        # Check if it's a comparison query
-        is_comparison = len(areas) > 1 or 'compare' in message.lower()
+        Args:
+            is_comparison: Comparison mode flag (see detect_mode)
+            areas: Detected areas
+            background_summary: Start a background LLM summary job for single-area queries
+            fragments: Return tables as pre-encoded JSON Fragments (for the
+                fast renderer) instead of lists of rows
+            plan: Query plan of the message; narrowed plans are answered by analyze_plan
+            tables: Include the tables (clients that page them through
+                get_table_page leave them out)
+            
+        Returns:
+            Dictionary with LLM summary, chart data, and table
+        """
+        if plan is not None and plan.narrowed:
+            return self.analyze_plan(plan, tables)
         
-        if is_comparison and len(areas) > 1:
-            # Handle comparison mode
-            result = {
-                "type": "comparison",
-                "areas": areas,
-                "summary": self.get_comparison_summary(areas),
-                "chart": self.get_comparison_trend(areas),
-                "tables": {}
-            }
+        with self.pinned():
+            if is_comparison:
+                # Handle comparison mode: one pivot feeds the chart and the summary
+                comparison = self.compare_areas(areas)
+                result = {
+                    "type": "comparison",
+                    "areas": areas,
+                    "summary": self.get_comparison_summary(areas, comparison),
+                    "chart": self.get_comparison_trend(areas, comparison),
+                    "tables": {}
+                }
+                if not tables:
+                    del result["tables"]
             
-            # Add individual tables for each area
-            for area in areas:
-                area_data = self.filter_by_area(area)
-                result["tables"][area] = self.get_table_data(area_data)
-        else:
-            # Single area analysis - Use LLM-powered summary
-            area = areas[0] if areas else ""
-            area_data = self.filter_by_area(area) if area else pd.DataFrame()
+                # Add individual tables for each area
+                for area in (areas if tables else []):
+                    if fragments:
+                        result["tables"][area] = self.get_table_fragment(area)
+                    else:
+                        area_data = self.filter_by_area(area)
+                        result["tables"][area] = self.get_table_data(area_data)
+            else:
+                # Single area analysis - Use LLM-powered summary
+                area = areas[0] if areas else ""
+                area_data = self.filter_by_area(area) if area else pd.DataFrame()
+            
+                # Answer now with the analytical summary; the LLM upgrade runs in the background
+                summary, summary_job = self.start_llm_summary(area, area_data, background_summary)
             
-            # Generate LLM summary instead of static summary
-            llm_summary = self.generate_llm_summary(area, area_data)
+                result = {
+                    "type": "single",
+                    "area": area,
+                    "summary": summary,
+                    "summary_job": summary_job,
+                    "chart": self.get_price_trend(area_data),
+                }
+                if tables:
+                    result["table"] = self.get_table_fragment(area) if fragments else self.get_table_data(area_data)
+        
+        return result
+
+    def analyze_plan(self, plan: QueryPlan, tables: bool = True) -> Dict[str, Any]:
+        """
+        Build the response for a narrowed query plan.
+        
+        Only the rows in the plan's year window and the columns it needs are
+        read from the location index. Summaries are analytical: LLM summaries
+        cover an area's full flat-rate history, so they are only started for
+        default plans.
+        
+        Args:
+            plan: Query plan with a year window, metric or property type
+            tables: Include the tables (the plan lists their columns either way)
+            
+        Returns:
+            Dictionary with summary, chart data, table(s) and the resolved plan
+        """
+        with self.pinned():
+            index = self.dataset.index_for(plan.areas)
+            latest = None
+            if plan.last_years is not None:
+                bounds = [index.year_bounds(area) for area in plan.areas]
+                latest = max((bound[1] for bound in bounds if bound is not None), default=None)
+            year_from, year_to = plan.years(latest)
+            columns = TABLE_COLUMNS if plan.column in TABLE_COLUMNS else ['year', 'final location', plan.column]
             
+            if plan.is_comparison:
+                with stage('trend'):
+                    comparison = compare_locations(index, plan.areas, plan.column, year_from, year_to)
+                result = {
+                    "type": "comparison",
+                    "areas": plan.areas,
+                    "summary": self._plan_comparison_summary(plan, comparison),
+                    "chart": comparison.chart(),
+                    "plan": plan.describe(year_from, year_to, columns),
+                }
+                if tables:
+                    result["tables"] = {}
+                    for area in plan.areas:
+                        with stage('filter'):
+                            area_data = index.get(area, year_from, year_to, columns)
+                        result["tables"][area] = self.get_table_data(
+                            area_data if area_data is not None else pd.DataFrame(), columns
+                        )
+                return result
+            
+            area = plan.areas[0] if plan.areas else ""
+            area_data = None
+            if area:
+                with stage('filter'):
+                    area_data = index.get(area, year_from, year_to, columns)
+            if area_data is None:
+                area_data = pd.DataFrame()
+            chart = {"years": [], "values": []}
+            if plan.column in area_data:
+                chart = self.get_price_trend(area_data, plan.column)
             result = {
                 "type": "single",
                 "area": area,
-                "summary": llm_summary,  # Now LLM-powered!
-                "chart": self.get_price_trend(area_data),
-                "table": self.get_table_data(area_data),
+                "summary": self._plan_summary(plan, area, area_data),
+                "summary_job": None,
+                "chart": chart,
+                "plan": plan.describe(year_from, year_to, columns),
             }
+            if tables:
+                result["table"] = self.get_table_data(area_data, columns)
+            return result
+
+    @timed('summary')
+    def _plan_summary(self, plan: QueryPlan, area: str, area_data: pd.DataFrame) -> str:
+        """
+        Analytical summary of one area's rows under a narrowed plan.
         
-        return result
+        Flat rates over two or more years get the full analytical summary
+        over the window; other metrics, and windows holding a single year
+        (which have no trend or volatility), get their average (rates) or
+        total (counts), range and change from the first to the last year.
+        """
+        if area_data.empty or plan.column not in area_data:
+            return f"No data available for {area}."
+        if plan.column == RATE_COLUMN and area_data['year'].nunique() > 1:
+            return self._generate_analytical_summary(area, area_data)
+        
+        series = area_data[['year', plan.column]].dropna()
+        if series.empty:
+            return f"No {plan.noun} data for {area}."
+        years = series['year'].astype(int).to_numpy()
+        values = series[plan.column].astype(float).to_numpy()
+        start_year, end_year = years.min(), years.max()
+        first, last = values[years.argmin()], values[years.argmax()]
+        heading = f"{area} {plan.noun} ({_year_span(start_year, end_year)}):"
+        
+        if start_year == end_year:
+            if plan.metric in COUNT_METRICS:
+                return f"{heading} {values.mean():,.0f}."
+            return f"{heading} Rs {values.mean():,.0f}/sqft."
+        change = (last - first) / first * 100 if first else 0.0
+        if plan.metric in COUNT_METRICS:
+            return (
+                f"{heading} {values.sum():,.0f} in total, {values.mean():,.0f} per year on average. "
+                f"{first:,.0f} in {start_year} vs {last:,.0f} in {end_year} ({change:+.1f}%)."
+            )
+        return (
+            f"{heading} average Rs {values.mean():,.0f}/sqft, "
+            f"range Rs {values.min():,.0f} to Rs {values.max():,.0f}/sqft, "
+            f"{change:+.1f}% from {start_year} to {end_year}."
+        )
+
+    @timed('summary')
+    def _plan_comparison_summary(self, plan: QueryPlan, comparison: Comparison) -> str:
+        """Per-area average (rates) or total (counts) of the planned metric."""
+        summaries = []
+        for area, row in zip(comparison.areas, comparison.rates):
+            row = row[~np.isnan(row)]
+            if not len(row):
+                summaries.append(f"{area}: no data")
+            elif plan.metric in COUNT_METRICS:
+                summaries.append(f"{area}: {row.sum():,.0f}")
+            else:
+                summaries.append(f"{area}: ₹{row.mean():,.0f}/sqft")
+        if not summaries:
+            return "No data found for comparison."
+        if len(comparison.years):
+            window = _year_span(comparison.years.min(), comparison.years.max())
+        else:
+            window = "no years in range"
+        return f"{plan.label} ({window}): " + " | ".join(summaries)
+
+    def analyze_batch(
+        self, messages: List[str], llm_summaries: bool = True, fragments: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Analyze many messages in one pass.
+        
+        Areas are deduplicated across messages: each area is filtered, charted,
+        tabulated and summarized once, and the remaining LLM calls run
+        concurrently (at most settings.BATCH_LLM_CONCURRENCY at a time).
+        Messages with narrowed plans are answered by analyze_plan.
+        
+        Args:
+            messages: User query messages
+            llm_summaries: Wait for LLM summaries of single-area queries
+                (False returns analytical summaries only)
+            fragments: Return tables as pre-encoded JSON Fragments
+            
+        Returns:
+            One result per message, in input order; a failed message yields
+            {"error": "..."} in its slot
+        """
+        with self.pinned():
+            plans = []
+            for message in messages:
+                try:
+                    plans.append(self.plan_query(message))
+                except Exception as e:
+                    plans.append(e)
+            
+            parts, single_areas = self._batch_parts(plans, fragments)
+            summaries = self._batch_summaries(single_areas, parts, llm_summaries)
+            
+            results = []
+            for plan in plans:
+                if isinstance(plan, Exception):
+                    results.append({"error": f"Analysis failed: {str(plan)}"})
+                    continue
+                try:
+                    results.append(self._batch_result(plan, parts, summaries))
+                except Exception as e:
+                    results.append({"error": f"Analysis failed: {str(e)}"})
+        
+        return results
+
+    def _batch_parts(
+        self, plans: List[Any], fragments: bool
+    ) -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+        """
+        Per-area work shared by every message of a batch that mentions the area.
+        
+        Args:
+            plans: QueryPlan (or the exception raised planning it) per message
+            fragments: Build tables as pre-encoded JSON Fragments
+            
+        Returns:
+            Tuple of (area -> its data, chart and table; areas of single-area
+            messages, in order of first mention)
+        """
+        parts = {}
+        single_areas = []
+        for plan in plans:
+            if isinstance(plan, Exception) or plan.narrowed:
+                continue
+            is_comparison, areas = plan.is_comparison, plan.areas
+            wanted = areas if is_comparison else [areas[0] if areas else ""]
+            for area in wanted:
+                if area not in parts:
+                    area_data = self.filter_by_area(area) if area else pd.DataFrame()
+                    parts[area] = {
+                        "data": area_data,
+                        "chart": self.get_price_trend(area_data),
+                        "table": (
+                            self.get_table_fragment(area) if fragments else self.get_table_data(area_data)
+                        ),
+                    }
+                if not is_comparison and area not in single_areas:
+                    single_areas.append(area)
+        return parts, single_areas
+
+    def _batch_result(
+        self, plan: QueryPlan, parts: Dict[str, Dict[str, Any]], summaries: Dict[str, str]
+    ) -> Dict[str, Any]:
+        """Result for one batch message, from the batch's shared per-area work."""
+        is_comparison, areas = plan.is_comparison, plan.areas
+        if plan.narrowed:
+            return self.analyze_plan(plan)
+        if is_comparison:
+            comparison = self.compare_areas(areas)
+            return {
+                "type": "comparison",
+                "areas": areas,
+                "summary": self.get_comparison_summary(areas, comparison),
+                "chart": self.get_comparison_trend(areas, comparison),
+                "tables": {area: parts[area]["table"] for area in areas},
+            }
+        area = areas[0] if areas else ""
+        return {
+            "type": "single",
+            "area": area,
+            "summary": summaries[area],
+            "chart": parts[area]["chart"],
+            "table": parts[area]["table"],
+        }
+
+    def _batch_summaries(
+        self, areas: List[str], parts: Dict[str, Dict[str, Any]], llm_summaries: bool
+    ) -> Dict[str, str]:
+        """
+        Summaries for a batch: cached LLM text, fresh LLM calls run concurrently,
+        or the analytical summary when the LLM is unavailable.
+        """
+        summaries, pending = self._batch_cached_summaries(areas, parts, llm_summaries)
+        if not pending:
+            return summaries
+        
+        # Pins are thread-local: workers re-pin the batch's dataset
+        dataset = self.dataset
+        workers = min(settings.BATCH_LLM_CONCURRENCY, len(pending))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='batch-llm') as executor:
+            futures = {
+                area: executor.submit(
+                    self._pinned_llm_summary, dataset, cache_key, area, parts[area]["data"]
+                )
+                for area, cache_key in pending.items()
+            }
+            for area, future in futures.items():
+                try:
+                    summary = future.result()
+                except Exception as e:
+                    print(f"[LLM] Batch summary failed for {area}: {e}")
+                    count_fallback("error")
+                    summary = None
+                if summary is not None:
+                    summaries[area] = summary
+        
+        return summaries
+
+    def _batch_cached_summaries(
+        self, areas: List[str], parts: Dict[str, Dict[str, Any]], llm_summaries: bool
+    ) -> Tuple[Dict[str, str], Dict[str, str]]:
+        """
+        Cache-lookup step of _batch_summaries.
+        
+        Returns:
+            Tuple of (area -> cached LLM or analytical summary, area -> summary
+            cache key of the areas still waiting for an LLM call)
+        """
+        unavailable = self._llm_unavailable() if llm_summaries else None
+        summaries = {}
+        pending = {}
+        for area in areas:
+            area_data = parts[area]["data"]
+            if area_data.empty:
+                summaries[area] = f"No data available for {area}."
+                continue
+            summaries[area] = self._generate_analytical_summary(area, area_data)
+            if not llm_summaries:
+                continue
+            if unavailable:
+                count_fallback(unavailable)
+                continue
+            cache_key = self._summary_cache_key(area)
+            cached = summary_cache.get(cache_key)
+            if cached is not None:
+                summaries[area] = cached
+            else:
+                pending[area] = cache_key
+        return summaries, pending
+
+    @staticmethod
+    def _llm_unavailable() -> Optional[str]:
+        """Fallback reason if no LLM call can be made now ("missing_key", "circuit_open"), else None."""
+        if not settings.HUGGINGFACE_API_KEY:
+            return "missing_key"
+        if get_llm_client().breaker.is_open():
+            return "circuit_open"
+        return None
+
+    def _pinned_llm_summary(
+        self, dataset: Dataset, cache_key: str, area: str, area_data: pd.DataFrame
+    ) -> Optional[str]:
+        """_coalesced_llm_summary on a worker thread, with ``dataset`` pinned."""
+        with self.pinned(dataset):
+            return self._coalesced_llm_summary(cache_key, area, area_data)
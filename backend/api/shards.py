@@ -0,0 +1,412 @@
+"""
+Datasets split into shards: one workbook per city (or any other split)
+in a directory, for deployments with more data than a worker should hold.
+Startup reads only a catalog of each shard's location names and ranking
+metrics. A shard is loaded the first time a query mentions one of its
+locations; leaderboards are served from the catalog without loading any. Once loaded
+shards exceed the memory budget, the least recently used ones are evicted.
+Startup time and memory grow with the cities in use, not with every city
+on disk.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from .dataset import Dataset
+from .indexes import AreaMatcher, LocationIndex, normalize_location
+from .rankings import RANKING_FIELDS, Leaderboard
+from .snapshot import snapshot_dir
+
+SHARD_EXTENSIONS = ('.xlsx',)
+
+# Bump whenever the catalog entry layout changes
+CATALOG_FORMAT = 2
+
+
+def shard_files(directory: str) -> Dict[str, str]:
+    """
+    List the shard workbooks in a directory.
+
+    Args:
+        directory: Shard directory
+
+    Returns:
+        Mapping of shard name (file name without extension) to path, sorted
+        by name
+    """
+    files = {}
+    for entry in sorted(os.listdir(directory)):
+        stem, extension = os.path.splitext(entry)
+        if extension.lower() in SHARD_EXTENSIONS and not entry.startswith(('.', '~$')):
+            files[stem] = os.path.join(directory, entry)
+    return files
+
+
+def _file_state(path: str) -> Tuple[int, int]:
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _catalog_path(path: str) -> str:
+    size, mtime_ns = _file_state(path)
+    raw = json.dumps([os.path.abspath(path), size, mtime_ns, CATALOG_FORMAT]).encode('utf-8')
+    return os.path.join(snapshot_dir(), 'catalog', hashlib.sha256(raw).hexdigest()[:24] + '.json')
+
+
+def catalog_entry(name: str, path: str, mmap_mode: Optional[str] = None) -> Tuple[Dict[str, Any], Optional[Dataset]]:
+    """
+    Describe one shard: its location names, cities, row count and the
+    ranking metrics of each location.
+
+    Entries are cached on disk keyed by the file's path, size and mtime,
+    so later startups read a small JSON file instead of the workbook. On a
+    cache miss the shard is loaded (which also writes its snapshot).
+
+    Args:
+        name: Shard name
+        path: Shard workbook
+        mmap_mode: Memory-map mode for snapshot columns
+
+    Returns:
+        Tuple of (catalog entry, the loaded Dataset on a cache miss or None)
+    """
+    cached = _catalog_path(path)
+    if os.path.exists(cached):
+        try:
+            with open(cached) as handle:
+                return {**json.load(handle), "name": name, "path": path}, None
+        except (OSError, ValueError):
+            pass
+
+    dataset = Dataset.from_file(path, mmap_mode=mmap_mode)
+    cities = dataset.df['city'].dropna().unique().tolist() if 'city' in dataset.df.columns else []
+    size, mtime_ns = _file_state(path)
+    entry = {
+        "size": size,
+        "mtime_ns": mtime_ns,
+        "rows": len(dataset.df),
+        "cities": sorted(str(city) for city in cities),
+        "locations": {key: str(display) for key, display in dataset.location_index.names.items()},
+        "metrics": dataset.metrics[RANKING_FIELDS].to_dict('index'),
+    }
+    try:
+        os.makedirs(os.path.dirname(cached), exist_ok=True)
+        fd, staging = tempfile.mkstemp(prefix='.staging-', dir=os.path.dirname(cached))
+        with os.fdopen(fd, 'w') as handle:
+            json.dump(entry, handle)
+        os.replace(staging, cached)
+    except OSError as e:
+        # Read-only deployments still work, they just load every shard at startup
+        print(f"✗ Could not write shard catalog for {name}: {e}")
+    return {**entry, "name": name, "path": path}, dataset
+
+
+class _Routed:
+    """Dict-like view of one per-shard mapping keyed by normalized location."""
+
+    def __init__(self, sharded: 'ShardedDataset', read: Callable[[Dataset], Dict]):
+        self._sharded = sharded
+        self._read = read
+
+    def _target(self, key: str) -> Optional[Dict]:
+        shard = self._sharded.shard_for_key(key)
+        return None if shard is None else self._read(shard)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        target = self._target(key)
+        return default if target is None else target.get(key, default)
+
+    def __getitem__(self, key: str) -> Any:
+        target = self._target(key)
+        if target is None:
+            raise KeyError(key)
+        return target[key]
+
+    def __contains__(self, key: str) -> bool:
+        target = self._target(key)
+        return target is not None and key in target
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        target = self._target(key)
+        if target is not None:
+            target[key] = value
+
+
+class ShardedIndex:
+    """
+    LocationIndex lookups across all shards.
+
+    ``names`` covers every shard without loading any. ``get`` and
+    ``blocks`` load the owning shard. Block slices index into that shard's
+    frame; use ShardedDataset.index_for to compare areas positionally.
+    """
+
+    def __init__(self, sharded: 'ShardedDataset', names: Dict[str, str]):
+        self._sharded = sharded
+        self.names = names
+        self.blocks = _Routed(sharded, lambda shard: shard.location_index.blocks)
+        self.df = sharded.df
+        self.keys = None
+
+    def get(self, area: str, *args, **kwargs) -> Optional[pd.DataFrame]:
+        """Rows of an area from its shard (see LocationIndex.get), or None if unknown."""
+        shard = self._sharded.shard_for(area)
+        return None if shard is None else shard.location_index.get(area, *args, **kwargs)
+
+    def year_bounds(self, area: str) -> Optional[Tuple[int, int]]:
+        """First and last year of an area (see LocationIndex.year_bounds)."""
+        shard = self._sharded.shard_for(area)
+        return None if shard is None else shard.location_index.year_bounds(area)
+
+
+class ShardedDataset:
+    """
+    A dataset served from a directory of shards.
+
+    Has the same attributes as Dataset. Per-location lookups (rows,
+    metrics, prompt blocks, table fragments) go to the owning shard and
+    load it if needed. The leaderboard covers every shard and is built from
+    the catalog, so rankings (with or without a city filter) load none. ``df`` holds no rows, because the rows live in the
+    shards. A location name found in more than one shard is served from
+    the first one by file name.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        entries: List[Dict[str, Any]],
+        budget_bytes: int,
+        mmap_mode: Optional[str] = None,
+        load_info: Optional[Dict[str, Any]] = None,
+    ):
+        """
+        Build the routing tables from catalog entries.
+
+        Args:
+            directory: Shard directory
+            entries: Catalog entries (see catalog_entry), in shard order
+            budget_bytes: Memory allowed for loaded shards; the most recently
+                used shard stays loaded even if it alone exceeds the budget
+            mmap_mode: Memory-map mode for snapshot columns
+            load_info: Details about how the catalog was built
+        """
+        self.directory = directory
+        self.shards = {entry["name"]: entry for entry in entries}
+        self.budget_bytes = budget_bytes
+        self.mmap_mode = mmap_mode
+        self.load_info = load_info or {}
+        self.rows = sum(entry["rows"] for entry in entries)
+        self.df = pd.DataFrame()
+
+        self._shard_of: Dict[str, str] = {}
+        names: Dict[str, str] = {}
+        for entry in entries:
+            for key, display in entry["locations"].items():
+                if key not in self._shard_of:
+                    self._shard_of[key] = entry["name"]
+                    names[key] = display
+        self.area_matcher = AreaMatcher(names)
+        # Ranking metrics of the locations each shard serves
+        metrics = [
+            pd.DataFrame.from_dict(
+                {key: row for key, row in entry["metrics"].items() if self._shard_of.get(key) == entry["name"]},
+                orient='index', columns=RANKING_FIELDS,
+            )
+            for entry in entries
+        ]
+        self.leaderboard = Leaderboard(pd.concat(metrics) if metrics else pd.DataFrame(columns=RANKING_FIELDS))
+        self.location_index = ShardedIndex(self, names)
+        self.metric_rows = _Routed(self, lambda shard: shard.metric_rows)
+        self.prompt_blocks = _Routed(self, lambda shard: shard.prompt_blocks)
+        self.table_fragments = _Routed(self, lambda shard: shard.table_fragments)
+
+        state = [(entry["name"], entry["size"], entry["mtime_ns"]) for entry in entries]
+        digest = hashlib.sha256(json.dumps(state).encode('utf-8')).hexdigest()
+        self.version = f"shards-{digest[:20]}"
+
+        self._lock = threading.Lock()
+        self._loaded: 'OrderedDict[str, Dataset]' = OrderedDict()
+        self._loading: Dict[str, threading.Lock] = {}
+        self._counts = {"hits": 0, "loads": 0, "evictions": 0}
+
+    @classmethod
+    def from_directory(
+        cls,
+        directory: str,
+        budget_bytes: int,
+        mmap_mode: Optional[str] = None,
+        previous: Optional['ShardedDataset'] = None,
+    ) -> 'ShardedDataset':
+        """
+        Read the shard catalog of a directory.
+
+        Args:
+            directory: Shard directory
+            budget_bytes: Memory allowed for loaded shards
+            mmap_mode: Memory-map mode for snapshot columns
+            previous: Dataset being replaced; its loaded shards whose files
+                did not change are carried over instead of reloaded
+
+        Returns:
+            ShardedDataset with the shards loaded while cataloguing (within
+            the budget)
+
+        Raises:
+            FileNotFoundError: If the directory holds no shard workbooks
+            Exception: If a shard without a cached catalog entry cannot be read
+        """
+        start = time.perf_counter()
+        files = shard_files(directory)
+        if not files:
+            raise FileNotFoundError(f"No shard workbooks ({', '.join(SHARD_EXTENSIONS)}) in {directory}")
+
+        entries = []
+        loaded = {}
+        for name, path in files.items():
+            entry, dataset = catalog_entry(name, path, mmap_mode)
+            entries.append(entry)
+            if dataset is None and previous is not None:
+                dataset = previous._carry_over(entry)
+            if dataset is not None:
+                loaded[name] = dataset
+
+        sharded = cls(directory, entries, budget_bytes, mmap_mode, {
+            "source": None,
+            "directory": os.path.abspath(directory),
+            "load_seconds": time.perf_counter() - start,
+        })
+        with sharded._lock:
+            for name, dataset in loaded.items():
+                sharded._admit(name, dataset)
+        return sharded
+
+    def _carry_over(self, entry: Dict[str, Any]) -> Optional[Dataset]:
+        """This dataset's loaded copy of a shard, if its file is unchanged."""
+        with self._lock:
+            dataset = self._loaded.get(entry["name"])
+        current = self.shards.get(entry["name"])
+        if dataset is None or current is None or current["path"] != entry["path"]:
+            return None
+        if (current["size"], current["mtime_ns"]) != (entry["size"], entry["mtime_ns"]):
+            return None
+        return dataset
+
+    def shard(self, name: str) -> Dataset:
+        """
+        Return a shard, loading it on first use.
+
+        Concurrent requests for the same unloaded shard load it once.
+
+        Args:
+            name: Shard name
+
+        Returns:
+            The shard's Dataset
+        """
+        with self._lock:
+            dataset = self._loaded.get(name)
+            if dataset is not None:
+                self._loaded.move_to_end(name)
+                self._counts["hits"] += 1
+                return dataset
+            loading = self._loading.setdefault(name, threading.Lock())
+
+        with loading:
+            with self._lock:
+                dataset = self._loaded.get(name)
+            if dataset is not None:
+                return dataset
+            dataset = Dataset.from_file(self.shards[name]["path"], mmap_mode=self.mmap_mode)
+            with self._lock:
+                self._admit(name, dataset)
+            print(
+                f"✓ Shard {name} loaded. Rows: {len(dataset.df)} "
+                f"({dataset.load_info['load_seconds'] * 1000:.1f} ms, {dataset.memory_bytes / 1e6:.1f} MB)"
+            )
+        return dataset
+
+    def _admit(self, name: str, dataset: Dataset) -> None:
+        """Add a loaded shard and evict cold ones over budget (lock held)."""
+        self._loaded[name] = dataset
+        self._loaded.move_to_end(name)
+        self._counts["loads"] += 1
+        while len(self._loaded) > 1 and self._loaded_bytes() > self.budget_bytes:
+            self._loaded.popitem(last=False)
+            self._counts["evictions"] += 1
+
+    def _loaded_bytes(self) -> int:
+        return sum(dataset.memory_bytes for dataset in self._loaded.values())
+
+    def shard_for_key(self, key: str) -> Optional[Dataset]:
+        """Shard holding a normalized location key (None if unknown)."""
+        name = self._shard_of.get(key)
+        return None if name is None else self.shard(name)
+
+    def shard_for(self, area: str) -> Optional[Dataset]:
+        """Shard holding an area (None if unknown)."""
+        return self.shard_for_key(normalize_location(area))
+
+    def index_for(self, areas: Iterable[str]) -> LocationIndex:
+        """
+        Location index covering the given areas.
+
+        Areas in one shard use that shard's index. Areas spread across
+        shards get a small index over just their rows.
+
+        Args:
+            areas: Area names in any casing
+
+        Returns:
+            LocationIndex containing every known area of ``areas``
+        """
+        keys = list(dict.fromkeys(normalize_location(area) for area in areas))
+        names = list(dict.fromkeys(self._shard_of[key] for key in keys if key in self._shard_of))
+        if len(names) == 1:
+            return self.shard(names[0]).location_index
+        frames = [self.shard(self._shard_of[key]).location_index.get(key) for key in keys if key in self._shard_of]
+        return LocationIndex(pd.concat(frames, ignore_index=True) if frames else self.df)
+
+    @property
+    def memory_bytes(self) -> int:
+        """Memory held by the loaded shards."""
+        with self._lock:
+            return self._loaded_bytes()
+
+    def stats(self) -> Dict[str, Any]:
+        """Shard counts, residency and cache counters."""
+        with self._lock:
+            return {
+                "shards": len(self.shards),
+                "loaded": list(self._loaded),
+                "memory_bytes": self._loaded_bytes(),
+                "budget_bytes": self.budget_bytes,
+                **self._counts,
+            }
+
+    def is_stale(self, directory: str) -> bool:
+        """
+        Check whether shards were added, removed or changed since cataloguing.
+
+        Args:
+            directory: Shard directory
+
+        Returns:
+            True if the directory no longer matches the catalog
+        """
+        if not os.path.isdir(directory):
+            return False
+        files = shard_files(directory)
+        if set(files) != set(self.shards):
+            return True
+        return any(
+            _file_state(path) != (self.shards[name]["size"], self.shards[name]["mtime_ns"])
+            for name, path in files.items()
+        )
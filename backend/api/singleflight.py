@@ -0,0 +1,223 @@
+"""
+Single-flight coalescing of identical concurrent computations.
+Within a worker, callers with the same key share one in-flight call.
+Across workers, a lease taken with an atomic ``cache.add`` in the shared
+store makes other workers wait for the leader's cached result instead of
+repeating the work. ``ado`` does the same for coroutines on an event loop.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .offload import run_sync
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    """One in-flight computation and the callers waiting on it."""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Deduplicate concurrent calls by key, in-process and across workers."""
+
+    def __init__(self, lock_alias: str = 'summaries-shared', poll_interval: float = 0.2):
+        """
+        Args:
+            lock_alias: Cache alias shared by all workers, used for leases
+            poll_interval: Seconds between checks while waiting on another worker
+        """
+        self.lock_alias = lock_alias
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        # Coroutine callers; only touched from the event loop thread
+        self._async_calls: Dict[str, asyncio.Future] = {}
+        self._counts = {"leaders": 0, "coalesced": 0, "remote_waits": 0, "remote_timeouts": 0}
+
+    def do(
+        self,
+        key: str,
+        fn: Callable[[], Any],
+        wait_for: Optional[Callable[[], Any]] = None,
+    ) -> Any:
+        """
+        Run ``fn`` once for all concurrent callers with the same key.
+
+        Args:
+            key: Identity of the computation
+            fn: Computation; its return value (None included) goes to every caller
+            wait_for: Reads the result another worker publishes (e.g. a cache
+                lookup); without it, cross-worker waiters get None
+
+        Returns:
+            The shared result, or None if the computation in another worker
+            finished without publishing one or the lease ran out
+        """
+        lease = settings.SUMMARY_FLIGHT_LEASE
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                self._counts["leaders"] += 1
+            else:
+                self._counts["coalesced"] += 1
+
+        if not leader:
+            call.event.wait(lease)
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._lead(key, fn, wait_for, lease)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+    def _lead(self, key: str, fn: Callable[[], Any], wait_for: Optional[Callable[[], Any]], lease: float) -> Any:
+        """Run ``fn`` under the cross-worker lease, or wait for the worker holding it."""
+        lock_key = f"flight:{key}"
+        token = uuid.uuid4().hex
+        if self._acquire(lock_key, token, lease):
+            try:
+                return fn()
+            finally:
+                self._release(lock_key, token)
+
+        with self._lock:
+            self._counts["remote_waits"] += 1
+        deadline = time.monotonic() + lease
+        while time.monotonic() < deadline:
+            if wait_for is not None:
+                value = wait_for()
+                if value is not None:
+                    return value
+            if not self._held(lock_key):
+                # The other worker finished; share its result or its fallback
+                return wait_for() if wait_for is not None else None
+            time.sleep(self.poll_interval)
+
+        with self._lock:
+            self._counts["remote_timeouts"] += 1
+        return None
+
+    async def ado(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[Any]],
+        wait_for: Optional[Callable[[], Any]] = None,
+    ) -> Any:
+        """
+        Async version of do: ``fn`` is a coroutine function and waiting
+        never blocks the event loop. ``wait_for`` stays a blocking call and
+        runs on the offload pool.
+        """
+        call = self._async_calls.get(key)
+        if call is not None:
+            with self._lock:
+                self._counts["coalesced"] += 1
+            return await asyncio.shield(call)
+
+        call = asyncio.get_running_loop().create_future()
+        self._async_calls[key] = call
+        with self._lock:
+            self._counts["leaders"] += 1
+        try:
+            result = await self._alead(key, fn, wait_for, settings.SUMMARY_FLIGHT_LEASE)
+            call.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            call.cancel()
+            raise
+        except Exception as e:
+            call.set_exception(e)
+            # Mark retrieved: waiters re-raise it, but there may be none
+            call.exception()
+            raise
+        finally:
+            self._async_calls.pop(key, None)
+
+    async def _alead(
+        self, key: str, fn: Callable[[], Awaitable[Any]], wait_for: Optional[Callable[[], Any]], lease: float
+    ) -> Any:
+        """Async version of _lead."""
+        lock_key = f"flight:{key}"
+        token = uuid.uuid4().hex
+        if await run_sync(self._acquire, lock_key, token, lease):
+            try:
+                return await fn()
+            finally:
+                await run_sync(self._release, lock_key, token)
+
+        with self._lock:
+            self._counts["remote_waits"] += 1
+        deadline = time.monotonic() + lease
+        while time.monotonic() < deadline:
+            if wait_for is not None:
+                value = await run_sync(wait_for)
+                if value is not None:
+                    return value
+            if not await run_sync(self._held, lock_key):
+                return await run_sync(wait_for) if wait_for is not None else None
+            await asyncio.sleep(self.poll_interval)
+
+        with self._lock:
+            self._counts["remote_timeouts"] += 1
+        return None
+
+    def _acquire(self, lock_key: str, token: str, lease: float) -> bool:
+        try:
+            cache = caches[self.lock_alias]
+            if cache.add(lock_key, token, lease):
+                return True
+            # DatabaseCache.add also returns False when the write failed (e.g.
+            # a locked SQLite table); only defer to a lease that exists
+            return cache.get(lock_key) is None
+        except Exception as e:
+            # No shared store: coalesce within this worker only
+            logger.warning("Single-flight lease unavailable: %s", e)
+            return True
+
+    def _held(self, lock_key: str) -> bool:
+        try:
+            return caches[self.lock_alias].get(lock_key) is not None
+        except Exception:
+            return False
+
+    def _release(self, lock_key: str, token: str) -> None:
+        try:
+            cache = caches[self.lock_alias]
+            if cache.get(lock_key) == token:
+                cache.delete(lock_key)
+        except Exception as e:
+            logger.warning("Single-flight lease release failed: %s", e)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return coalescing counters for this process."""
+        with self._lock:
+            counts = dict(self._counts)
+            counts["in_flight"] = len(self._calls) + len(self._async_calls)
+        return counts
+
+
+summary_flights = SingleFlight()
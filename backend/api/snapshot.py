@@ -0,0 +1,241 @@
+"""
+Columnar snapshot cache for the source workbook.
+Parsing Excel with openpyxl is slow, so the first load converts the
+workbook into one ``.npy`` file per column and later loads read those.
+Numeric columns and categorical codes can be memory-mapped read-only, so
+every worker on a host shares the same physical pages.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+
+
+# Bump whenever the on-disk layout or the prepare step changes
+SNAPSHOT_FORMAT = 5
+MANIFEST_NAME = 'manifest.json'
+
+
+def file_sha256(path: str) -> str:
+    """Return the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for chunk in iter(lambda: handle.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_fingerprint(path: str) -> Dict[str, Any]:
+    """
+    Describe a source file by path, size, mtime and content hash.
+
+    Args:
+        path: Source workbook path
+
+    Returns:
+        Dictionary identifying this exact version of the file
+    """
+    stat = os.stat(path)
+    return {
+        "path": os.path.abspath(path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": file_sha256(path),
+        "format": SNAPSHOT_FORMAT,
+    }
+
+
+def snapshot_key(fingerprint: Dict[str, Any]) -> str:
+    """Derive the snapshot directory name from a source fingerprint."""
+    raw = json.dumps(fingerprint, sort_keys=True).encode('utf-8')
+    return hashlib.sha256(raw).hexdigest()[:24]
+
+
+def snapshot_dir() -> str:
+    """Return the configured snapshot root directory."""
+    return str(settings.DATA_SNAPSHOT_DIR)
+
+
+def write_snapshot(df: pd.DataFrame, fingerprint: Dict[str, Any], root: Optional[str] = None) -> str:
+    """
+    Write a DataFrame as a columnar snapshot.
+
+    Numeric and datetime columns are stored as-is. Categorical columns are
+    stored as their integer codes plus a string table of categories.
+    Object columns are stored as fixed-width unicode with a separate null
+    mask. The snapshot
+    is written to a temporary directory and renamed into place, so readers
+    never observe a partial snapshot.
+
+    Args:
+        df: Parsed dataset
+        fingerprint: Source fingerprint from source_fingerprint()
+        root: Snapshot root directory (defaults to settings)
+
+    Returns:
+        Path of the snapshot directory
+    """
+    root = root or snapshot_dir()
+    os.makedirs(root, exist_ok=True)
+    target = os.path.join(root, snapshot_key(fingerprint))
+    staging = tempfile.mkdtemp(prefix='.staging-', dir=root)
+
+    columns = []
+    for position, name in enumerate(df.columns):
+        series = df[name]
+        entry = {"name": str(name), "file": f"{position}.npy", "kind": "values"}
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            values = series.cat.codes.to_numpy()
+            entry["kind"] = "category"
+            entry["categories"] = f"{position}.categories.npy"
+            categories = np.array([str(c) for c in series.cat.categories], dtype=str)
+            np.save(os.path.join(staging, entry["categories"]), categories, allow_pickle=False)
+        elif series.dtype == object:
+            nulls = series.isna().to_numpy()
+            values = series.where(~nulls, '').astype(str).to_numpy(dtype=str)
+            if nulls.any():
+                entry["mask"] = f"{position}.mask.npy"
+                np.save(os.path.join(staging, entry["mask"]), nulls)
+            entry["kind"] = "string"
+        else:
+            values = series.to_numpy()
+        np.save(os.path.join(staging, entry["file"]), values, allow_pickle=False)
+        columns.append(entry)
+
+    manifest = {"source": fingerprint, "rows": len(df), "columns": columns}
+    with open(os.path.join(staging, MANIFEST_NAME), 'w') as handle:
+        json.dump(manifest, handle, indent=2)
+
+    try:
+        os.rename(staging, target)
+    except OSError:
+        # Another worker published the same snapshot first
+        shutil.rmtree(staging, ignore_errors=True)
+    return target
+
+
+def read_snapshot(path: str, mmap_mode: Optional[str] = None) -> pd.DataFrame:
+    """
+    Load a snapshot directory into a DataFrame.
+
+    Args:
+        path: Snapshot directory
+        mmap_mode: Passed to numpy.load for numeric columns and
+            categorical codes (e.g. 'r' to share pages across processes)
+
+    Returns:
+        DataFrame with the original column order
+    """
+    with open(os.path.join(path, MANIFEST_NAME)) as handle:
+        manifest = json.load(handle)
+
+    data = {}
+    for entry in manifest["columns"]:
+        file_path = os.path.join(path, entry["file"])
+        if entry["kind"] == "string":
+            values = np.load(file_path, allow_pickle=False).astype(object)
+            if "mask" in entry:
+                values[np.load(os.path.join(path, entry["mask"]))] = None
+        elif entry["kind"] == "category":
+            categories = np.load(os.path.join(path, entry["categories"]), allow_pickle=False)
+            codes = np.load(file_path, mmap_mode=mmap_mode, allow_pickle=False)
+            # Passing the stored code dtype through keeps codes memory-mapped
+            values = pd.Categorical.from_codes(
+                codes, dtype=pd.CategoricalDtype(categories.astype(object))
+            )
+        else:
+            values = np.load(file_path, mmap_mode=mmap_mode, allow_pickle=False)
+        data[entry["name"]] = values
+    return pd.DataFrame(data, copy=False)
+
+
+def load_dataset(
+    path: str,
+    root: Optional[str] = None,
+    prepare: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None,
+    mmap_mode: Optional[str] = None,
+) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    Load the workbook, going through the snapshot cache.
+
+    Args:
+        path: Source workbook path
+        root: Snapshot root directory (defaults to settings)
+        prepare: Transform applied to a freshly parsed workbook before it
+            is snapshotted (snapshots already hold the prepared frame)
+        mmap_mode: Memory-map mode for snapshot columns (see read_snapshot)
+
+    Returns:
+        Tuple of (DataFrame, load info with source fingerprint, timing and
+        whether the snapshot was hit)
+    """
+    start = time.perf_counter()
+    fingerprint = source_fingerprint(path)
+    target = os.path.join(root or snapshot_dir(), snapshot_key(fingerprint))
+
+    if os.path.exists(os.path.join(target, MANIFEST_NAME)):
+        try:
+            df = read_snapshot(target, mmap_mode)
+            return df, {
+                "source": fingerprint,
+                "snapshot": target,
+                "snapshot_hit": True,
+                "mmap": mmap_mode is not None,
+                "load_seconds": time.perf_counter() - start,
+            }
+        except Exception as e:
+            print(f"✗ Snapshot {target} unreadable, re-parsing workbook: {e}")
+
+    df = pd.read_excel(path, engine='openpyxl')
+    if prepare is not None:
+        df = prepare(df)
+    parse_seconds = time.perf_counter() - start
+    try:
+        target = write_snapshot(df, fingerprint, root)
+        if mmap_mode is not None:
+            # Switch to the shared pages right away instead of keeping a private copy
+            df = read_snapshot(target, mmap_mode)
+    except OSError as e:
+        # Read-only deployments still work, they just parse every time
+        print(f"✗ Could not write data snapshot: {e}")
+        target = None
+    return df, {
+        "source": fingerprint,
+        "snapshot": target,
+        "snapshot_hit": False,
+        "mmap": mmap_mode is not None and target is not None,
+        "load_seconds": parse_seconds,
+    }
+
+
+def prune_snapshots(keep: str, root: Optional[str] = None) -> int:
+    """
+    Delete snapshot directories other than ``keep``.
+
+    Args:
+        keep: Snapshot directory to retain
+        root: Snapshot root directory (defaults to settings)
+
+    Returns:
+        Number of snapshots removed
+    """
+    root = root or snapshot_dir()
+    if not os.path.isdir(root):
+        return 0
+    removed = 0
+    for name in os.listdir(root):
+        path = os.path.join(root, name)
+        if name.startswith('.staging-') or name == 'catalog':
+            continue
+        if os.path.isdir(path) and os.path.abspath(path) != os.path.abspath(keep):
+            shutil.rmtree(path, ignore_errors=True)
+            removed += 1
+    return removed
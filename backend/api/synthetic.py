@@ -0,0 +1,204 @@
+"""
+Synthetic real estate data with the same schema as Sample_data.xlsx.
+Used by generate_data.py and the benchmark commands to exercise the real
+code paths (location index, metrics, prompts, rendering) at any scale.
+Everything is generated column-wise with NumPy, so millions of rows take
+seconds; prevailing-rate ranges are categoricals to keep memory bounded.
+"""
+
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Column order of the real workbook
+COLUMNS = [
+    'final location', 'year', 'city', 'loc_lat', 'loc_lng',
+    'total_sales - igr', 'total sold - igr', 'flat_sold - igr', 'office_sold - igr',
+    'others_sold - igr', 'shop_sold - igr', 'commercial_sold - igr', 'other_sold - igr',
+    'residential_sold - igr',
+    'flat - weighted average rate', 'office - weighted average rate',
+    'others - weighted average rate', 'shop - weighted average rate',
+    'flat - most prevailing rate - range', 'office - most prevailing rate - range',
+    'others - most prevailing rate - range', 'shop - most prevailing rate - range',
+    'total units', 'total carpet area supplied (sqft)',
+    'flat total', 'shop total', 'office total', 'others total',
+]
+
+PROPERTY_TYPES = ['flat', 'office', 'others', 'shop']
+
+# Columns that may be left empty (the real file has gaps in these)
+NULLABLE_COLUMNS = [
+    'other_sold - igr', 'office - weighted average rate', 'others - weighted average rate',
+    'shop - weighted average rate', 'total carpet area supplied (sqft)',
+] + [f'{kind} - most prevailing rate - range' for kind in PROPERTY_TYPES]
+
+BASE_LOCALITIES = [
+    'Akurdi', 'Ambegaon Budruk', 'Aundh', 'Wakad', 'Baner', 'Balewadi', 'Hinjewadi', 'Kharadi',
+    'Viman Nagar', 'Kothrud', 'Hadapsar', 'Wagholi', 'Pimple Saudagar', 'Ravet', 'Tathawade',
+    'Undri', 'Kondhwa', 'Bavdhan', 'Pashan', 'Magarpatta', 'Moshi', 'Chakan', 'Dhanori', 'Lohegaon',
+]
+
+BASE_CITIES = ['Pune', 'Mumbai', 'Bengaluru', 'Hyderabad', 'Chennai', 'Ahmedabad', 'Kolkata', 'Delhi']
+
+CITY_CENTERS = np.array([
+    [18.52, 73.86], [19.08, 72.88], [12.97, 77.59], [17.39, 78.49],
+    [13.08, 80.27], [23.02, 72.57], [22.57, 88.36], [28.70, 77.10],
+])
+
+
+def locality_names(count: int) -> List[str]:
+    """Distinct, word-separated locality names (real ones first, then numbered sectors)."""
+    names = BASE_LOCALITIES[:count]
+    sector = 1
+    while len(names) < count:
+        for base in BASE_LOCALITIES:
+            if len(names) == count:
+                break
+            names.append(f"{base} Sector {sector}")
+        sector += 1
+    return names
+
+
+def city_names(count: int) -> List[str]:
+    """Distinct city names."""
+    names = BASE_CITIES[:count]
+    return names + [f"City {number}" for number in range(len(names) + 1, count + 1)]
+
+
+def _range_strings(rates: np.ndarray, rng: np.random.Generator) -> pd.Categorical:
+    """Prevailing-rate ranges such as "8216-9081", as a categorical."""
+    low = np.round(rates * rng.uniform(1.05, 1.3, len(rates)) / 50) * 50
+    width = np.round(low * rng.uniform(0.08, 0.12, len(rates)) / 50) * 50
+    valid = ~np.isnan(low)
+    codes = np.full(len(rates), -1, dtype=np.int64)
+    # One integer per (low, width) pair, so only distinct pairs are formatted
+    pairs = low[valid].astype(np.int64) * 1_000_000 + width[valid].astype(np.int64)
+    table, codes[valid] = np.unique(pairs, return_inverse=True)
+    categories = [f"{pair // 1_000_000}-{pair // 1_000_000 + pair % 1_000_000}" for pair in table.tolist()]
+    return pd.Categorical.from_codes(codes, categories=categories)
+
+
+def generate_frame(
+    localities: int = 100,
+    cities: int = 1,
+    years: int = 5,
+    end_year: int = 2024,
+    missing_rate: float = 0.02,
+    gap_rate: float = 0.0,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """
+    Generate a dataset with the real schema.
+
+    Args:
+        localities: Number of localities
+        cities: Number of cities (localities are spread across them)
+        years: Years per locality, ending at ``end_year``
+        end_year: Last year
+        missing_rate: Share of empty cells in the nullable columns
+        gap_rate: Share of (locality, year) rows left out entirely
+        seed: Random seed
+
+    Returns:
+        DataFrame with COLUMNS, in the row order of the real file
+        (locality by locality, years ascending)
+    """
+    rng = np.random.default_rng(seed)
+    rows = localities * years
+    locality = np.repeat(np.arange(localities), years)
+    year = np.tile(np.arange(end_year - years + 1, end_year + 1), localities)
+    city = np.arange(localities) % cities
+
+    # Rates: a base level per locality compounded by yearly growth
+    base_rate = rng.uniform(4000, 15000, localities)
+    growth = rng.normal(0.06, 0.05, rows).reshape(localities, years)
+    growth[:, 0] = 0.0
+    flat_rate = np.repeat(base_rate, years) * np.exp(np.cumsum(growth, axis=1)).ravel()
+    rates = {
+        'flat': flat_rate,
+        'office': flat_rate * rng.uniform(1.2, 1.8, rows),
+        'others': flat_rate * rng.uniform(1.0, 1.5, rows),
+        'shop': flat_rate * rng.uniform(1.3, 2.0, rows),
+    }
+
+    # Transaction counts
+    demand = np.repeat(rng.uniform(0.3, 3.0, localities), years)
+    sold = {
+        'flat': rng.poisson(300 * demand),
+        'office': rng.poisson(20 * demand),
+        'others': rng.poisson(15 * demand),
+        'shop': rng.poisson(30 * demand),
+    }
+    other_sold = rng.poisson(10 * demand).astype(float)
+    totals = {kind: rng.poisson(1.2 * sold[kind] + 1) for kind in PROPERTY_TYPES}
+    total_units = totals['flat'] + totals['office'] + totals['others'] + totals['shop']
+    total_sold = sold['flat'] + sold['office'] + sold['others'] + sold['shop']
+    average_size = rng.uniform(600, 1400, rows)
+    total_sales = sum(sold[kind] * rates[kind] for kind in PROPERTY_TYPES) * average_size
+
+    centers = CITY_CENTERS[city % len(CITY_CENTERS)] + (city // len(CITY_CENTERS))[:, None] * 0.5
+    offsets = rng.normal(0, 0.05, (localities, 2))
+    coordinates = np.repeat(centers + offsets, years, axis=0)
+
+    names = np.array(locality_names(localities), dtype=object)
+    df = pd.DataFrame({
+        'final location': pd.Categorical.from_codes(locality, categories=names),
+        'year': year,
+        'city': pd.Categorical.from_codes(np.repeat(city, years), categories=city_names(cities)),
+        'loc_lat': coordinates[:, 0],
+        'loc_lng': coordinates[:, 1],
+        'total_sales - igr': np.round(total_sales, 2),
+        'total sold - igr': total_sold,
+        'flat_sold - igr': sold['flat'],
+        'office_sold - igr': sold['office'],
+        'others_sold - igr': sold['others'],
+        'shop_sold - igr': sold['shop'],
+        'commercial_sold - igr': sold['office'] + sold['shop'],
+        'other_sold - igr': other_sold,
+        'residential_sold - igr': sold['flat'] + sold['others'],
+        'flat - weighted average rate': rates['flat'],
+        'office - weighted average rate': rates['office'],
+        'others - weighted average rate': rates['others'],
+        'shop - weighted average rate': rates['shop'],
+        'total units': total_units,
+        'total carpet area supplied (sqft)': total_units * average_size,
+        'flat total': totals['flat'],
+        'shop total': totals['shop'],
+        'office total': totals['office'],
+        'others total': totals['others'],
+    })
+
+    if missing_rate > 0:
+        for column in NULLABLE_COLUMNS:
+            if column in df.columns:
+                df.loc[rng.random(rows) < missing_rate, column] = np.nan
+    for kind in PROPERTY_TYPES:
+        column_rates = df[f'{kind} - weighted average rate'].to_numpy()
+        ranges = _range_strings(column_rates, rng)
+        if missing_rate > 0:
+            ranges[rng.random(rows) < missing_rate] = np.nan
+        df[f'{kind} - most prevailing rate - range'] = ranges
+
+    if gap_rate > 0:
+        df = df[rng.random(rows) >= gap_rate].reset_index(drop=True)
+    return df[COLUMNS]
+
+
+def frame_with_rows(rows: int, years: int = 5, cities: Optional[int] = None, **kwargs) -> pd.DataFrame:
+    """
+    Generate roughly ``rows`` rows (rounded up to whole localities).
+
+    Args:
+        rows: Target row count
+        years: Years per locality
+        cities: Number of cities (default: one per 500 localities)
+        **kwargs: Passed to generate_frame
+
+    Returns:
+        Generated DataFrame
+    """
+    localities = max(1, -(-rows // years))
+    if cities is None:
+        cities = max(1, localities // 500)
+    return generate_frame(localities=localities, cities=cities, years=years, **kwargs)
@@ -0,0 +1,114 @@
+"""
+Paged, column-projected reads of an area's table.
+Pages are cut straight from the area's block of the location index, so
+a page costs the rows and columns it returns, not the area's history.
+Cursors name the next row by year (and how many rows of that year were
+already sent), so they stay valid across data reloads. Pages come as a
+list of row objects or in a columnar layout (one array per column),
+which does not repeat the column names on every row.
+"""
+
+import base64
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .indexes import LocationIndex, normalize_location
+
+ROWS = 'rows'
+COLUMNS = 'columns'
+
+
+def encode_cursor(year: int, skip: int) -> str:
+    """Opaque cursor for the row ``skip`` rows into ``year``."""
+    return base64.urlsafe_b64encode(f"{year}:{skip}".encode('ascii')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[int, int]:
+    """
+    Read a cursor made by encode_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('ascii')
+        year, skip = (int(part) for part in raw.split(':'))
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+    if skip < 0:
+        raise ValueError("Invalid cursor")
+    return year, skip
+
+
+def table_page(
+    index: LocationIndex,
+    area: str,
+    columns: List[str],
+    limit: int,
+    cursor: Optional[str] = None,
+    year_from: Optional[int] = None,
+    year_to: Optional[int] = None,
+    layout: str = ROWS,
+) -> Optional[Dict[str, Any]]:
+    """
+    One page of an area's rows, in year order.
+
+    Args:
+        index: Location index holding the area
+        area: Area name in any casing
+        columns: Columns to return, in order
+        limit: Most rows to return
+        cursor: ``next_cursor`` of the previous page (None for the first page)
+        year_from: First year to include (None for no lower bound)
+        year_to: Last year to include (None for no upper bound)
+        layout: ROWS for a list of row objects, COLUMNS for one array per column
+
+    Returns:
+        Dict with the area, columns, layout, "total" (rows in the year
+        window), "next_cursor" (None on the last page) and "rows" or
+        "data"; None if the area is unknown
+
+    Raises:
+        ValueError: If a column does not exist or the cursor is malformed
+    """
+    block = index.window(area, year_from, year_to)
+    if block is None:
+        return None
+    missing = [name for name in columns if name not in index.df.columns]
+    if missing:
+        raise ValueError(f"Unknown columns: {', '.join(missing)}")
+
+    years = index.years[block] if index.years is not None else None
+    start = block.start
+    if cursor:
+        year, skip = decode_cursor(cursor)
+        if years is None:
+            raise ValueError("Invalid cursor")
+        start += int(np.searchsorted(years, year, 'left')) + skip
+    start = min(start, block.stop)
+    stop = min(start + limit, block.stop)
+
+    next_cursor = None
+    if stop < block.stop and years is not None:
+        year = years[stop - block.start]
+        first = block.start + int(np.searchsorted(years, year, 'left'))
+        next_cursor = encode_cursor(int(year), stop - first)
+    elif stop < block.stop:
+        # Without a year column pages cannot be cut by key
+        stop = block.stop
+
+    positions = [index.df.columns.get_loc(name) for name in columns]
+    frame = index.df.iloc[start:stop, positions]
+    page = {
+        "area": index.names.get(normalize_location(area), area),
+        "columns": columns,
+        "layout": layout,
+        "total": block.stop - block.start,
+        "next_cursor": next_cursor,
+    }
+    if layout == COLUMNS:
+        page["data"] = {name: frame[name].tolist() for name in columns}
+    else:
+        page["rows"] = frame.to_dict('records')
+    return page
@@ -0,0 +1,633 @@
+"""
+Unit tests for the api app (run with: python manage.py test api).
+"""
+
+import asyncio
+import os
+import threading
+import time
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+
+from .aggregates import RATE_COLUMN
+from .cache import response_cache
+from .dataset import Dataset
+from .indexes import AreaMatcher, LocationIndex, normalize_location
+from .jobs import summary_jobs
+from .llm import LLMClient, LLMError
+from .planner import parse_query
+from .rankings import ASCENDING, DESCENDING, RANKINGS, Leaderboard
+from .schema import compact_frame
+from .singleflight import SingleFlight
+from .tables import COLUMNS, decode_cursor, encode_cursor, table_page
+from .services import RealEstateService
+
+
+def sample_frame():
+    """The repository's sample workbook, as parsed."""
+    return pd.read_excel(os.path.join(settings.BASE_DIR, 'data', 'Sample_data.xlsx'))
+
+
+class CompactFrameTests(SimpleTestCase):
+    """compact_frame keeps the columns in use and parses rate ranges."""
+
+    def test_parses_non_flat_range(self):
+        df = pd.DataFrame({
+            'final location': ['Wakad', 'Wakad'],
+            'year': [2022, 2023],
+            'office - most prevailing rate - range': ['9,500-10,250', '-'],
+        })
+        compact = compact_frame(df)
+        self.assertNotIn('office - most prevailing rate - range', compact.columns)
+        self.assertEqual(compact['office - most prevailing rate - low'].iloc[0], 9500)
+        self.assertEqual(compact['office - most prevailing rate - high'].iloc[0], 10250)
+        self.assertTrue(pd.isna(compact['office - most prevailing rate - low'].iloc[1]))
+
+
+class LocationIndexTests(SimpleTestCase):
+    """Block slices plus year searches select what a boolean mask over the frame does."""
+
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        names = ['Wakad', 'wakad ', 'Aundh', 'Baner', 'Ambegaon  Budruk']
+        rows = [(name, year) for name in names for year in range(2015, 2024) if rng.random() < 0.8]
+        rows = [rows[i] for i in rng.permutation(len(rows))]
+        self.df = pd.DataFrame({
+            'final location': [name for name, _ in rows],
+            'year': [year for _, year in rows],
+            'rate': rng.integers(3000, 12000, len(rows)),
+        })
+        self.index = LocationIndex(self.df)
+
+    def masked(self, area, year_from=None, year_to=None):
+        """Rows an unindexed boolean-mask filter selects, in year order."""
+        mask = self.df['final location'].map(normalize_location) == normalize_location(area)
+        if year_from is not None:
+            mask &= self.df['year'] >= year_from
+        if year_to is not None:
+            mask &= self.df['year'] <= year_to
+        return self.df[mask].sort_values('year', kind='mergesort').reset_index(drop=True)
+
+    def test_windows_match_the_mask_filter(self):
+        windows = [
+            (None, None), (2017, 2020), (2019, 2019), (2017, None), (None, 2018),
+            (1990, 1995), (2030, None), (None, 1990), (1990, 2100), (2021, 2017),
+        ]
+        for area in ('Wakad', 'WAKAD', 'aundh', 'ambegaon budruk', 'Baner'):
+            for year_from, year_to in windows:
+                with self.subTest(area=area, year_from=year_from, year_to=year_to):
+                    rows = self.index.get(area, year_from, year_to).reset_index(drop=True)
+                    pd.testing.assert_frame_equal(rows, self.masked(area, year_from, year_to))
+
+    def test_unknown_area(self):
+        self.assertIsNone(self.index.get('Hinjewadi'))
+        self.assertIsNone(self.index.get('Hinjewadi', 2015, 2020))
+        self.assertIsNone(self.index.window(''))
+
+    def test_column_projection_skips_missing_columns(self):
+        rows = self.index.get('Wakad', 2016, None, columns=['year', 'missing', 'rate'])
+        self.assertEqual(list(rows.columns), ['year', 'rate'])
+        self.assertEqual(len(rows), len(self.masked('Wakad', 2016)))
+
+    def test_frames_without_years_ignore_the_window(self):
+        index = LocationIndex(self.df.drop(columns='year'))
+        self.assertEqual(len(index.get('Aundh', 2030, 2031)), len(self.masked('Aundh')))
+        self.assertIsNone(index.year_bounds('Aundh'))
+
+
+class AreaMatcherTests(SimpleTestCase):
+    """AreaMatcher finds whole-word mentions, longest first, in mention order."""
+
+    def setUp(self):
+        names = ['Ambegaon', 'Ambegaon Budruk', 'Aundh', 'Wakad', 'Viman Nagar', 'Nagar', 'Pimple Saudagar']
+        self.matcher = AreaMatcher({name.lower(): name for name in names})
+
+    def test_overlapping_names(self):
+        cases = [
+            ("rates in Ambegaon Budruk", ['Ambegaon Budruk']),
+            ("Ambegaon vs Ambegaon Budruk", ['Ambegaon', 'Ambegaon Budruk']),
+            ("Viman Nagar and Nagar", ['Viman Nagar', 'Nagar']),
+            ("Pimple Saudagar", ['Pimple Saudagar']),
+        ]
+        for message, expected in cases:
+            with self.subTest(message=message):
+                self.assertEqual(self.matcher.find(message), expected)
+
+    def test_word_boundaries(self):
+        cases = [
+            ("Baundhara prices", []),
+            ("Wakad2 prices", []),
+            ("Wakad's prices", ['Wakad']),
+            ("(Aundh)", ['Aundh']),
+            ("Ambegaon Budrukwadi", ['Ambegaon']),
+        ]
+        for message, expected in cases:
+            with self.subTest(message=message):
+                self.assertEqual(self.matcher.find(message), expected)
+
+    def test_case_and_whitespace_folding(self):
+        self.assertEqual(self.matcher.find("AMBEGAON   budruk"), ['Ambegaon Budruk'])
+        self.assertEqual(self.matcher.find("wAkAd"), ['Wakad'])
+
+    def test_mention_order_without_repeats(self):
+        self.assertEqual(self.matcher.find("Wakad vs Aundh, then Wakad again"), ['Wakad', 'Aundh'])
+        self.assertEqual(self.matcher.find("Aundh or Wakad"), ['Aundh', 'Wakad'])
+
+
+class LeaderboardTests(SimpleTestCase):
+    """Leaderboard orders break value ties by location name."""
+
+    def setUp(self):
+        rows = [
+            ('Wakad', 'Pune', 5.0),
+            ('Aundh', 'Pune', 5.0),
+            ('Baner', 'Pune', 9.0),
+            ('Kharadi', 'Pune', 5.0),
+            ('Andheri', 'Mumbai', 1.0),
+        ]
+        metrics = pd.DataFrame({
+            'location': [name for name, _, _ in rows],
+            'city': [city for _, city, _ in rows],
+            'year_start': 2020,
+            'year_end': 2023,
+        }, index=[name.lower() for name, _, _ in rows])
+        for column in RANKINGS.values():
+            metrics[column] = [value for _, _, value in rows]
+        self.leaderboard = Leaderboard(metrics)
+
+    def names(self, **kwargs):
+        return [item['location'] for item in self.leaderboard.rank('rate', **kwargs)['items']]
+
+    def test_ties_are_alphabetical_in_both_orders(self):
+        self.assertEqual(self.names(order=ASCENDING), ['Andheri', 'Aundh', 'Kharadi', 'Wakad', 'Baner'])
+        self.assertEqual(self.names(order=DESCENDING), ['Baner', 'Aundh', 'Kharadi', 'Wakad', 'Andheri'])
+        self.assertEqual(self.names(order=DESCENDING, city='pune'), ['Baner', 'Aundh', 'Kharadi', 'Wakad'])
+
+    def test_pages_and_value_bounds_keep_tie_order(self):
+        self.assertEqual(self.names(order=DESCENDING, k=2, offset=1), ['Aundh', 'Kharadi'])
+        self.assertEqual(self.names(order=DESCENDING, min_value=2, max_value=5), ['Aundh', 'Kharadi', 'Wakad'])
+        result = self.leaderboard.rank('rate', order=DESCENDING, k=1, offset=2, max_value=5)
+        self.assertEqual(result['total'], 4)
+        self.assertEqual([item['location'] for item in result['items']], ['Wakad'])
+
+
+class _FakeResponse:
+    """Minimal stand-in for a requests/httpx response."""
+
+    def __init__(self, payload, status_code=200):
+        self.payload = payload
+        self.status_code = status_code
+
+    def json(self):
+        return self.payload
+
+
+class GeneratedTextTests(SimpleTestCase):
+    """LLMClient turns malformed generation responses into LLMErrors."""
+
+    def test_extracts_text_without_prompt(self):
+        client = LLMClient()
+        text = client._generated_text(_FakeResponse([{"generated_text": "prompt Rates rose."}]), "prompt")
+        self.assertEqual(text, "Rates rose.")
+        self.assertEqual(client.breaker.snapshot()["consecutive_failures"], 0)
+
+    def test_malformed_items_count_as_failures(self):
+        for payload in (["text"], [None], [{"generated_text": None}], {"generated_text": "x"}, []):
+            with self.subTest(payload=payload):
+                client = LLMClient()
+                with self.assertRaises(LLMError) as caught:
+                    client._generated_text(_FakeResponse(payload), "prompt")
+                self.assertEqual(caught.exception.reason, "bad_response")
+                snapshot = client.breaker.snapshot()
+                self.assertEqual(snapshot["consecutive_failures"], 1)
+                self.assertEqual(snapshot["last_failure"], "bad_response")
+
+
+class _RecordingLLM(LLMClient):
+    """LLM client that records prompts and answers without a network call."""
+
+    def __init__(self):
+        super().__init__()
+        self.prompts = []
+
+    def generate(self, prompt, parameters, model_name):
+        self.prompts.append(prompt)
+        return "Rates rose."
+
+    async def agenerate(self, prompt, parameters, model_name):
+        self.prompts.append(prompt)
+        return "Rates rose."
+
+    def stream(self, prompt, parameters, model_name):
+        self.prompts.append(prompt)
+        yield from ("Rates ", "rose.")
+
+    async def astream(self, prompt, parameters, model_name):
+        self.prompts.append(prompt)
+        for token in ("Rates ", "rose."):
+            yield token
+
+
+LOCAL_CACHES = {
+    alias: {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': f'tests-{alias}'}
+    for alias in ('default', 'summaries-local', 'summaries-shared')
+}
+
+
+@override_settings(CACHES=LOCAL_CACHES, HUGGINGFACE_API_KEY='test-key')
+class SummaryPinTests(SimpleTestCase):
+    """LLM prompts use the data version of the request that asked for them."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        frame = sample_frame()
+        cls.old = Dataset.from_frame(frame)
+        reloaded = frame.copy()
+        reloaded.loc[reloaded['final location'] == 'Wakad', RATE_COLUMN] += 1000
+        cls.new = Dataset.from_frame(reloaded)
+
+    def setUp(self):
+        for alias in LOCAL_CACHES:
+            caches[alias].clear()
+        self.service = RealEstateService()
+        self.service._publish(self.old)
+        self.llm = _RecordingLLM()
+        patcher = mock.patch('api.services.get_llm_client', return_value=self.llm)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def assert_old_prompt(self):
+        self.assertEqual(len(self.llm.prompts), 1)
+        self.assertIn(self.old.prompt_blocks['wakad'], self.llm.prompts[0])
+        self.assertNotIn(self.new.prompt_blocks['wakad'], self.llm.prompts[0])
+
+    def submit_job(self):
+        """Start a summary job for Wakad, returning its body and arguments unrun."""
+        submitted = []
+
+        def submit(job_id, fn, *args):
+            submitted.append(args)
+            return True
+
+        with mock.patch.object(summary_jobs, 'submit', side_effect=submit):
+            with self.service.pinned():
+                _, job_id = self.service.start_llm_summary('Wakad', self.service.filter_by_area('Wakad'))
+        self.assertIsNotNone(job_id)
+        return submitted[0]
+
+    def test_summary_job_uses_submitting_version(self):
+        args = self.submit_job()
+        self.service._publish(self.new)
+        self.assertEqual(self.service._run_summary_job(*args), ("done", "Rates rose."))
+        self.assert_old_prompt()
+
+    def test_async_summary_job_uses_submitting_version(self):
+        args = self.submit_job()
+        self.service._publish(self.new)
+        self.assertEqual(asyncio.run(self.service._arun_summary_job(*args)), ("done", "Rates rose."))
+        self.assert_old_prompt()
+
+    def test_stream_uses_requesting_version(self):
+        events = self.service.stream_query("Analyze Wakad")
+        self.assertEqual(next(events)[0], "result")
+        self.service._publish(self.new)
+        self.assertEqual(list(events)[-1], ("summary", {"summary": "Rates rose.", "source": "llm"}))
+        self.assert_old_prompt()
+
+    def test_async_stream_uses_requesting_version(self):
+        async def run():
+            events = self.service.astream_query("Analyze Wakad")
+            self.assertEqual((await events.__anext__())[0], "result")
+            self.service._publish(self.new)
+            return [event async for event in events]
+
+        self.assertEqual(asyncio.run(run())[-1], ("summary", {"summary": "Rates rose.", "source": "llm"}))
+        self.assert_old_prompt()
+
+    def test_failed_streams_fall_back_to_analytical_summary(self):
+        def fail(*args):
+            raise LLMError("stream broke", reason="stream_error")
+            yield
+
+        async def afail(*args):
+            raise LLMError("stream broke", reason="stream_error")
+            yield
+
+        async def arun():
+            return [event async for event in self.service.astream_query("Analyze Wakad")]
+
+        with mock.patch.object(self.llm, 'stream', fail), mock.patch.object(self.llm, 'astream', afail):
+            for events in (list(self.service.stream_query("Analyze Wakad")), asyncio.run(arun())):
+                self.assertEqual(events[-1][1]["source"], "analytical")
+                self.assertEqual(events[-1][1]["summary"], events[0][1]["summary"])
+
+
+class ParseQueryTests(SimpleTestCase):
+    """parse_query reads year windows, metrics and property types."""
+
+    def plan(self, message, areas=('Wakad',)):
+        return parse_query(message, list(areas), len(areas) > 1)
+
+    def test_year_windows(self):
+        cases = [
+            ("Wakad prices from 2018 to 2020", (2018, 2020, None)),
+            ("Wakad between 2022 and 2019", (2019, 2022, None)),
+            ("Wakad 2020 to 2022", (2020, 2022, None)),
+            ("Wakad 2019-2022", (2019, 2022, None)),
+            ("Wakad since 2021", (2021, None, None)),
+            ("Wakad after 2020", (2021, None, None)),
+            ("Wakad before 2020", (None, 2019, None)),
+            ("Wakad until 2021", (None, 2021, None)),
+            ("Wakad in 2022", (2022, 2022, None)),
+            ("Wakad 2022", (2022, 2022, None)),
+            ("Wakad last 3 years", (None, None, 3)),
+            ("Wakad past year", (None, None, 1)),
+            ("Analyze Wakad", (None, None, None)),
+        ]
+        for message, window in cases:
+            with self.subTest(message=message):
+                plan = self.plan(message)
+                self.assertEqual((plan.year_from, plan.year_to, plan.last_years), window)
+
+    def test_metrics_and_property_types(self):
+        cases = [
+            ("Office rates in Wakad", 'rate', 'office', 'office - weighted average rate'),
+            ("units sold in Wakad", 'sales', None, 'flat_sold - igr'),
+            ("Wakad sales and prices", 'sales', None, 'flat_sold - igr'),
+            ("Wakad inventory", 'units', None, 'total units'),
+            ("shop units in Wakad", 'units', 'shop', 'shop total'),
+            ("carpet area supplied in Wakad", 'supply', None, 'total carpet area supplied (sqft)'),
+            ("retail space in Wakad", 'rate', 'shop', 'shop - weighted average rate'),
+            ("apartments in Wakad", 'rate', 'flat', 'flat - weighted average rate'),
+        ]
+        for message, metric, property_type, column in cases:
+            with self.subTest(message=message):
+                plan = self.plan(message)
+                self.assertEqual((plan.metric, plan.property_type, plan.column), (metric, property_type, column))
+
+    def test_default_plans_are_not_narrowed(self):
+        for message, areas in [("Analyze Wakad", ['Wakad']), ("apartments in Wakad", ['Wakad'])]:
+            with self.subTest(message=message):
+                self.assertFalse(self.plan(message, areas).narrowed)
+        self.assertTrue(self.plan("compare flat sales in Aundh and Wakad", ['Aundh', 'Wakad']).narrowed)
+
+    def test_area_names_are_not_read_as_filters(self):
+        for area in ('Sector 2021', 'Shop Street'):
+            with self.subTest(area=area):
+                plan = self.plan(f"Analyze {area}", [area])
+                self.assertFalse(plan.narrowed)
+                self.assertIsNone(plan.property_type)
+
+
+@override_settings(CACHES=LOCAL_CACHES)
+class PlanSummaryTests(SimpleTestCase):
+    """Narrowed plans summarize the metric they asked for."""
+
+    def setUp(self):
+        self.service = RealEstateService()
+        self.service._publish(Dataset.from_frame(sample_frame()))
+
+    def test_single_year_windows_get_the_metric_summary(self):
+        cases = [
+            ("Wakad rates in 2022", "Wakad flat rates (2022): Rs "),
+            ("Wakad flat sales in 2022", "Wakad flat units sold (2022): "),
+        ]
+        for message, heading in cases:
+            with self.subTest(message=message):
+                summary = self.service.analyze_query(message)["summary"]
+                self.assertTrue(summary.startswith(heading), summary)
+                self.assertNotIn("nan", summary)
+                self.assertNotIn("trend", summary)
+
+    def test_multi_year_rate_windows_keep_the_market_analysis(self):
+        summary = self.service.analyze_query("Wakad rates 2021-2023")["summary"]
+        self.assertIn("market analysis (2021-2023)", summary)
+
+
+class TablePageTests(SimpleTestCase):
+    """table_page pages an area's rows by cursor, projected and in either layout."""
+
+    def setUp(self):
+        # Several rows per year, so cursors have to point inside a year
+        rows = [('Wakad', year, rate) for year in (2020, 2021, 2022) for rate in range(3)]
+        rows += [('Aundh', 2021, 9000)]
+        self.index = LocationIndex(pd.DataFrame({
+            'final location': [name for name, _, _ in rows],
+            'year': [year for _, year, _ in rows],
+            'rate': [rate for _, _, rate in rows],
+        }))
+
+    def pages(self, limit, **kwargs):
+        """Follow next_cursor from the first page to the last."""
+        cursor, pages = None, []
+        while True:
+            page = table_page(self.index, 'wakad', ['year', 'rate'], limit, cursor=cursor, **kwargs)
+            pages.append(page)
+            cursor = page["next_cursor"]
+            if cursor is None:
+                return pages
+
+    def test_cursor_round_trip(self):
+        for year, skip in [(2020, 0), (2021, 2), (1999, 15)]:
+            with self.subTest(year=year, skip=skip):
+                self.assertEqual(decode_cursor(encode_cursor(year, skip)), (year, skip))
+
+    def test_invalid_cursors(self):
+        for cursor in ('not a cursor!', encode_cursor(2020, -1), 'MjAyMA', '__'):
+            with self.subTest(cursor=cursor):
+                with self.assertRaises(ValueError):
+                    table_page(self.index, 'Wakad', ['year'], 2, cursor=cursor)
+
+    def test_pages_concatenate_to_the_full_table(self):
+        full = table_page(self.index, 'Wakad', ['year', 'rate'], 100)
+        self.assertIsNone(full["next_cursor"])
+        for limit in (1, 2, 4, 9):
+            with self.subTest(limit=limit):
+                pages = self.pages(limit)
+                self.assertEqual(sum((page["rows"] for page in pages), []), full["rows"])
+                self.assertTrue(all(len(page["rows"]) <= limit for page in pages))
+                self.assertEqual({page["total"] for page in pages}, {9})
+
+    def test_year_window(self):
+        pages = self.pages(2, year_from=2021, year_to=2021)
+        rows = sum((page["rows"] for page in pages), [])
+        self.assertEqual([row["year"] for row in rows], [2021] * 3)
+        self.assertEqual(pages[0]["total"], 3)
+
+    def test_column_projection_and_layouts(self):
+        page = table_page(self.index, 'WAKAD', ['rate'], 4)
+        self.assertEqual(page["area"], 'Wakad')
+        self.assertEqual(page["rows"], [{'rate': 0}, {'rate': 1}, {'rate': 2}, {'rate': 0}])
+        columnar = table_page(self.index, 'Wakad', ['year', 'rate'], 4, layout=COLUMNS)
+        self.assertNotIn("rows", columnar)
+        self.assertEqual(columnar["data"], {'year': [2020, 2020, 2020, 2021], 'rate': [0, 1, 2, 0]})
+        self.assertEqual(columnar["next_cursor"], page["next_cursor"])
+
+    def test_unknown_area_and_columns(self):
+        self.assertIsNone(table_page(self.index, 'Baner', ['year'], 2))
+        with self.assertRaises(ValueError):
+            table_page(self.index, 'Wakad', ['year', 'missing'], 2)
+
+
+@override_settings(CACHES=LOCAL_CACHES, HUGGINGFACE_API_KEY='')
+class QueryCacheTests(SimpleTestCase):
+    """Query responses are cached per resolved query and revalidated by ETag."""
+
+    def setUp(self):
+        for alias in LOCAL_CACHES:
+            caches[alias].clear()
+        response_cache.clear()
+        service = RealEstateService()
+        service._publish(Dataset.from_frame(sample_frame()))
+        patcher = mock.patch('api.views.service', service)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def query(self, message, **headers):
+        return self.client.get('/api/query/', {'message': message}, **headers)
+
+    def test_etag_and_if_none_match(self):
+        first = self.query("Analyze Wakad")
+        self.assertEqual((first.status_code, first['X-Cache']), (200, "MISS"))
+        etag = first['ETag']
+        self.assertTrue(etag.startswith('"'))
+
+        again = self.query("Analyze Wakad")
+        self.assertEqual((again.status_code, again['X-Cache'], again['ETag']), (200, "HIT", etag))
+        self.assertEqual(again.content, first.content)
+
+        for header in (etag, f'W/{etag}', f'"other", {etag}', '*'):
+            with self.subTest(header=header):
+                response = self.query("Analyze Wakad", HTTP_IF_NONE_MATCH=header)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response['ETag'], etag)
+                self.assertEqual(response.content, b'')
+
+        stale = self.query("Analyze Wakad", HTTP_IF_NONE_MATCH='"other"')
+        self.assertEqual((stale.status_code, stale.content), (200, first.content))
+
+    def test_differently_phrased_queries_share_a_response(self):
+        pairs = [
+            ("Analyze Wakad", "wakad   trends please"),
+            ("Compare Aundh and Wakad", "compare WAKAD vs aundh"),
+            ("Wakad office rates since 2022", "office prices in wakad since 2022"),
+        ]
+        for message, rephrased in pairs:
+            with self.subTest(message=message):
+                first = self.query(message)
+                second = self.query(rephrased)
+                self.assertEqual((first['X-Cache'], second['X-Cache']), ("MISS", "HIT"))
+                self.assertEqual(second['ETag'], first['ETag'])
+
+    def test_different_queries_do_not_share_a_response(self):
+        first = self.query("Analyze Wakad")
+        for message in ("Analyze Aundh", "Wakad office rates", "Wakad rates in 2022"):
+            with self.subTest(message=message):
+                response = self.query(message)
+                self.assertEqual(response['X-Cache'], "MISS")
+                self.assertNotEqual(response['ETag'], first['ETag'])
+
+
+@override_settings(CACHES=LOCAL_CACHES, SUMMARY_FLIGHT_LEASE=5)
+class SingleFlightTests(SimpleTestCase):
+    """Concurrent identical calls share one computation, here or in another worker."""
+
+    THREADS = 8
+
+    def setUp(self):
+        for alias in LOCAL_CACHES:
+            caches[alias].clear()
+        self.flight = SingleFlight(poll_interval=0.01)
+        self.calls = 0
+        self.release = threading.Event()
+
+    def compute(self):
+        self.calls += 1
+        # Hold the call open until every other caller has joined it
+        self.release.wait(5)
+        return "summary"
+
+    def run_threads(self, target):
+        results = [None] * self.THREADS
+
+        def run(slot):
+            try:
+                results[slot] = target()
+            except Exception as e:
+                results[slot] = e
+
+        threads = [threading.Thread(target=run, args=(slot,)) for slot in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        deadline = time.monotonic() + 5
+        while self.flight.stats()["coalesced"] < self.THREADS - 1 and time.monotonic() < deadline:
+            time.sleep(0.005)
+        self.release.set()
+        for thread in threads:
+            thread.join(5)
+        return results
+
+    def test_threads_with_one_key_compute_once(self):
+        results = self.run_threads(lambda: self.flight.do("key", self.compute))
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(results, ["summary"] * self.THREADS)
+        stats = self.flight.stats()
+        self.assertEqual((stats["leaders"], stats["coalesced"], stats["in_flight"]), (1, self.THREADS - 1, 0))
+        self.assertIsNone(caches['summaries-shared'].get("flight:key"))
+
+    def test_errors_reach_every_caller(self):
+        def fail():
+            self.compute()
+            raise ValueError("boom")
+
+        results = self.run_threads(lambda: self.flight.do("key", fail))
+        self.assertEqual(self.calls, 1)
+        self.assertTrue(all(isinstance(result, ValueError) for result in results))
+
+    def test_coroutines_with_one_key_compute_once(self):
+        async def compute():
+            self.calls += 1
+            await asyncio.sleep(0.05)
+            return "summary"
+
+        async def run():
+            return await asyncio.gather(*(self.flight.ado("key", compute) for _ in range(self.THREADS)))
+
+        self.assertEqual(asyncio.run(run()), ["summary"] * self.THREADS)
+        self.assertEqual(self.calls, 1)
+
+    def test_waits_for_the_worker_holding_the_lease(self):
+        store = caches['summaries-shared']
+        store.add("flight:key", "other-worker", 5)
+        threading.Timer(0.05, store.set, ("published", "remote summary")).start()
+        result = self.flight.do("key", self.compute, wait_for=lambda: store.get("published"))
+        self.assertEqual(result, "remote summary")
+        self.assertEqual(self.calls, 0)
+        self.assertEqual(self.flight.stats()["remote_waits"], 1)
+
+    def test_released_lease_without_result_falls_back(self):
+        store = caches['summaries-shared']
+        store.add("flight:key", "other-worker", 5)
+        threading.Timer(0.05, store.delete, ("flight:key",)).start()
+        self.assertIsNone(self.flight.do("key", self.compute, wait_for=lambda: store.get("published")))
+        self.assertEqual(self.calls, 0)
+
+    @override_settings(SUMMARY_FLIGHT_LEASE=0.1)
+    def test_expired_wait_gives_none(self):
+        caches['summaries-shared'].add("flight:key", "other-worker", 5)
+        self.assertIsNone(self.flight.do("key", self.compute))
+        self.assertEqual(self.calls, 0)
+        self.assertEqual(self.flight.stats()["remote_timeouts"], 1)
+
+    def test_runs_locally_without_a_shared_store(self):
+        self.release.set()
+        flight = SingleFlight(lock_alias='missing')
+        with self.assertLogs('api.singleflight', 'WARNING'):
+            self.assertEqual(flight.do("key", self.compute), "summary")
+        self.assertEqual(self.calls, 1)
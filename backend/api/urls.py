@@ -2,12 +2,35 @@
 URL routing for API endpoints.
 """
 
+from django.conf import settings
 from django.urls import path
-from .views import QueryView, DebugView
+from .views import (
+    QueryView, BatchQueryView, QueryStreamView, SummaryJobView, DebugView, ReloadView, MetricsView,
+    ReadinessView, LivenessView, RankingView, TableView,
+)
+
+query_view, query_stream_view, summary_job_view = QueryView, QueryStreamView, SummaryJobView
+if settings.API_ASYNC_VIEWS:
+    # ASGI deployment: endpoints that wait on HuggingFace or on summary jobs
+    # are served by async views, which do not hold a thread while waiting
+    from . import async_views
+    query_view = async_views.AsyncQueryView
+    query_stream_view = async_views.AsyncQueryStreamView
+    summary_job_view = async_views.AsyncSummaryJobView
 
 app_name = 'api'
 
 urlpatterns = [
-    path('query/', QueryView.as_view(), name='query'),
+    path('query/', query_view.as_view(), name='query'),
+    path('query/batch/', BatchQueryView.as_view(), name='query-batch'),
+    path('query/stream/', query_stream_view.as_view(), name='query-stream'),
+    path('rankings/', RankingView.as_view(), name='rankings'),
+    path('table/', TableView.as_view(), name='table'),
+    path('summary/<str:job_id>/', summary_job_view.as_view(), name='summary-job'),
     path('debug/', DebugView.as_view(), name='debug'),
+    path('reload/', ReloadView.as_view(), name='reload'),
+    path('metrics/', MetricsView.as_view(), name='metrics'),
+    path('health/', ReadinessView.as_view(), name='health'),
+    path('health/ready/', ReadinessView.as_view(), name='health-ready'),
+    path('health/live/', LivenessView.as_view(), name='health-live'),
 ]
@@ -2,28 +2,158 @@
 REST API views for real estate chatbot.
 """
 
+import hmac
+import itertools
+
+import orjson
+
+from django.http import HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils.http import parse_etags
+from rest_framework.exceptions import APIException
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from django.conf import settings
 
+from .cache import response_cache, summary_cache
+from .jobs import summary_jobs
+from .llm import get_llm_client
+from .metrics import registry, server_timed, stage, timed
+from .renderers import dumps
+from .singleflight import summary_flights
 from .services import RealEstateService
-from .serializers import QueryRequestSerializer, QueryResponseSerializer
+from .serializers import (
+    BatchQueryRequestSerializer,
+    QueryRequestSerializer,
+    RankingRequestSerializer,
+    SummaryJobSerializer,
+    TablePageSerializer,
+    TableRequestSerializer,
+    query_response_payload,
+    validate_query_response,
+)
 
 
-# Initialize service (singleton pattern)
+# Initialize service (singleton pattern); the data loads in the background
+# (see realestate_api/wsgi.py and asgi.py, or on first use)
 service = RealEstateService()
 
+# Seconds clients are asked to wait while the data loads
+DATA_RETRY_AFTER = 5
+
+registry.gauge('realestate_data_ready', 'Whether the dataset is loaded and indexed.', lambda: service.ready)
+registry.gauge('realestate_dataset_rows', 'Rows in the dataset being served.', lambda: service.dataset.rows)
+registry.gauge('realestate_dataset_bytes', 'Memory held by the dataset frame.', lambda: service.dataset.memory_bytes)
+registry.gauge('realestate_summary_jobs_running', 'Background LLM summary jobs in flight.', summary_jobs.running)
+registry.gauge(
+    'realestate_response_cache_bytes', 'Bytes held by the response cache.',
+    lambda: response_cache.stats()["bytes"],
+)
+
+
+class DataUnavailable(APIException):
+    """503 for data endpoints until the dataset is ready."""
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Data is not loaded yet."
+    default_code = 'data_unavailable'
+    # Sent as Retry-After by DRF's exception handler
+    wait = DATA_RETRY_AFTER
+
+
+def data_unavailable_detail() -> str:
+    """Reason the dataset cannot be used, starting the load if nobody has yet."""
+    service.start_loading()
+    state = service.status()
+    if state["state"] == "failed":
+        return f"Data failed to load: {state['error']}"
+    return "Data is loading, retry shortly."
+
+
+class DataRequiredMixin:
+    """For views that read the dataset: answer 503 until it is ready."""
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if not service.ready:
+            raise DataUnavailable(data_unavailable_detail())
 
-class QueryView(APIView):
+
+@timed('serialize')
+def render_query_result(result) -> bytes:
+    """
+    Encode a query result with the fast path.
+
+    Equivalent to rendering QueryResponseSerializer(result).data, without
+    per-field serializer work; tables may be pre-encoded Fragments. With
+    settings.API_VALIDATE_RESPONSES the output is checked against the
+    serializer schema.
+    """
+    body = dumps(query_response_payload(result))
+    if settings.API_VALIDATE_RESPONSES:
+        validate_query_response(orjson.loads(body))
+    return body
+
+
+def resolve_query(message, tables=True):
+    """
+    Cached rendered response for a query message, computing it on a miss.
+
+    Messages resolving to the same areas, mode and filters share one response.
+
+    Args:
+        message: User query message
+        tables: Include the tables (see QueryRequestSerializer)
+
+    Returns:
+        Tuple of (CachedResponse, "HIT" or "MISS")
+    """
+    with service.pinned():
+        plan = service.plan_query(message)
+        with stage('cache'):
+            cache_key = service.query_cache_key(plan.is_comparison, plan.areas, plan, tables)
+            entry = response_cache.get(cache_key)
+        if entry is not None:
+            return entry, "HIT"
+        # Perform analysis
+        result = service.analyze_intent(plan.is_comparison, plan.areas, fragments=True, plan=plan, tables=tables)
+        return response_cache.set(cache_key, render_query_result(result)), "MISS"
+
+
+def cached_query_response(request, entry, cache_status):
+    """HTTP response for a cached query result, honouring If-None-Match."""
+    # If-None-Match uses weak comparison, so W/"..." matches too
+    candidates = parse_etags(request.headers.get('If-None-Match', ''))
+    if '*' in candidates or entry.etag in (tag.removeprefix('W/') for tag in candidates):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(entry.body, content_type='application/json')
+    response['ETag'] = entry.etag
+    response['Cache-Control'] = f"public, max-age={settings.QUERY_CACHE_MAX_AGE}, must-revalidate"
+    response['X-Cache'] = cache_status
+    return response
+
+
+class QueryView(DataRequiredMixin, APIView):
     """
     API endpoint for processing real estate queries.
     
     POST /api/query
+    GET  /api/query?message=...
     - Accepts user message
     - Returns summary, chart data, and filtered table
+    
+    Responses are cached per resolved query (detected areas, mode and data
+    version), served as stored bytes and tagged with an ETag; a request
+    with a matching If-None-Match gets 304 Not Modified. A Server-Timing
+    header reports the time spent in each stage.
     """
 
+    @server_timed('query')
+    def get(self, request, *args, **kwargs):
+        """Process a query passed as ?message= (cacheable by clients and CDNs)."""
+        return self._respond(request, QueryRequestSerializer(data=request.query_params))
+
+    @server_timed('query')
     def post(self, request, *args, **kwargs):
         """
         Process user query and return analysis results.
@@ -37,12 +167,15 @@ class QueryView(APIView):
         {
             "area": "Wakad",
             "summary": "...",
+            "summary_job": "3f2a...",  # poll /api/summary/<id>/ for the LLM version
             "chart": {"years": [...], "values": [...]},
             "table": [...]
         }
         """
+        return self._respond(request, QueryRequestSerializer(data=request.data))
+
+    def _respond(self, request, serializer):
         # Validate input
-        serializer = QueryRequestSerializer(data=request.data)
         if not serializer.is_valid():
             return Response(
                 {"error": serializer.errors},
@@ -53,22 +186,218 @@ class QueryView(APIView):
         message = serializer.validated_data['message']
 
         try:
-            # Perform analysis
-            result = service.analyze_query(message)
+            entry, cache_status = resolve_query(message, serializer.validated_data['tables'])
+        except Exception as e:
+            return Response(
+                {"error": f"Analysis failed: {str(e)}"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
 
-            # Validate output
-            response_serializer = QueryResponseSerializer(result)
-            
-            return Response(response_serializer.data, status=status.HTTP_200_OK)
-        
+        return cached_query_response(request, entry, cache_status)
+
+
+class BatchQueryView(DataRequiredMixin, APIView):
+    """
+    API endpoint for answering many queries in one request.
+
+    POST /api/query/batch/
+    {"messages": ["Analyze Wakad", "Compare Aundh and Akurdi"], "llm_summaries": true}
+
+    Response: {"results": [...]} in input order; each item has the
+    /api/query/ response shape, or {"error": "..."} if that message failed.
+    """
+
+    @server_timed('batch')
+    def post(self, request, *args, **kwargs):
+        """Process a batch of user queries."""
+        serializer = BatchQueryRequestSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(
+                {"error": serializer.errors},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            results = service.analyze_batch(
+                serializer.validated_data['messages'],
+                llm_summaries=serializer.validated_data['llm_summaries'],
+                fragments=True,
+            )
+            items = [
+                dumps(item) if "error" in item else render_query_result(item)
+                for item in results
+            ]
         except Exception as e:
             return Response(
                 {"error": f"Analysis failed: {str(e)}"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+        body = b'{"results":[' + b','.join(items) + b']}'
+        return HttpResponse(body, content_type='application/json')
+
+
+class RankingView(DataRequiredMixin, APIView):
+    """
+    API endpoint for leaderboards of locations.
+
+    GET /api/rankings/?metric=cagr&k=10&city=Pune&order=desc
+    - metric: cagr, growth, rate, avg_rate, sales, sales_growth, volatility or units
+    - optional city filter, offset for paging, and min/max value bounds
+
+    Response: {"metric", "column", "order", "city", "total", "offset",
+    "items": [{"rank", "location", "city", "value", "year_start", "year_end"}]}
+    """
+
+    @server_timed('rankings')
+    def get(self, request, *args, **kwargs):
+        """Return the top (or bottom) K locations by a metric."""
+        serializer = RankingRequestSerializer(data=request.query_params)
+        if not serializer.is_valid():
+            return Response(
+                {"error": serializer.errors},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        params = serializer.validated_data
+        if 'min' in params and 'max' in params and params['min'] > params['max']:
+            return Response({"error": "min must not exceed max"}, status=status.HTTP_400_BAD_REQUEST)
+        result = service.get_rankings(
+            params['metric'],
+            k=params['k'],
+            city=params.get('city') or None,
+            order=params['order'],
+            offset=params['offset'],
+            min_value=params.get('min'),
+            max_value=params.get('max'),
+        )
+        return Response(result)
+
+
+class TableView(DataRequiredMixin, APIView):
+    """
+    API endpoint for paging through an area's table.
+
+    GET /api/table/?area=Wakad&columns=year,total units&limit=50&layout=columns
+    - columns: comma-separated projection (default: the query table's columns)
+    - cursor: next_cursor of the previous page
+    - year_from / year_to: inclusive year window
+    - layout: "rows" (list of row objects) or "columns" (one array per column)
 
-class DebugView(APIView):
+    Response: {"area", "columns", "layout", "total", "next_cursor",
+    "rows": [...]} or {..., "data": {"year": [...], ...}}
+    """
+
+    @server_timed('table')
+    def get(self, request, *args, **kwargs):
+        """Return one page of an area's rows."""
+        serializer = TableRequestSerializer(data=request.query_params)
+        if not serializer.is_valid():
+            return Response(
+                {"error": serializer.errors},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        params = serializer.validated_data
+        try:
+            page = service.get_table_page(
+                params['area'],
+                columns=params.get('columns'),
+                limit=params['limit'],
+                cursor=params.get('cursor') or None,
+                year_from=params.get('year_from'),
+                year_to=params.get('year_to'),
+                layout=params['layout'],
+            )
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if page is None:
+            return Response({"error": "Unknown area"}, status=status.HTTP_404_NOT_FOUND)
+
+        body = dumps(page)
+        if settings.API_VALIDATE_RESPONSES:
+            TablePageSerializer(data=orjson.loads(body)).is_valid(raise_exception=True)
+        return HttpResponse(body, content_type='application/json')
+
+
+class QueryStreamView(DataRequiredMixin, APIView):
+    """
+    Streaming variant of the query endpoint (server-sent events).
+
+    POST /api/query/stream/
+    - event "result":  full analysis (chart, table, analytical summary)
+    - event "token":   LLM summary fragments as they are generated
+    - event "summary": final summary and its source ("llm" or "analytical")
+    - event "done"
+    """
+
+    @server_timed('query_stream')
+    def post(self, request, *args, **kwargs):
+        """Stream the analysis for a user query."""
+        serializer = QueryRequestSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(
+                {"error": serializer.errors},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        message = serializer.validated_data['message']
+        events = self._events(message)
+        # The first frame carries the analysis: run it now so its stages
+        # reach the Server-Timing header, and stream the summary after
+        first = next(events)
+        response = StreamingHttpResponse(
+            itertools.chain([first], events),
+            content_type='text/event-stream'
+        )
+        response['Cache-Control'] = 'no-cache'
+        # Stop nginx-style proxies from buffering the stream
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    def _events(self, message):
+        """Encode service events as SSE frames."""
+        try:
+            for event, data in service.stream_query(message):
+                if event == "result":
+                    data = query_response_payload(data)
+                yield self._frame(event, data)
+        except Exception as e:
+            yield self._frame("error", {"error": f"Analysis failed: {str(e)}"})
+        yield self._frame("done", {})
+
+    @staticmethod
+    def _frame(event, data):
+        return b"event: " + event.encode('utf-8') + b"\ndata: " + dumps(data) + b"\n\n"
+
+
+class SummaryJobView(APIView):
+    """
+    API endpoint for fetching a background LLM summary.
+
+    GET /api/summary/<job_id>/?wait=5
+    - Returns the job status ("pending", "done" or "failed") and summary
+    - Optional wait (seconds) long-polls until the job finishes
+    """
+
+    @server_timed('summary_job')
+    def get(self, request, job_id, *args, **kwargs):
+        """Return the current state of a summary job."""
+        try:
+            wait = float(request.query_params.get('wait', 0))
+        except ValueError:
+            return Response({"error": "wait must be a number"}, status=status.HTTP_400_BAD_REQUEST)
+
+        wait = min(max(wait, 0.0), settings.SUMMARY_POLL_MAX_WAIT)
+        record = summary_jobs.wait(job_id, wait) if wait else summary_jobs.status(job_id)
+        if record is None:
+            return Response({"error": "Unknown summary job"}, status=status.HTTP_404_NOT_FOUND)
+
+        serializer = SummaryJobSerializer({"job": job_id, **record})
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class DebugView(DataRequiredMixin, APIView):
     """Debug endpoint to verify LLM integration."""
     
     def get(self, request):
@@ -84,7 +413,13 @@ class DebugView(APIView):
             "api_key_configured": is_configured,
             "api_key_preview": f"{api_key[:10]}...{api_key[-5:]}" if api_key else "NOT SET",
             "sample_data_rows": len(test_data),
-            "test_llm": "Available" if is_configured else "Not Available"
+            "test_llm": "Available" if is_configured else "Not Available",
+            "data_version": service.data_version,
+            "summary_cache": summary_cache.stats(),
+            "response_cache": response_cache.stats(),
+            "summary_jobs_running": summary_jobs.running(),
+            "llm_circuit": get_llm_client().breaker.snapshot(),
+            "summary_flights": summary_flights.stats(),
         })
     
     def post(self, request):
@@ -126,3 +461,93 @@ class DebugView(APIView):
             }, status=500)
 
 
+class ReloadView(APIView):
+    """
+    Admin endpoint for publishing a new version of the data file.
+
+    GET  /api/reload/ - Current data version and outcome of the last reload
+    POST /api/reload/ - Start a background reload (header X-Reload-Token)
+
+    Reloads apply to the worker that receives the request; set
+    DATA_RELOAD_INTERVAL to have every worker pick up file changes.
+    """
+
+    def _authorized(self, request) -> bool:
+        """Check the reload token against settings.DATA_RELOAD_TOKEN."""
+        token = settings.DATA_RELOAD_TOKEN
+        supplied = request.headers.get('X-Reload-Token', '')
+        return bool(token) and hmac.compare_digest(supplied, token)
+
+    def get(self, request):
+        """Report the data version in use."""
+        if not self._authorized(request):
+            return Response({"error": "Reload not permitted"}, status=status.HTTP_403_FORBIDDEN)
+
+        data = service.status()
+        return Response({
+            "data_version": data["data_version"],
+            "rows": data["rows"],
+            "state": data["state"],
+            "last_reload": service.last_reload,
+        })
+
+    def post(self, request):
+        """Rebuild the dataset in the background and swap it in."""
+        if not self._authorized(request):
+            return Response({"error": "Reload not permitted"}, status=status.HTTP_403_FORBIDDEN)
+
+        started = service.reload()
+        return Response({
+            "status": "reloading" if started else "already reloading",
+            "data_version": service.status()["data_version"],
+        }, status=status.HTTP_202_ACCEPTED)
+
+
+class ReadinessView(APIView):
+    """
+    Readiness probe: route traffic here only once the data is usable.
+
+    GET /api/health/ (also /api/health/ready/)
+    - 200 when the dataset is loaded and indexed
+    - 503 while it is loading or if it failed to load (with the error)
+    """
+
+    def get(self, request):
+        """Report whether this worker can answer queries."""
+        service.start_loading()
+        data = service.status()
+        if service.ready:
+            return Response({"status": "ready", **data})
+        return Response(
+            {"status": "unavailable", **data},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            headers={"Retry-After": str(DATA_RETRY_AFTER)},
+        )
+
+
+class LivenessView(APIView):
+    """
+    Liveness probe: the process is up and answering requests.
+
+    GET /api/health/live/
+    - Always 200 (a worker still loading data is alive, not ready)
+    """
+
+    def get(self, request):
+        """Report that the process is alive, with the data state."""
+        return Response({"status": "alive", "data": service.status()["state"]})
+
+
+class MetricsView(APIView):
+    """
+    Prometheus metrics for this process.
+
+    GET /api/metrics/
+    - Per-stage and per-endpoint latency histograms
+    - LLM fallback and cache lookup counters
+    - Dataset, job and cache gauges
+    """
+
+    def get(self, request):
+        """Render the metrics registry in the Prometheus text format."""
+        return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
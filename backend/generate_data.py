@@ -1,29 +1,50 @@
 """
-Script to generate sample real estate data Excel file.
-Run this before starting the backend.
+Script to generate a synthetic real estate data Excel file with the same
+schema as data/Sample_data.xlsx (see api/synthetic.py).
+
+    python generate_data.py --localities 200 --cities 2 --years 10
+    DATA_FILE_PATH=data/synthetic_data.xlsx python manage.py runserver
+
+Excel holds at most 1,048,576 rows; use the benchmark command for larger
+datasets.
 """
 
-import pandas as pd
+import argparse
 import os
 
-# Sample data
-data = {
-    'Year': [2020, 2021, 2022, 2023, 2024] * 4,
-    'Area': ['Wakad'] * 5 + ['Akurdi'] * 5 + ['Aundh'] * 5 + ['Baner'] * 5,
-    'Price': [45, 48, 52, 58, 65, 35, 37, 40, 44, 48, 50, 53, 56, 60, 65, 42, 45, 48, 52, 56],
-    'Demand': [85, 88, 90, 92, 95, 75, 78, 80, 82, 85, 80, 82, 85, 88, 90, 78, 80, 83, 86, 89],
-    'Size': [1200, 1250, 1300, 1400, 1500, 1100, 1150, 1200, 1250, 1300, 1350, 1400, 1450, 1500, 1600, 1150, 1200, 1250, 1350, 1400],
-}
+from api.synthetic import generate_frame
+
+EXCEL_MAX_ROWS = 1_048_575
+
+parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+parser.add_argument('--localities', type=int, default=50)
+parser.add_argument('--cities', type=int, default=1)
+parser.add_argument('--years', type=int, default=5)
+parser.add_argument('--end-year', type=int, default=2024)
+parser.add_argument('--missing-rate', type=float, default=0.02, help="Share of empty cells in nullable columns")
+parser.add_argument('--gap-rate', type=float, default=0.0, help="Share of (locality, year) rows left out")
+parser.add_argument('--seed', type=int, default=0)
+parser.add_argument('--output', default='data/synthetic_data.xlsx')
+args = parser.parse_args()
 
-df = pd.DataFrame(data)
+df = generate_frame(
+    localities=args.localities,
+    cities=args.cities,
+    years=args.years,
+    end_year=args.end_year,
+    missing_rate=args.missing_rate,
+    gap_rate=args.gap_rate,
+    seed=args.seed,
+)
+if len(df) > EXCEL_MAX_ROWS:
+    raise SystemExit(f"✗ {len(df)} rows do not fit in an Excel sheet ({EXCEL_MAX_ROWS} max)")
 
 # Create data directory if not exists
-os.makedirs('data', exist_ok=True)
+os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
 
 # Save to Excel
-output_path = 'data/realestate.xlsx'
-df.to_excel(output_path, index=False)
+df.to_excel(args.output, index=False)
 
-print(f"✓ Excel file created: {output_path}")
+print(f"✓ Excel file created: {args.output}")
 print(f"✓ Total records: {len(df)}")
-print(f"✓ Areas: {df['Area'].unique().tolist()}")
+print(f"✓ Localities: {df['final location'].nunique()} across {df['city'].nunique()} cities")
@@ -0,0 +1,22 @@
+"""
+ASGI config for realestate_api project.
+
+    gunicorn realestate_api.asgi:application -k uvicorn.workers.UvicornWorker
+
+Serves the query, stream and summary-job endpoints with async views.
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'realestate_api.settings')
+os.environ.setdefault('API_ASYNC_VIEWS', 'True')
+
+application = get_asgi_application()
+
+# Load the dataset in the background so the worker answers health checks
+# (and 503s) right away instead of blocking startup on the Excel parse
+from api.views import service  # noqa: E402
+
+service.start_loading()
@@ -53,6 +53,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'realestate_api.wsgi.application'
+ASGI_APPLICATION = 'realestate_api.asgi.application'
 
 # CORS Configuration
 CORS_ALLOWED_ORIGINS = [
@@ -88,6 +89,39 @@ DATABASES = {
     }
 }
 
+# Caches: LLM summaries use an in-process LRU in front of a table shared
+# by all workers (create it with `python manage.py createcachetable`)
+SUMMARY_CACHE_TTL = int(os.getenv('SUMMARY_CACHE_TTL', str(24 * 60 * 60)))
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'default',
+    },
+    'summaries-local': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'summaries',
+        'TIMEOUT': SUMMARY_CACHE_TTL,
+        'OPTIONS': {'MAX_ENTRIES': 2048},
+    },
+    'summaries-shared': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'summary_cache',
+        'TIMEOUT': SUMMARY_CACHE_TTL,
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+
+# Rendered /api/query/ responses, keyed on the resolved query (see
+# api/cache.py ResponseCache). Entries are per process; the TTL bounds how
+# long a response can miss a summary upgrade that was not started (e.g. while
+# the LLM circuit breaker was open).
+QUERY_CACHE_TTL = float(os.getenv('QUERY_CACHE_TTL', '60'))
+QUERY_CACHE_MAX_ENTRIES = int(os.getenv('QUERY_CACHE_MAX_ENTRIES', '1024'))
+QUERY_CACHE_MAX_BYTES = int(os.getenv('QUERY_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+# max-age sent to clients and CDNs; they revalidate with If-None-Match after it
+QUERY_CACHE_MAX_AGE = int(os.getenv('QUERY_CACHE_MAX_AGE', '0'))
+
 # Internationalization
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'UTC'
@@ -109,10 +143,14 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'api.renderers.FastJSONRenderer',
     ],
 }
 
+# Check fast-path query responses against QueryResponseSerializer (slower;
+# on by default in development and tests)
+API_VALIDATE_RESPONSES = os.getenv('API_VALIDATE_RESPONSES', str(DEBUG)).lower() == 'true'
+
 # Logging configuration
 LOGGING = {
     'version': 1,
@@ -147,8 +185,30 @@ HUGGINGFACE_API_KEY = os.getenv(
 DATA_FILE_PATH = os.path.join(BASE_DIR, 'data', 'Sample_data.xlsx')
 
 
-# Data file path
-DATA_FILE_PATH = os.path.join(BASE_DIR, 'data', 'Sample_data.xlsx')
+# Data file path (e.g. data/synthetic_data.xlsx from generate_data.py)
+DATA_FILE_PATH = os.getenv('DATA_FILE_PATH', os.path.join(BASE_DIR, 'data', 'Sample_data.xlsx'))
+
+# Columnar snapshots of the data file (rebuild with `manage.py build_snapshot`)
+DATA_SNAPSHOT_DIR = os.getenv(
+    'DATA_SNAPSHOT_DIR',
+    os.path.join(BASE_DIR, 'data', '.snapshots')
+)
+
+# Directory of per-city workbooks served as lazily loaded shards (see
+# api/shards.py); when set it replaces DATA_FILE_PATH
+DATA_SHARD_DIR = os.getenv('DATA_SHARD_DIR', '')
+
+# Memory for loaded shards per worker; least recently used shards are evicted beyond it
+DATA_SHARD_MEMORY_MB = float(os.getenv('DATA_SHARD_MEMORY_MB', '1024'))
+
+# Memory-map snapshot columns read-only so gunicorn workers share one copy
+DATA_SHARED_MEMORY = os.getenv('DATA_SHARED_MEMORY', 'False').lower() == 'true'
+
+# Seconds between checks of the data file for changes (0 disables the watcher)
+DATA_RELOAD_INTERVAL = float(os.getenv('DATA_RELOAD_INTERVAL', '0'))
+
+# Shared secret for POST /api/reload/ (the endpoint is disabled when empty)
+DATA_RELOAD_TOKEN = os.getenv('DATA_RELOAD_TOKEN', '')
 
 # HuggingFace Inference API Configuration
 # Load from environment variable for security (never hardcode API keys!)
@@ -156,3 +216,53 @@ HUGGINGFACE_API_KEY = os.getenv(
     'HUGGINGFACE_API_KEY',
     'set_your_huggingface_api_key_in_env_file'  # Fallback for development
 )
+
+# Inference API base URL (point at `manage.py stub_llm` for local testing)
+HUGGINGFACE_API_URL = os.getenv(
+    'HUGGINGFACE_API_URL',
+    'https://api-inference.huggingface.co/models'
+).rstrip('/')
+
+# Model used for LLM summaries (part of the summary cache key)
+HUGGINGFACE_MODEL = os.getenv('HUGGINGFACE_MODEL', 'mistralai/Mistral-7B-Instruct-v0.1')
+
+# HuggingFace HTTP client (see api/llm.py): pooled session, timeouts and a
+# circuit breaker that skips the API for a cool-down after repeated failures
+LLM_POOL_SIZE = int(os.getenv('LLM_POOL_SIZE', '10'))
+LLM_CONNECT_TIMEOUT = float(os.getenv('LLM_CONNECT_TIMEOUT', '3.05'))
+LLM_READ_TIMEOUT = float(os.getenv('LLM_READ_TIMEOUT', '30'))
+LLM_BREAKER_FAILURES = int(os.getenv('LLM_BREAKER_FAILURES', '3'))
+LLM_BREAKER_COOLDOWN = float(os.getenv('LLM_BREAKER_COOLDOWN', '60'))
+
+# Character budget for the data block of an LLM prompt (see api/prompts.py);
+# older years are merged into ranges beyond it. 0 disables the budget.
+LLM_PROMPT_MAX_CHARS = int(os.getenv('LLM_PROMPT_MAX_CHARS', '2000'))
+
+# Background LLM summary jobs (see api/jobs.py)
+LLM_MAX_WORKERS = int(os.getenv('LLM_MAX_WORKERS', '4'))
+LLM_MAX_PENDING = int(os.getenv('LLM_MAX_PENDING', '32'))
+SUMMARY_JOB_TTL = int(os.getenv('SUMMARY_JOB_TTL', '600'))
+# Longest a request waits on an identical in-flight summary (here or in another worker)
+SUMMARY_FLIGHT_LEASE = float(os.getenv('SUMMARY_FLIGHT_LEASE', str(LLM_CONNECT_TIMEOUT + LLM_READ_TIMEOUT + 5)))
+# Upper bound for ?wait= on GET /api/summary/<job_id>/ (holds a worker while waiting)
+SUMMARY_POLL_MAX_WAIT = float(os.getenv('SUMMARY_POLL_MAX_WAIT', '10'))
+
+# ASGI mode (realestate_api.asgi sets API_ASYNC_VIEWS): async views for
+# query, stream and summary-job endpoints; LLM calls wait on the event loop
+API_ASYNC_VIEWS = os.getenv('API_ASYNC_VIEWS', 'False').lower() == 'true'
+# Threads for pandas work and rendering started from async views (see api/offload.py)
+ASYNC_CPU_WORKERS = int(os.getenv('ASYNC_CPU_WORKERS', str(min(32, (os.cpu_count() or 1) + 4))))
+# Open connections to HuggingFace and queued summary jobs per ASGI worker
+LLM_ASYNC_MAX_CONNECTIONS = int(os.getenv('LLM_ASYNC_MAX_CONNECTIONS', '500'))
+LLM_ASYNC_MAX_PENDING = int(os.getenv('LLM_ASYNC_MAX_PENDING', '1000'))
+
+# POST /api/query/batch/ limits
+BATCH_MAX_MESSAGES = int(os.getenv('BATCH_MAX_MESSAGES', '200'))
+BATCH_LLM_CONCURRENCY = int(os.getenv('BATCH_LLM_CONCURRENCY', '4'))
+
+# GET /api/rankings/ page size limit
+RANKING_MAX_K = int(os.getenv('RANKING_MAX_K', '100'))
+
+# GET /api/table/ page sizes (default and limit)
+TABLE_PAGE_SIZE = int(os.getenv('TABLE_PAGE_SIZE', '50'))
+TABLE_PAGE_MAX_ROWS = int(os.getenv('TABLE_PAGE_MAX_ROWS', '1000'))
@@ -9,3 +9,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'realestate_api.settings')
 
 application = get_wsgi_application()
+
+# Load the dataset in the background so the worker answers health checks
+# (and 503s) right away instead of blocking startup on the Excel parse
+from api.views import service  # noqa: E402
+
+service.start_loading()
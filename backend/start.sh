@@ -3,10 +3,26 @@ set -e
 
 echo "Running migrations..."
 python manage.py migrate --noinput
+python manage.py createcachetable
 
 echo "Collecting static files..."
 python manage.py collectstatic --noinput --clear
 
+echo "Building data snapshot..."
+python manage.py build_snapshot --prune
+
+if [ "${SERVER_MODE:-wsgi}" = "asgi" ]; then
+    # One event loop per worker; LLM calls and long polls do not hold threads
+    echo "Starting Gunicorn (ASGI, uvicorn workers)..."
+    exec gunicorn realestate_api.asgi:application \
+        --bind 0.0.0.0:${PORT:-8000} \
+        --workers ${WEB_CONCURRENCY:-2} \
+        --worker-class uvicorn.workers.UvicornWorker \
+        --timeout 60 \
+        --access-logfile - \
+        --error-logfile -
+fi
+
 echo "Starting Gunicorn..."
 gunicorn realestate_api.wsgi:application \
     --bind 0.0.0.0:${PORT:-8000} \
@@ -4,6 +4,7 @@ try:
     from api.services import RealEstateService
     print("SUCCESS: Services module imports OK")
     service = RealEstateService()
+    service.load()
     print(f"SUCCESS: Service initialized, data loaded")
 except Exception as e:
     print(f"ERROR: {e}")
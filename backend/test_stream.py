@@ -0,0 +1,34 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Test the streaming query endpoint. For a local run without HuggingFace:
+#   python manage.py stub_llm --delay 0.1
+#   HUGGINGFACE_API_URL=http://127.0.0.1:8081/models python manage.py runserver
+import json
+import time
+import urllib.request
+
+url = 'http://127.0.0.1:8000/api/query/stream/'
+data = json.dumps({'message': 'Analyze Akurdi'}).encode('utf-8')
+headers = {'Content-Type': 'application/json'}
+
+try:
+    req = urllib.request.Request(url, data=data, headers=headers, method='POST')
+    start = time.time()
+    with urllib.request.urlopen(req, timeout=90) as response:
+        event = None
+        for raw in response:
+            line = raw.decode('utf-8').rstrip('\n')
+            if line.startswith('event:'):
+                event = line[len('event:'):].strip()
+            elif line.startswith('data:'):
+                payload = json.loads(line[len('data:'):])
+                elapsed = time.time() - start
+                if event == 'result':
+                    print(f"[{elapsed:6.2f}s] result: {len(payload.get('table', []))} rows, "
+                          f"{len(payload.get('chart', {}).get('years', []))} years")
+                elif event == 'token':
+                    print(f"[{elapsed:6.2f}s] token: {payload['text']!r}")
+                else:
+                    print(f"[{elapsed:6.2f}s] {event}: {payload}")
+except Exception as e:
+    print(f'Error: {e}')
@@ -8,7 +8,7 @@ import ChatWindow from './components/ChatWindow';
 import SummaryCard from './components/SummaryCard';
 import TrendChart from './components/TrendChart';
 import DataTable from './components/DataTable';
-import { sendQuery } from './api/queryApi';
+import { sendQuery, pollSummary } from './api/queryApi';
 import './App.css';
 
 function App() {
@@ -21,12 +21,24 @@ function App() {
     setError(null);
 
     try {
-      // Send query to backend
-      const result = await sendQuery(message);
+      // Send query to backend; tables are paged in by DataTable
+      const result = await sendQuery(message, { tables: false });
 
       // Update analysis state
       setAnalysis(result);
 
+      // Swap in the LLM summary once the background job finishes
+      if (result.summary_job) {
+        pollSummary(result.summary_job).then((summary) => {
+          if (!summary) return;
+          setAnalysis((current) =>
+            current && current.summary_job === result.summary_job
+              ? { ...current, summary }
+              : current
+          );
+        });
+      }
+
       // Generate bot response based on type
       if (result.type === 'comparison') {
         const botResponse = result.areas && result.areas.length > 0
@@ -34,9 +46,10 @@ function App() {
           : '❌ Could not find the requested areas.';
         callback(botResponse);
       } else {
+        const years = result.chart?.years?.length || 0;
         const botResponse =
-          result.area && result.table && result.table.length > 0
-            ? `✅ Analysis complete for ${result.area}! Found ${result.table.length} records.`
+          result.area && years > 0
+            ? `✅ Analysis complete for ${result.area}! Found ${years} years of data.`
             : '❌ No data found for the requested area. Try asking about: Wakad, Akurdi, Aundh, Ambegaon Budruk, or Baner.';
         callback(botResponse);
       }
@@ -71,6 +84,7 @@ function App() {
                 <div className="column">
                   <TrendChart
                     data={analysis?.chart || { years: [], values: [] }}
+                    plan={analysis?.plan}
                   />
                 </div>
               </div>
@@ -85,7 +99,12 @@ function App() {
                       {analysis.areas && analysis.areas.map((areaName) => (
                         <div key={areaName}>
                           <h4 style={{ padding: '10px', background: '#f5f5f5', borderRadius: '4px' }}>{areaName}</h4>
-                          <DataTable data={analysis.tables?.[areaName]} />
+                          <DataTable
+                            area={areaName}
+                            columns={analysis.plan?.columns}
+                            yearFrom={analysis.plan?.year_from}
+                            yearTo={analysis.plan?.year_to}
+                          />
                         </div>
                       ))}
                     </div>
@@ -94,7 +113,12 @@ function App() {
               ) : (
                 // Single table for single area
                 <div className="row full-width">
-                  <DataTable data={analysis?.table} />
+                  <DataTable
+                    area={analysis?.area}
+                    columns={analysis.plan?.columns}
+                    yearFrom={analysis.plan?.year_from}
+                    yearTo={analysis.plan?.year_to}
+                  />
                 </div>
               )}
             </>
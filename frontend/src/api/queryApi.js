@@ -9,16 +9,17 @@ const API_BASE_URL = process.env.REACT_APP_API_URL || 'http://localhost:8000';
  * Send query to backend and get analysis.
  * 
  * @param {string} message - User query message
+ * @param {Object} options - { tables: false leaves the tables out (page them with fetchTablePage) }
  * @returns {Promise<Object>} Analysis result with summary, chart, and table
  */
-export const sendQuery = async (message) => {
+export const sendQuery = async (message, { tables = true } = {}) => {
   try {
     const response = await fetch(`${API_BASE_URL}/api/query/`, {
       method: 'POST',
       headers: {
         'Content-Type': 'application/json',
       },
-      body: JSON.stringify({ message }),
+      body: JSON.stringify({ message, tables }),
     });
 
     if (!response.ok) {
@@ -32,3 +33,136 @@ export const sendQuery = async (message) => {
     throw error;
   }
 };
+
+/**
+ * Fetch one page of an area's table in the columnar layout.
+ *
+ * @param {string} area - Area name
+ * @param {Object} options - { columns, cursor, limit, yearFrom, yearTo }
+ * @returns {Promise<Object>} Page: { area, columns, total, next_cursor, rows }
+ *   (rows rebuilt from the per-column arrays)
+ */
+export const fetchTablePage = async (area, { columns, cursor, limit = 25, yearFrom, yearTo } = {}) => {
+  const params = new URLSearchParams({ area, limit, layout: 'columns' });
+  if (columns && columns.length > 0) params.set('columns', columns.join(','));
+  if (cursor) params.set('cursor', cursor);
+  if (yearFrom != null) params.set('year_from', yearFrom);
+  if (yearTo != null) params.set('year_to', yearTo);
+
+  const response = await fetch(`${API_BASE_URL}/api/table/?${params}`);
+  if (!response.ok) {
+    throw new Error(`HTTP error! status: ${response.status}`);
+  }
+
+  const page = await response.json();
+  const length = page.columns.length > 0 ? page.data[page.columns[0]].length : 0;
+  const rows = Array.from({ length }, (_, index) => {
+    const row = {};
+    page.columns.forEach((column) => {
+      row[column] = page.data[column][index];
+    });
+    return row;
+  });
+  return { ...page, rows };
+};
+
+/**
+ * Fetch the state of a background LLM summary job.
+ *
+ * @param {string} jobId - Job id returned as `summary_job` by sendQuery
+ * @param {number} wait - Seconds the server may hold the request open (long-poll)
+ * @returns {Promise<Object>} Job state: { job, status, summary }
+ */
+export const fetchSummary = async (jobId, wait = 0) => {
+  const response = await fetch(
+    `${API_BASE_URL}/api/summary/${encodeURIComponent(jobId)}/?wait=${wait}`
+  );
+
+  if (!response.ok) {
+    throw new Error(`HTTP error! status: ${response.status}`);
+  }
+
+  return response.json();
+};
+
+/**
+ * Poll a summary job until the LLM summary is ready.
+ *
+ * @param {string} jobId - Job id returned as `summary_job` by sendQuery
+ * @param {Object} options - { interval: ms between polls, timeout: ms overall }
+ * @returns {Promise<string|null>} LLM summary, or null if it failed or timed out
+ */
+export const pollSummary = async (jobId, { interval = 1500, timeout = 45000 } = {}) => {
+  const deadline = Date.now() + timeout;
+
+  while (Date.now() < deadline) {
+    try {
+      const job = await fetchSummary(jobId);
+      if (job.status === 'done') {
+        return job.summary;
+      }
+      if (job.status === 'failed') {
+        return null;
+      }
+    } catch (error) {
+      console.error('Error polling summary:', error);
+      return null;
+    }
+    await new Promise((resolve) => setTimeout(resolve, interval));
+  }
+
+  return null;
+};
+
+/**
+ * Send query to the streaming endpoint and receive results as they are ready.
+ *
+ * The full analysis arrives first (with an analytical summary), followed by
+ * LLM summary tokens and the final summary.
+ *
+ * @param {string} message - User query message
+ * @param {Object} handlers - { onResult(result), onToken(text), onSummary({ summary, source }) }
+ * @returns {Promise<void>} Resolves when the stream ends
+ */
+export const streamQuery = async (message, { onResult, onToken, onSummary } = {}) => {
+  const response = await fetch(`${API_BASE_URL}/api/query/stream/`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+      Accept: 'text/event-stream',
+    },
+    body: JSON.stringify({ message }),
+  });
+
+  if (!response.ok) {
+    throw new Error(`HTTP error! status: ${response.status}`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+
+  const dispatch = (frame) => {
+    let event = 'message';
+    let data = '';
+    frame.split('\n').forEach((line) => {
+      if (line.startsWith('event:')) event = line.slice(6).trim();
+      if (line.startsWith('data:')) data += line.slice(5).trim();
+    });
+    if (!data) return;
+    const payload = JSON.parse(data);
+    if (event === 'result' && onResult) onResult(payload);
+    if (event === 'token' && onToken) onToken(payload.text);
+    if (event === 'summary' && onSummary) onSummary(payload);
+    if (event === 'error') throw new Error(payload.error);
+  };
+
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    const frames = buffer.split('\n\n');
+    buffer = frames.pop();
+    frames.forEach(dispatch);
+  }
+};
@@ -1,46 +1,97 @@
 /**
  * DataTable Component
  * Displays filtered real estate data in table format.
+ * Rows are fetched a page at a time from /api/table/ (only the columns
+ * shown, in the columnar layout); "Load more" follows the page cursor.
  */
 
-import React from 'react';
+import React, { useEffect, useRef, useState } from 'react';
+import { fetchTablePage } from '../api/queryApi';
 import './DataTable.css';
 
-const DataTable = ({ data }) => {
-  if (!data || data.length === 0) {
+const PAGE_SIZE = 25;
+
+const DataTable = ({ area, columns, yearFrom, yearTo }) => {
+  const [rows, setRows] = useState([]);
+  const [pageColumns, setPageColumns] = useState([]);
+  const [total, setTotal] = useState(0);
+  const [cursor, setCursor] = useState(null);
+  const [isLoading, setIsLoading] = useState(false);
+  const [error, setError] = useState(null);
+  // Only the latest request may update the table (the area can change mid-fetch)
+  const requestId = useRef(0);
+
+  const columnKey = columns ? columns.join(',') : '';
+
+  const loadPage = async (nextCursor, append) => {
+    const id = ++requestId.current;
+    setIsLoading(true);
+    setError(null);
+    try {
+      const page = await fetchTablePage(area, {
+        columns,
+        cursor: nextCursor,
+        limit: PAGE_SIZE,
+        yearFrom,
+        yearTo,
+      });
+      if (id !== requestId.current) return;
+      setRows((current) => (append ? [...current, ...page.rows] : page.rows));
+      setPageColumns(page.columns);
+      setTotal(page.total);
+      setCursor(page.next_cursor);
+    } catch (err) {
+      if (id !== requestId.current) return;
+      setError('Could not load table data.');
+      console.error('Error loading table:', err);
+    } finally {
+      if (id === requestId.current) setIsLoading(false);
+    }
+  };
+
+  useEffect(() => {
+    setRows([]);
+    setCursor(null);
+    setTotal(0);
+    if (area) {
+      loadPage(null, false);
+    } else {
+      requestId.current += 1;
+    }
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [area, columnKey, yearFrom, yearTo]);
+
+  if (!area || rows.length === 0) {
     return (
       <div className="data-table-wrapper">
         <div className="table-header">
           <h3>📋 Property Data</h3>
         </div>
         <div className="empty-table">
-          <p>No data to display. Send a query to see results.</p>
+          <p>{isLoading ? 'Loading…' : error || 'No data to display. Send a query to see results.'}</p>
         </div>
       </div>
     );
   }
 
-  // Get column headers from first row
-  const columns = Object.keys(data[0]);
-
   return (
     <div className="data-table-wrapper">
       <div className="table-header">
-        <h3>📋 Property Data ({data.length} rows)</h3>
+        <h3>📋 Property Data ({rows.length} of {total} rows)</h3>
       </div>
       <div className="table-container">
         <table className="data-table">
           <thead>
             <tr>
-              {columns.map((col) => (
+              {pageColumns.map((col) => (
                 <th key={col}>{col}</th>
               ))}
             </tr>
           </thead>
           <tbody>
-            {data.map((row, idx) => (
+            {rows.map((row, idx) => (
               <tr key={idx} className={idx % 2 === 0 ? 'even' : 'odd'}>
-                {columns.map((col) => (
+                {pageColumns.map((col) => (
                   <td key={`${idx}-${col}`}>
                     {typeof row[col] === 'number'
                       ? row[col].toFixed(0)
@@ -52,6 +103,20 @@ const DataTable = ({ data }) => {
           </tbody>
         </table>
       </div>
+      {(cursor || isLoading || error) && (
+        <div className="table-footer">
+          {error && <span className="table-error">{error}</span>}
+          {cursor && (
+            <button
+              className="load-more"
+              onClick={() => loadPage(cursor, true)}
+              disabled={isLoading}
+            >
+              {isLoading ? 'Loading…' : 'Load more'}
+            </button>
+          )}
+        </div>
+      )}
     </div>
   );
 };
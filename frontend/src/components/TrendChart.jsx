@@ -1,6 +1,8 @@
 /**
  * TrendChart Component
  * Displays price trend using Recharts line chart.
+ * Narrowed queries pass their plan (metric, property type, years), which
+ * sets the title, axis label and value format.
  */
 
 import React from 'react';
@@ -15,14 +17,15 @@ import {
 } from 'recharts';
 import './TrendChart.css';
 
-const TrendChart = ({ data }) => {
+const TrendChart = ({ data, plan }) => {
   // Check if this is a comparison (has areas) or single area data
   const isComparison = data.areas && Object.keys(data.areas).length > 0;
 
   let chartData;
 
   if (isComparison) {
-    // Transform comparison data for Recharts
+    // Transform comparison data for Recharts (series are aligned to data.years;
+    // years without data are null)
     chartData = data.years.map((year, index) => {
       const yearData = { year };
       // Add each area's data
@@ -39,10 +42,24 @@ const TrendChart = ({ data }) => {
     }));
   }
 
+  const isRate = !plan || plan.metric === 'rate';
+  const axisLabel = plan ? plan.label : 'Price (₹/sqft)';
+  let title = plan ? `${plan.label} Trend` : 'Price Trend';
+  if (plan && (plan.year_from || plan.year_to)) {
+    title += ` (${plan.year_from ?? '…'}–${plan.year_to ?? '…'})`;
+  }
+
+  const formatValue = (value) => {
+    if (plan && !isRate) {
+      return value?.toLocaleString() || 0;
+    }
+    return isComparison || plan ? `₹${value?.toLocaleString() || 0}/sqft` : `₹${value} Lakhs`;
+  };
+
   return (
     <div className="trend-chart">
       <div className="chart-header">
-        <h3>📈 Price Trend</h3>
+        <h3>📈 {title}</h3>
       </div>
       <div className="chart-content">
         {chartData.length > 0 ? (
@@ -60,7 +77,7 @@ const TrendChart = ({ data }) => {
               <YAxis
                 stroke="#999"
                 style={{ fontSize: '12px' }}
-                label={{ value: 'Price (₹/sqft)', angle: -90, position: 'insideLeft' }}
+                label={{ value: axisLabel, angle: -90, position: 'insideLeft' }}
               />
               <Tooltip
                 contentStyle={{
@@ -68,7 +85,7 @@ const TrendChart = ({ data }) => {
                   border: '1px solid #ccc',
                   borderRadius: '8px',
                 }}
-                formatter={(value) => isComparison ? `₹${value?.toLocaleString() || 0}/sqft` : `₹${value} Lakhs`}
+                formatter={formatValue}
                 cursor={{ stroke: '#667eea', strokeWidth: 2 }}
               />
               {isComparison ? (
@@ -84,6 +101,7 @@ const TrendChart = ({ data }) => {
                       strokeWidth={2}
                       dot={{ r: 4 }}
                       activeDot={{ r: 6 }}
+                      connectNulls={true}
                       isAnimationActive={true}
                       name={areaName}
                     />